@@ -1,7 +1,71 @@
-"""Точка входа приложения"""
+"""
+Точка входа приложения
 
-from views.windows.main_window import MainWindow
+Примеры:
+
+    python app.py
+    python app.py --startup-time
+
+С ключом --startup-time окно закрывается сразу после отображения,
+а в консоль выводятся время запуска и время импорта каждого модуля:
+импортированного при запуске и отложенного до первого использования
+(см. views.lazy_import).
+"""
+
+import argparse
+import time
+
+from views.lazy_import import ImportTimer, load_deferred
+
+
+# Количество модулей с наибольшим временем импорта в отчёте
+STARTUP_REPORT_LIMIT = 25
+
+
+def main() -> None:
+    """Запуск приложения"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--startup-time',
+        action='store_true',
+        help='замерить время запуска и импорта модулей и выйти'
+    )
+    args = parser.parse_args()
+
+    if not args.startup_time:
+        # pylint: disable-next=import-outside-toplevel
+        from views.windows.main_window import MainWindow
+        MainWindow()
+        return
+
+    import_timer = ImportTimer()
+    import_timer.install()
+    start = time.perf_counter()
+    # pylint: disable-next=import-outside-toplevel
+    from views.windows.main_window import MainWindow
+
+    def report(window: MainWindow) -> None:
+        """Отчёт о времени запуска после отображения окна"""
+        window.update()
+        shown = time.perf_counter() - start
+        print(f'Окно отображено через {shown * 1e3:.1f} мс')
+        print('\nИмпорт при запуске:')
+        print(import_timer.report(STARTUP_REPORT_LIMIT))
+
+        import_timer.clear()
+        deferred_start = time.perf_counter()
+        deferred = load_deferred()
+        deferred_time = time.perf_counter() - deferred_start
+        import_timer.uninstall()
+        print(
+            f'\nОтложенный импорт ({", ".join(deferred)}): '
+            f'{deferred_time * 1e3:.1f} мс'
+        )
+        print(import_timer.report(STARTUP_REPORT_LIMIT))
+        window.destroy()
+
+    MainWindow(on_ready=report)
 
 
 if __name__ == '__main__':
-    MainWindow()
+    main()
@@ -0,0 +1,393 @@
+"""
+Замеры производительности интегратора и поиска циклов.
+
+Для каждого набора коэффициентов из CASES замеряются:
+    - интегрирование runge_kutta на фиксированной сетке времени;
+    - проверка точек сетки x'(0) функциями is_cycle, is_cycle_batch,
+      is_cycle_specialized и is_cycle_adaptive;
+    - полный поиск find_cycles_in_phase_field каждым способом.
+
+Сохраняются время работы, количество шагов и вычислений правой части,
+шагов в секунду, вычислений правой части на найденный цикл и пиковый
+объём выделенной памяти (для способа parallel - только в основном
+процессе), а для полного поиска - ещё и причины завершения траекторий.
+Результат записывается в JSON, предыдущий результат можно передать
+для сравнения.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.run_benchmarks -o benchmark.json
+    python -m benchmarks.run_benchmarks --compare old.json
+
+Автор: Петряшев К. С.
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Final
+
+import numpy as np
+
+from controllers.phase_controller import (
+    ADAPTIVE_METHOD,
+    BATCH_METHOD,
+    PARALLEL_METHOD,
+    POINCARE_METHOD,
+    SCALAR_METHOD,
+    STEP,
+    find_cycles_in_phase_field
+)
+from models.instrumentation import SearchStatistics
+from models.ode_storage import BoundEquation
+from models.rk4_kernels import JIT_AVAILABLE
+from models.runge_kutta import (
+    is_cycle,
+    is_cycle_adaptive,
+    is_cycle_batch,
+    is_cycle_specialized,
+    runge_kutta
+)
+
+
+# Наборы коэффициентов и диапазоны x'(0): значения по умолчанию
+# интерфейса, слабое и сильное затухание, большие коэффициенты
+# при нелинейных членах (быстрые изменения правой части)
+CASES: Final = {
+    'gui_default': {
+        'coefficients': {'mu': 0.1, 'a1': 1., 'a2': -1., 'a3': 1.},
+        'y_range': (-0.5, 0.5)
+    },
+    'weak_damping': {
+        'coefficients': {'mu': 0.01, 'a1': 1., 'a2': -1., 'a3': 1.},
+        'y_range': (-0.5, 0.5)
+    },
+    'strong_damping': {
+        'coefficients': {'mu': 1., 'a1': 1., 'a2': -1., 'a3': 1.},
+        'y_range': (-0.5, 0.5)
+    },
+    'large_coefficients': {
+        'coefficients': {'mu': 0.1, 'a1': 10., 'a2': -10., 'a3': 10.},
+        'y_range': (-0.1, 0.1)
+    }
+}
+
+# Начальное значение x(0)
+X0: Final = 0.
+
+# Сетка времени для замера runge_kutta
+INTEGRATION_TIME: Final = np.linspace(0, 100, 10_001)
+
+# Каждая какая точка сетки проверяется медленной функцией is_cycle
+SCALAR_STRIDE: Final = 10
+
+# Ограничение шагов на одну точку, чтобы замер не зависал
+# на точках вблизи положения равновесия
+MAX_STEPS: Final = 200_000
+
+# Способы поиска, замеряемые целиком
+SCAN_METHODS: Final = (
+    BATCH_METHOD,
+    SCALAR_METHOD,
+    PARALLEL_METHOD,
+    ADAPTIVE_METHOD,
+    POINCARE_METHOD
+)
+
+# Количество повторов замера времени (берётся лучший)
+REPEAT: Final = 3
+
+
+class CountingEquation:
+    """
+    Правая часть уравнения, подсчитывающая свои вычисления.
+    Для массива точек формы (2, N) учитывается N вычислений.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Конструктор класса
+
+        :param kwargs: Коэффициенты уравнения.
+        """
+        self.__rhs = BoundEquation(**kwargs)
+        self.calls = 0
+        self.evaluations = 0
+
+    @property
+    def coefficients(self) -> tuple[float, float, float, float]:
+        """Коэффициенты (mu, a1, a2, a3)"""
+        return self.__rhs.coefficients
+
+    def __call__(self, x0: np.ndarray, t: float = 0., **kwargs) -> np.ndarray:
+        self.calls += 1
+        self.evaluations += x0.shape[1] if x0.ndim == 2 else 1
+        return self.__rhs(x0, t)
+
+
+def measure(function: Callable[[], object], repeat: int) -> tuple:
+    """
+    Замер времени работы и пикового объёма памяти функции.
+    Память замеряется отдельным запуском, так как tracemalloc
+    замедляет выделение памяти.
+
+    :param function: Замеряемая функция без аргументов.
+    :param repeat: Количество повторов замера времени.
+
+    :return: Кортеж (результат последнего запуска, лучшее время в
+        секундах, пиковый объём выделенной памяти в байтах).
+    """
+    best = np.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def record(
+    case: str,
+    benchmark: str,
+    wall_time: float,
+    peak_memory: int,
+    steps: int | None = None,
+    rhs_calls: int | None = None,
+    cycles: int | None = None
+) -> dict:
+    """
+    Запись результата одного замера.
+
+    :param case: Название набора коэффициентов.
+    :param benchmark: Название замера.
+    :param wall_time: Время работы в секундах.
+    :param peak_memory: Пиковый объём выделенной памяти в байтах.
+    :param steps: Количество шагов метода, если известно.
+    :param rhs_calls: Количество вычислений правой части, если известно.
+    :param cycles: Количество найденных циклов.
+
+    :return: Словарь с результатом замера и производными величинами.
+    """
+    return {
+        'case': case,
+        'benchmark': benchmark,
+        'wall_time': wall_time,
+        'peak_memory': peak_memory,
+        'steps': steps,
+        'rhs_calls': rhs_calls,
+        'cycles': cycles,
+        'steps_per_second': (
+            steps / wall_time if steps is not None and wall_time else None
+        ),
+        'rhs_calls_per_cycle': (
+            rhs_calls / cycles if rhs_calls is not None and cycles else None
+        )
+    }
+
+
+def run_case(name: str, case: dict, repeat: int) -> list[dict]:
+    """
+    Все замеры для одного набора коэффициентов.
+
+    :param name: Название набора.
+    :param case: Коэффициенты уравнения и диапазон x'(0).
+    :param repeat: Количество повторов замера времени.
+
+    :return: Результаты замеров.
+    """
+    coefficients = case['coefficients']
+    y_min, y_max = case['y_range']
+    y0 = np.arange(y_min, y_max, STEP)
+    start_points = np.column_stack((np.full(len(y0), X0), y0))
+    records = []
+
+    def counted(function: Callable) -> tuple:
+        """
+        Замер функции от правой части уравнения с подсчётом
+        вычислений правой части.
+
+        :return: Кортеж (результат, количество вычислений правой части,
+            время работы, пиковый объём памяти).
+        """
+        def run():
+            rhs = CountingEquation(**coefficients)
+            return function(rhs), rhs
+        (result, rhs), wall_time, peak = measure(run, repeat)
+        return result, rhs.evaluations, wall_time, peak
+
+    # Интегрирование на фиксированной сетке времени
+    _, evaluations, wall_time, peak = counted(
+        lambda rhs: runge_kutta(
+            start_points[len(start_points) // 2], rhs, INTEGRATION_TIME
+        )
+    )
+    records.append(record(
+        name, 'runge_kutta', wall_time, peak,
+        steps=evaluations // 4, rhs_calls=evaluations
+    ))
+
+    # Проверка точек сетки разными функциями. Метод Рунге-Кутты
+    # вычисляет правую часть 4 раза за шаг
+    for benchmark, check in (
+        ('is_cycle', lambda rhs: [
+            is_cycle(point, rhs, max_steps=MAX_STEPS)
+            for point in start_points[::SCALAR_STRIDE]
+        ]),
+        ('is_cycle_batch', lambda rhs: is_cycle_batch(
+            start_points, rhs, max_steps=MAX_STEPS
+        ))
+    ):
+        results, evaluations, wall_time, peak = counted(check)
+        records.append(record(
+            name, benchmark, wall_time, peak,
+            steps=evaluations // 4, rhs_calls=evaluations,
+            cycles=sum(result['result'] for result in results)
+        ))
+
+    # Скомпилированный цикл не вызывает правую часть из Python,
+    # количество шагов определяется по длине траекторий
+    rhs = BoundEquation(**coefficients)
+    is_cycle_specialized(start_points[0], rhs, max_steps=1)
+    results, wall_time, peak = measure(
+        lambda: [
+            is_cycle_specialized(point, rhs, max_steps=MAX_STEPS)
+            for point in start_points
+        ],
+        repeat
+    )
+    steps = sum(len(result['trajectory']) - 1 for result in results)
+    records.append(record(
+        name, 'is_cycle_specialized', wall_time, peak,
+        steps=steps, rhs_calls=4 * steps,
+        cycles=sum(result['result'] for result in results)
+    ))
+
+    # У метода Дормана-Принса шаги бывают отброшены,
+    # поэтому учитываются только вычисления правой части
+    results, evaluations, wall_time, peak = counted(
+        lambda rhs: [
+            is_cycle_adaptive(point, rhs, max_steps=MAX_STEPS)
+            for point in start_points
+        ]
+    )
+    records.append(record(
+        name, 'is_cycle_adaptive', wall_time, peak,
+        rhs_calls=evaluations,
+        cycles=sum(result['result'] for result in results)
+    ))
+
+    # Полный поиск циклов каждым способом. Шаги и вычисления правой
+    # части подсчитываются отдельным запуском, чтобы сбор статистики
+    # не влиял на замер времени
+    for method in SCAN_METHODS:
+        cycles, wall_time, peak = measure(
+            lambda: find_cycles_in_phase_field(
+                X0, y_min, y_max, method,
+                max_steps=MAX_STEPS, **coefficients
+            ),
+            repeat
+        )
+        statistics = SearchStatistics()
+        find_cycles_in_phase_field(
+            X0, y_min, y_max, method,
+            statistics=statistics, max_steps=MAX_STEPS, **coefficients
+        )
+        records.append(record(
+            name, f'scan_{method}', wall_time, peak,
+            steps=statistics.steps,
+            rhs_calls=statistics.rhs_evaluations,
+            cycles=len(cycles)
+        ))
+        records[-1]['exits'] = statistics.exits
+    return records
+
+
+def environment() -> dict:
+    """Сведения об окружении, в котором выполнялись замеры"""
+    return {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'jit': JIT_AVAILABLE
+    }
+
+
+def compare(records: list[dict], previous: list[dict]) -> None:
+    """
+    Вывод отношения времени работы к предыдущему результату.
+
+    :param records: Текущие результаты замеров.
+    :param previous: Предыдущие результаты замеров.
+    """
+    old = {
+        (item['case'], item['benchmark']): item['wall_time']
+        for item in previous
+    }
+    for item in records:
+        key = (item['case'], item['benchmark'])
+        if key in old and old[key]:
+            print(
+                f'{item["case"]:20} {item["benchmark"]:22} '
+                f'{item["wall_time"] / old[key]:8.2f}x'
+            )
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Разбор аргументов командной строки"""
+    parser = argparse.ArgumentParser(
+        description='Замеры производительности поиска циклов'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        default='benchmark.json',
+        help='Файл результата (.json)'
+    )
+    parser.add_argument(
+        '--case',
+        choices=tuple(CASES),
+        action='append',
+        help='Набор коэффициентов (по умолчанию все)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=REPEAT,
+        help='Количество повторов замера времени'
+    )
+    parser.add_argument(
+        '--compare',
+        help='Предыдущий результат для сравнения времени работы'
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    records = []
+    for name in arguments.case or CASES:
+        print(f'Замер набора {name}...')
+        records.extend(run_case(name, CASES[name], arguments.repeat))
+
+    with open(arguments.output, 'w', encoding='utf-8') as file:
+        json.dump(
+            {'environment': environment(), 'results': records},
+            file,
+            indent=2
+        )
+    print(f'Результат: {arguments.output}')
+
+    if arguments.compare:
+        with open(arguments.compare, encoding='utf-8') as file:
+            compare(records, json.load(file)['results'])
@@ -0,0 +1,546 @@
+"""
+Точка входа для запуска расчётов без графического интерфейса.
+
+Не импортирует customtkinter и matplotlib, поэтому работает на машинах
+без дисплея, в том числе под планировщиком задач.
+
+Примеры:
+
+    python cli.py cycles --y-min -0.5 --y-max 0.5 -o cycles.npz
+    python cli.py cycles --dtype float32 -o cycles.archive
+    python cli.py solution --x0 0 --y0 0.3 -o solution.csv
+    python cli.py basin --resolution 1000 -o basin.npz
+    python cli.py cycles --system van_der_pol -c mu=0.5 -o vdp.npz
+    python cli.py sweep mu 0.05 0.15 11 -o sweep.csv
+    python cli.py --job job.toml
+
+Параметры можно задать в файле задания (JSON или TOML) с теми же
+именами, что и у аргументов (через подчёркивание), и ключом 'command'.
+Аргументы командной строки имеют приоритет над файлом задания.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from controllers.phase_controller import (
+    ADAPTIVE_METHOD,
+    BATCH_METHOD,
+    PARALLEL_METHOD,
+    POINCARE_METHOD,
+    SCALAR_METHOD,
+    TRAJECTORY_DECIMATED,
+    TRAJECTORY_FULL,
+    TRAJECTORY_NONE,
+    find_cycles_in_phase_field,
+    get_solution_by_initial_conditions,
+    iter_cycles_in_phase_field,
+    save_cycles
+)
+from controllers.phase_portrait_controller import (
+    compute_basin_map,
+    save_basin_map
+)
+from controllers.sweep_controller import save_sweep, sweep_parameter
+from models.basin_map import FATE_NAMES
+from models.cycle_archive import ARCHIVE_DTYPES, CycleArchiveWriter
+from models.instrumentation import PHASE_SEARCH, SearchStatistics, timer
+from models.ode_registry import DEFAULT_SYSTEM, get_system, system_names
+from models.paths import DEFAULT_CACHE_DIRECTORY
+from models.poincare import COARSE_STEP
+from models.result_cache import ResultCache
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+# Коэффициенты системы по умолчанию, задаваемые отдельными аргументами
+COEFFICIENT_ARGUMENTS = ('mu', 'a1', 'a2', 'a3')
+
+
+def load_job(path: str) -> dict:
+    """
+    Чтение файла задания.
+
+    :param path: Путь к файлу .json или .toml.
+
+    :return: Параметры задания.
+    """
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise SystemExit('Для файлов TOML нужен Python 3.11 или новее')
+        with open(path, 'rb') as file:
+            job = tomllib.load(file)
+    else:
+        with open(path, encoding='utf-8') as file:
+            job = json.load(file)
+    return {name.replace('-', '_'): value for name, value in job.items()}
+
+
+def add_coefficients(parser: argparse.ArgumentParser) -> None:
+    """Аргументы с системой уравнений и её коэффициентами"""
+    parser.add_argument(
+        '--system',
+        choices=system_names(),
+        default=DEFAULT_SYSTEM,
+        help='Система уравнений (models.ode_registry)'
+    )
+    parser.add_argument('--mu', type=float, default=0.1)
+    parser.add_argument('--a1', type=float, default=1.0)
+    parser.add_argument('--a2', type=float, default=-1.0)
+    parser.add_argument('--a3', type=float, default=1.0)
+    parser.add_argument(
+        '-c', '--coefficient',
+        action='append',
+        default=[],
+        metavar='NAME=VALUE',
+        help='Коэффициент системы; можно указать несколько раз'
+    )
+
+
+def system_coefficients(arguments: argparse.Namespace) -> dict[str, float]:
+    """
+    Коэффициенты выбранной системы: значения аргументов --coefficient,
+    а для коэффициентов mu, a1, a2, a3 - ещё и одноимённых аргументов.
+    Остальные коэффициенты принимают значения по умолчанию.
+
+    :param arguments: Разобранные аргументы.
+
+    :return: Коэффициенты системы по названиям.
+    """
+    system = get_system(arguments.system)
+    values = {name: getattr(arguments, name) for name in COEFFICIENT_ARGUMENTS}
+    for item in arguments.coefficient:
+        name, separator, value = item.partition('=')
+        name = name.strip()
+        if not separator:
+            raise SystemExit(f'Коэффициент задаётся как NAME=VALUE: {item}')
+        if name not in system.coefficient_names:
+            raise SystemExit(
+                f'У системы {system.name} нет коэффициента {name}. '
+                f'Коэффициенты: {", ".join(system.coefficient_names)}'
+            )
+        try:
+            values[name] = float(value)
+        except ValueError:
+            raise SystemExit(f'Неверное значение коэффициента: {item}') \
+                from None
+    return {
+        name: values.get(name, default)
+        for name, default in system.defaults.items()
+    }
+
+
+def build_parser() -> tuple[argparse.ArgumentParser, dict]:
+    """
+    Построение разборщика аргументов командной строки.
+
+    :return: Кортеж (разборщик, разборщики команд по именам).
+    """
+    parser = argparse.ArgumentParser(
+        description='Поиск предельных циклов без графического интерфейса'
+    )
+    parser.add_argument('--job', help='Файл задания (.json или .toml)')
+    commands = parser.add_subparsers(dest='command')
+
+    cycles = commands.add_parser('cycles', help='Поиск циклов')
+    cycles.add_argument('--x0', type=float, default=0.0, help='x(0)')
+    cycles.add_argument('--y-min', type=float, default=-1.0, help="x'(0) min")
+    cycles.add_argument('--y-max', type=float, default=1.0, help="x'(0) max")
+    add_coefficients(cycles)
+    cycles.add_argument(
+        '--method',
+        choices=(
+            SCALAR_METHOD,
+            BATCH_METHOD,
+            PARALLEL_METHOD,
+            ADAPTIVE_METHOD,
+            POINCARE_METHOD
+        ),
+        default=BATCH_METHOD,
+        help='Способ поиска'
+    )
+    cycles.add_argument(
+        '--max-workers',
+        type=int,
+        help='Количество процессов для способа parallel'
+    )
+    cycles.add_argument(
+        '--trajectory',
+        choices=(TRAJECTORY_FULL, TRAJECTORY_DECIMATED, TRAJECTORY_NONE),
+        default=TRAJECTORY_FULL,
+        help='Способ хранения траекторий циклов'
+    )
+    cycles.add_argument(
+        '--floquet',
+        action='store_true',
+        help='Вычислить мультипликаторы Флоке циклов'
+    )
+    cycles.add_argument(
+        '--no-prune',
+        action='store_true',
+        help='Интегрировать и точки, заведомо не лежащие на циклах'
+    )
+    cycles.add_argument(
+        '--prune-heuristic',
+        action='store_true',
+        help='Пропускать точки в эллипсах вокруг фокусов и узлов '
+             '(эвристика, может пропустить цикл рядом с фокусом)'
+    )
+    cycles.add_argument('--max-steps', type=int, help='Шагов на точку')
+    cycles.add_argument('--max-time', type=float, help='Время на точку')
+    cycles.add_argument(
+        '--max-wall-time',
+        type=float,
+        help='Время работы на точку, в секундах'
+    )
+    cycles.add_argument(
+        '--cache',
+        nargs='?',
+        const=DEFAULT_CACHE_DIRECTORY,
+        help='Использовать кэш результатов (можно указать каталог)'
+    )
+    cycles.add_argument(
+        '-o', '--output',
+        default='cycles.npz',
+        help='Файл результата (.npz или .csv) или каталог хранилища'
+    )
+    cycles.add_argument(
+        '--dtype',
+        choices=ARCHIVE_DTYPES,
+        default='float64',
+        help='Тип точек траекторий в хранилище'
+    )
+    cycles.add_argument(
+        '--stats',
+        action='store_true',
+        help='Собрать и вывести статистику поиска'
+    )
+    cycles.add_argument(
+        '--stats-output',
+        help='Файл для статистики поиска (.json)'
+    )
+
+    solution = commands.add_parser('solution', help='Фазовая траектория')
+    solution.add_argument('--x0', type=float, default=0.0, help='x(0)')
+    solution.add_argument(
+        '--y0',
+        type=float,
+        nargs='+',
+        default=[0.0],
+        help="x'(0); несколько значений - несколько траекторий"
+    )
+    add_coefficients(solution)
+    solution.add_argument(
+        '-o', '--output',
+        default='solution.npy',
+        help='Файл результата (.npy или .csv)'
+    )
+
+    basin = commands.add_parser('basin', help='Карта областей притяжения')
+    basin.add_argument('--x-min', type=float, default=-2.0, help='x(0) min')
+    basin.add_argument('--x-max', type=float, default=2.0, help='x(0) max')
+    basin.add_argument('--y-min', type=float, default=-2.0, help="x'(0) min")
+    basin.add_argument('--y-max', type=float, default=2.0, help="x'(0) max")
+    basin.add_argument(
+        '--resolution',
+        type=int,
+        default=200,
+        help='Количество узлов сетки по каждой оси'
+    )
+    add_coefficients(basin)
+    basin.add_argument(
+        '--max-workers',
+        type=int,
+        help='Количество процессов'
+    )
+    basin.add_argument('--hop', type=float, help='Шаг метода Рунге-Кутты')
+    basin.add_argument('--max-time', type=float, help='Время на точку')
+    basin.add_argument(
+        '-o', '--output',
+        default='basin.npz',
+        help='Файл результата (.npz)'
+    )
+    basin.add_argument(
+        '--stats',
+        action='store_true',
+        help='Собрать и вывести статистику'
+    )
+
+    sweep = commands.add_parser(
+        'sweep',
+        help='Бифуркационная диаграмма предельных циклов'
+    )
+    # Позиционные аргументы необязательны для разборщика, чтобы их можно
+    # было задать в файле задания; их наличие проверяет run_sweep
+    sweep.add_argument('parameter', nargs='?', help='Коэффициент')
+    sweep.add_argument('start', type=float, nargs='?', help='Начало')
+    sweep.add_argument('stop', type=float, nargs='?', help='Конец')
+    sweep.add_argument('count', type=int, nargs='?', help='Количество')
+    sweep.add_argument('--x0', type=float, default=0.0, help='x(0)')
+    sweep.add_argument('--y-min', type=float, default=-1.0, help="x'(0) min")
+    sweep.add_argument('--y-max', type=float, default=1.0, help="x'(0) max")
+    add_coefficients(sweep)
+    sweep.add_argument(
+        '--coarse-step',
+        type=float,
+        default=COARSE_STEP,
+        help='Шаг грубой сетки полного поиска'
+    )
+    sweep.add_argument(
+        '-o', '--output',
+        default='sweep.npz',
+        help='Файл результата (.npz или .csv)'
+    )
+    return parser, {
+        'cycles': cycles,
+        'solution': solution,
+        'basin': basin,
+        'sweep': sweep
+    }
+
+
+def parse_arguments(argv: list[str]) -> argparse.Namespace:
+    """
+    Разбор аргументов командной строки с учётом файла задания.
+
+    :param argv: Аргументы командной строки.
+
+    :return: Разобранные аргументы.
+    """
+    parser, commands = build_parser()
+
+    # Сначала находим только файл задания
+    job_parser = argparse.ArgumentParser(add_help=False)
+    job_parser.add_argument('--job')
+    known, rest = job_parser.parse_known_args(argv)
+    job = load_job(known.job) if known.job else {}
+
+    # Команда из командной строки важнее команды из файла задания
+    job_command = job.pop('command', None)
+    command = next(
+        (argument for argument in rest if argument in commands),
+        job_command
+    )
+    if command is not None and command not in rest:
+        rest = [command, *rest]
+
+    # Значения из файла задания становятся значениями по умолчанию
+    if command in commands:
+        subparser = commands[command]
+        unknown = set(job) - set(vars(subparser.parse_args([])))
+        if unknown:
+            parser.error(
+                'Неизвестные параметры задания: '
+                + ', '.join(sorted(unknown))
+            )
+        subparser.set_defaults(**job)
+
+    arguments = parser.parse_args(rest)
+    if arguments.command is None:
+        parser.error('Не указана команда: cycles, solution, basin или sweep')
+    return arguments
+
+
+def run_cycles(arguments: argparse.Namespace) -> None:
+    """
+    Поиск циклов и сохранение результата. В каталог хранилища
+    циклы записываются потоково, по мере нахождения.
+    """
+    coefficients = system_coefficients(arguments)
+    kwargs = {
+        name: getattr(arguments, name)
+        for name in ('max_steps', 'max_time', 'max_wall_time')
+        if getattr(arguments, name) is not None
+    }
+    kwargs['system'] = arguments.system
+    if arguments.floquet:
+        kwargs['floquet'] = True
+    if arguments.no_prune:
+        kwargs['prune'] = False
+    if arguments.prune_heuristic:
+        kwargs['prune_heuristic'] = True
+    statistics = SearchStatistics() \
+        if arguments.stats or arguments.stats_output else None
+
+    if arguments.cache is not None:
+        if arguments.trajectory != TRAJECTORY_FULL:
+            raise SystemExit('Кэш хранит только полные траектории')
+        cycles = find_cycles_in_phase_field(
+            arguments.x0,
+            arguments.y_min,
+            arguments.y_max,
+            arguments.method,
+            arguments.max_workers,
+            cache=ResultCache(arguments.cache),
+            statistics=statistics,
+            **coefficients,
+            **kwargs
+        )
+        save_cycles(arguments.output, cycles, coefficients, arguments.dtype)
+        count_cycles = len(cycles)
+    else:
+        with timer(statistics, PHASE_SEARCH):
+            cycles = iter_cycles_in_phase_field(
+                arguments.x0,
+                arguments.y_min,
+                arguments.y_max,
+                arguments.method,
+                arguments.max_workers,
+                trajectory=arguments.trajectory,
+                statistics=statistics,
+                **coefficients,
+                **kwargs
+            )
+            if arguments.output.endswith(('.npz', '.csv')):
+                cycles = list(cycles)
+                save_cycles(
+                    arguments.output, cycles, coefficients, arguments.dtype
+                )
+                count_cycles = len(cycles)
+            else:
+                with CycleArchiveWriter(
+                    arguments.output, coefficients, arguments.dtype
+                ) as writer:
+                    for cycle in cycles:
+                        writer.append(cycle)
+                    count_cycles = len(writer)
+
+    print(f'Найдено циклов: {count_cycles}, результат: {arguments.output}')
+    if arguments.stats:
+        print(statistics)
+    if arguments.stats_output:
+        with open(arguments.stats_output, 'w', encoding='utf-8') as file:
+            json.dump(statistics.as_dict(), file, indent=2)
+
+
+def run_solution(arguments: argparse.Namespace) -> None:
+    """
+    Построение фазовых траекторий и сохранение результата.
+    Для одного значения x'(0) сохраняется массив формы (T, 2),
+    для нескольких - массив формы (N, T, 2) (в CSV - с номером
+    траектории в первом столбце).
+    """
+    y0 = np.atleast_1d(arguments.y0)
+    start_points = np.column_stack((np.full(len(y0), arguments.x0), y0))
+    solution = get_solution_by_initial_conditions(
+        start_points if len(y0) > 1 else start_points[0],
+        system=arguments.system,
+        **system_coefficients(arguments)
+    )
+    if arguments.output.endswith('.csv'):
+        if solution.ndim == 3:
+            table = np.column_stack((
+                np.repeat(np.arange(len(solution)), solution.shape[1]),
+                solution.reshape(-1, 2)
+            ))
+            header = 'trajectory,x,dx'
+        else:
+            table, header = solution, 'x,dx'
+        np.savetxt(
+            arguments.output,
+            table,
+            delimiter=',',
+            header=header,
+            comments=''
+        )
+    else:
+        np.save(arguments.output, solution)
+    print(f'Траекторий: {len(y0)}, результат: {arguments.output}')
+
+
+def run_basin(arguments: argparse.Namespace) -> None:
+    """Построение карты областей притяжения и сохранение результата"""
+    kwargs = {
+        name: getattr(arguments, name)
+        for name in ('hop', 'max_time')
+        if getattr(arguments, name) is not None
+    }
+    statistics = SearchStatistics() if arguments.stats else None
+    basin_map = compute_basin_map(
+        arguments.x_min,
+        arguments.x_max,
+        arguments.y_min,
+        arguments.y_max,
+        arguments.resolution,
+        arguments.max_workers,
+        statistics=statistics,
+        system=arguments.system,
+        **system_coefficients(arguments),
+        **kwargs
+    )
+    save_basin_map(arguments.output, basin_map)
+    counts = np.bincount(basin_map['fate'].ravel(), minlength=len(FATE_NAMES))
+    print(', '.join(
+        f'{name} {count}' for name, count in zip(FATE_NAMES, counts)
+    ))
+    print(f'Результат: {arguments.output}')
+    if arguments.stats:
+        print(statistics)
+
+
+def run_sweep(arguments: argparse.Namespace) -> None:
+    """
+    Перебор значений коэффициента и сохранение бифуркационной
+    диаграммы. Для каждого значения выводится количество циклов.
+    """
+    missing = [
+        name for name in ('parameter', 'start', 'stop', 'count')
+        if getattr(arguments, name) is None
+    ]
+    if missing:
+        raise SystemExit(f'Не заданы аргументы sweep: {", ".join(missing)}')
+    coefficients = system_coefficients(arguments)
+    if arguments.parameter not in coefficients:
+        raise SystemExit(
+            f'У системы {arguments.system} нет коэффициента '
+            f'{arguments.parameter}. '
+            f'Коэффициенты: {", ".join(coefficients)}'
+        )
+    del coefficients[arguments.parameter]
+    sweep = sweep_parameter(
+        arguments.x0,
+        arguments.y_min,
+        arguments.y_max,
+        arguments.parameter,
+        np.linspace(arguments.start, arguments.stop, arguments.count),
+        coarse_step=arguments.coarse_step,
+        system=arguments.system,
+        **coefficients
+    )
+    save_sweep(arguments.output, sweep)
+    for value, count in zip(sweep['values'], sweep['count']):
+        print(f'{arguments.parameter} = {value:g}: циклов {count}')
+    print(
+        f'Значений: {arguments.count}, '
+        f'найдено циклов: {len(sweep["parameter"])}, '
+        f'результат: {arguments.output}'
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Запуск расчёта по аргументам командной строки.
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv).
+    """
+    started = time.perf_counter()
+    arguments = parse_arguments(sys.argv[1:] if argv is None else argv)
+    if arguments.command == 'cycles':
+        run_cycles(arguments)
+    elif arguments.command == 'basin':
+        run_basin(arguments)
+    elif arguments.command == 'sweep':
+        run_sweep(arguments)
+    else:
+        run_solution(arguments)
+    print(f'Время работы: {time.perf_counter() - started:.2f} с')
+
+
+if __name__ == '__main__':
+    main()
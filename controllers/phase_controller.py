@@ -5,50 +5,159 @@
 Автор: Петряшев К. С.
 """
 
-from typing import Final
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event
+from typing import Callable, Final, Iterator
 
 import numpy as np
-from models.ode_storage import equation
-from models.runge_kutta import runge_kutta, is_cycle
+from models.cycle_archive import CycleArchive, save_cycle_archive
+from models.cycle_exclusion import CycleExclusion
+from models.instrumentation import (
+    EXIT_EXCLUDED,
+    PHASE_CACHE,
+    PHASE_EXCLUSION,
+    PHASE_SEARCH,
+    SearchStatistics,
+    timer
+)
+from models.interval_index import IntervalIndex
+from models.ode_storage import BoundEquation
+from models.poincare import iter_limit_cycles
+from models.result_cache import ResultCache, make_cache_key
+from models.shared_results import SharedCycleArena, shared_points_capacity
+from models.runge_kutta import (
+    STATUS_NOT_CYCLE,
+    runge_kutta,
+    is_cycle_batch,
+    iter_cycle_batch,
+    is_cycle_specialized,
+    is_cycle_adaptive
+)
 
 
 # Константы для поиска циклов
 STEP: Final = 0.004
 COUNT_BATCHES: Final = 4
 
+# Количество узлов сетки в одной части инкрементального поиска
+CHUNK_SIZE: Final = 64
+
+# Количество точек, интегрируемых одновременно при потоковом
+# векторизованном поиске. Результаты внутри части возвращаются
+# по мере завершения траекторий (см. iter_cycle_batch), размер
+# части ограничивает память истории шагов
+BATCH_SIZE: Final = 1024
+
+# Способы хранения траекторий найденных циклов
+TRAJECTORY_FULL: Final = 'full'
+TRAJECTORY_DECIMATED: Final = 'decimated'
+TRAJECTORY_NONE: Final = 'none'
+
+# Количество точек прореженной траектории
+DECIMATED_POINTS: Final = 256
+
+# Способы поиска циклов
+SCALAR_METHOD: Final = 'scalar'
+BATCH_METHOD: Final = 'batch'
+PARALLEL_METHOD: Final = 'parallel'
+ADAPTIVE_METHOD: Final = 'adaptive'
+POINCARE_METHOD: Final = 'poincare'
+
 
 def get_solution_by_initial_conditions(x0: np.ndarray, **kwargs) -> np.ndarray:
     """
     Получение решение дифференциального уравнения по начальным условиям
     и коэффициентам.
 
-    :param x0: Начальные условия задачи.
+    :param x0: Начальные условия задачи или массив формы (N, 2)
+        начальных условий нескольких траекторий.
     :param kwargs: Коэффициенты уравнения.
 
-    :return: Массив значений x и x' решения уравнения.
+    :return: Массив значений x и x' решения уравнения. Для нескольких
+        траекторий - массив формы (N, T, 2), в котором точки после
+        ухода траектории на бесконечность равны NaN.
     """
     return runge_kutta(
         x0,
-        equation,
+        BoundEquation(**kwargs),
         np.linspace(0, 4, 100),
         **kwargs
     )
 
 
-def __process_one_batch(batch: list, start_x: float, **kwargs: dict) -> list:
-    results = []
-    for coordinate in batch:
-        result = is_cycle([start_x, coordinate], equation, **kwargs)
-        if result['result']:
-            result.pop('result')
-            results.append(result)
-    return results
+def __process_one_batch(
+    batch: list,
+    start_x: float,
+    collect_statistics: bool = False,
+    layout: tuple | None = None,
+    part: int = 0,
+    **kwargs: dict
+) -> tuple[list, SearchStatistics | None]:
+    """
+    Поиск циклов на одной части диапазона значений x'(0).
+    Выполняется в отдельном процессе при параллельном поиске.
+
+    :param batch: Значения x'(0) текущей части диапазона.
+    :param start_x: Начальное значение x(0).
+    :param collect_statistics: Собирать ли статистику поиска.
+    :param layout: Описание блока общей памяти
+        (models.shared_results.SharedCycleArena), в который
+        записываются найденные циклы. Если не задано, циклы
+        возвращаются в результате.
+    :param part: Номер части в блоке общей памяти.
+    :param kwargs: Коэффициенты уравнения и ограничения проверки.
+
+    :return: Кортеж (найденные циклы в порядке начальных точек,
+        не записанные в общую память, статистика поиска на этой части
+        или None).
+    """
+    start_points = np.column_stack((np.full(len(batch), start_x), batch))
+    statistics = SearchStatistics() if collect_statistics else None
+    rhs = BoundEquation(**kwargs)
+    results = list(__select_cycles(
+        is_cycle_batch(start_points, rhs, statistics=statistics, **kwargs),
+        statistics
+    ))
+    if layout is not None:
+        arena = SharedCycleArena(layout)
+        try:
+            results = arena.write(part, results)
+        finally:
+            arena.close()
+    return results, statistics
+
+
+def __select_cycles(
+    checked: Iterator[dict],
+    statistics: SearchStatistics | None = None
+) -> Iterator[dict]:
+    """
+    Отбор циклов из результатов проверки начальных точек.
+
+    :param checked: Результаты проверки начальных точек.
+    :param statistics: Статистика, в которой подсчитывается количество
+        точек по результатам проверки.
+
+    :return: Результаты, являющиеся циклом, без ключей 'result'
+        и 'status'.
+    """
+    for result in checked:
+        status = result.pop('status')
+        if statistics is not None:
+            statistics.count_status(status)
+        if result.pop('result'):
+            yield result
 
 
 def find_cycles_in_phase_field(
     x0: float,
     y_min: float, 
     y_max: float,
+    method: str = BATCH_METHOD,
+    max_workers: int | None = None,
+    cache: ResultCache | None = None,
+    statistics: SearchStatistics | None = None,
     **kwargs
 ) -> list[dict]:
     """
@@ -58,7 +167,27 @@ def find_cycles_in_phase_field(
     :param x0: Начальное значение x(0).
     :param y_min: Минимальное значение для x'(0).
     :param y_max: Максимальное значение для x'(0).
-    :param kwargs: Коэффициенты уравнения.
+    :param method: Способ поиска: SCALAR_METHOD - каждая точка
+        интегрируется отдельно, BATCH_METHOD - все точки интегрируются
+        одновременно векторизованным методом, PARALLEL_METHOD - диапазон
+        делится на части, которые обрабатываются в отдельных процессах,
+        ADAPTIVE_METHOD - каждая точка интегрируется методом
+        Дормана-Принса с адаптивным шагом (допустимые погрешности
+        задаются параметрами rtol и atol в kwargs), POINCARE_METHOD -
+        циклы находятся как корни P(y) - y отображения Пуанкаре прямой
+        x = x0 (шаг грубой сетки задаётся параметром coarse_step в kwargs).
+    :param max_workers: Количество процессов для PARALLEL_METHOD.
+        По умолчанию равно количеству ядер процессора.
+    :param cache: Кэш результатов. Если задан, результаты поиска
+        с теми же параметрами берутся из кэша.
+    :param statistics: Статистика поиска (см. iter_cycles_on_grid).
+        При взятии результатов из кэша учитывается только время.
+    :param kwargs: Коэффициенты уравнения, ограничения проверки одной
+        точки: max_steps, max_time и max_wall_time, признак
+        floquet - вычислять ли мультипликатор Флоке циклов (см.
+        models.runge_kutta.is_cycle), а также признаки prune
+        и prune_heuristic - пропускать ли начальные точки, заведомо
+        не лежащие на циклах (см. iter_cycles_on_grid).
 
     :return: Массив из объектов вида:
     
@@ -72,23 +201,567 @@ def find_cycles_in_phase_field(
             [0, 1]
         ],
         # Начальные условия порождающие цикл
-        'start_point': [0, 0]
+        'start_point': [0, 0],
+        # Характеристики цикла, найденные при поиске: период,
+        # полуразмах, погрешность замыкания и, если задан
+        # признак floquet, мультипликатор Флоке
+        'period': 6.28,
+        'amplitude_x': 0.3,
+        'amplitude_y': 0.3,
+        'closure_error': 1e-4,
+        'multiplier': 0.5
     }
     """
-    # Создаём набор значений x'(0) в рамках переданного диопазона с
-    # шагом, заданным в константе.
-    y0 = np.arange(
-        y_min,
-        y_max,
-        STEP
-    )
+    if cache is not None:
+        key = __cache_key(x0, y_min, y_max, method, **kwargs)
+        with timer(statistics, PHASE_CACHE):
+            results = cache.get(key)
+        if results is None:
+            results = find_cycles_in_phase_field(
+                x0, y_min, y_max, method, max_workers,
+                statistics=statistics, **kwargs
+            )
+            with timer(statistics, PHASE_CACHE):
+                cache.put(key, results)
+        return results
+
+    with timer(statistics, PHASE_SEARCH):
+        return list(iter_cycles_in_phase_field(
+            x0, y_min, y_max, method, max_workers,
+            statistics=statistics, **kwargs
+        ))
+
+
+def iter_cycles_in_phase_field(
+    x0: float,
+    y_min: float,
+    y_max: float,
+    method: str = BATCH_METHOD,
+    max_workers: int | None = None,
+    trajectory: str = TRAJECTORY_FULL,
+    statistics: SearchStatistics | None = None,
+    **kwargs
+) -> Iterator[dict]:
+    """
+    Потоковый вариант find_cycles_in_phase_field: каждый цикл
+    возвращается сразу после подтверждения, а в памяти одновременно
+    хранятся только траектории текущей части диапазона. При
+    PARALLEL_METHOD циклы части возвращаются после её обработки
+    процессом. При TRAJECTORY_NONE способы BATCH_METHOD
+    и PARALLEL_METHOD не хранят историю шагов.
+
+    :param x0: Начальное значение x(0).
+    :param y_min: Минимальное значение для x'(0).
+    :param y_max: Максимальное значение для x'(0).
+    :param method: Способ поиска (см. find_cycles_in_phase_field).
+    :param max_workers: Количество процессов для PARALLEL_METHOD.
+    :param trajectory: Способ хранения траектории: TRAJECTORY_FULL -
+        полная траектория, TRAJECTORY_DECIMATED - не более
+        DECIMATED_POINTS точек траектории, TRAJECTORY_NONE - траектория
+        не хранится (ключ 'trajectory' отсутствует).
+    :param statistics: Статистика поиска (см. iter_cycles_on_grid).
+        Для POINCARE_METHOD результаты проверки точек
+        и причины завершения не учитываются.
+    :param kwargs: Коэффициенты уравнения и ограничения проверки.
+
+    :return: Объекты того же вида, что и элементы результата
+        find_cycles_in_phase_field, в порядке начальных точек.
+    """
+    if trajectory not in (
+        TRAJECTORY_FULL, TRAJECTORY_DECIMATED, TRAJECTORY_NONE
+    ):
+        raise ValueError(
+            f'Неизвестный способ хранения траектории: {trajectory}'
+        )
 
-    # Здесь будут храниться начальные условия, порождающие цикл
+    if method == POINCARE_METHOD:
+        cycles = iter_limit_cycles(
+            x0, y_min, y_max, BoundEquation(**kwargs),
+            statistics=statistics, **kwargs
+        )
+    else:
+        # Создаём набор значений x'(0) в рамках переданного диопазона с
+        # шагом, заданным в константе.
+        y0 = np.arange(
+            y_min,
+            y_max,
+            STEP
+        )
+        cycles = iter_cycles_on_grid(
+            x0, y0, method, max_workers, statistics,
+            keep_trajectories=trajectory != TRAJECTORY_NONE, **kwargs
+        )
+
+    for cycle in cycles:
+        if trajectory == TRAJECTORY_NONE:
+            cycle.pop('trajectory')
+        elif trajectory == TRAJECTORY_DECIMATED:
+            points = cycle['trajectory']
+            indices = np.linspace(
+                0,
+                len(points) - 1,
+                min(len(points), DECIMATED_POINTS)
+            ).astype(int)
+            # Копия нужна, чтобы освободить память полной траектории
+            cycle['trajectory'] = points[indices].copy()
+        yield cycle
+
+
+def find_cycles_on_grid(
+    x0: float,
+    y0: np.ndarray,
+    method: str = BATCH_METHOD,
+    max_workers: int | None = None,
+    statistics: SearchStatistics | None = None,
+    **kwargs
+) -> list[dict]:
+    """
+    Поиск циклов, порождаемых заданными начальными значениями x'(0).
+
+    :param x0: Начальное значение x(0).
+    :param y0: Проверяемые значения x'(0).
+    :param method: Способ поиска (кроме POINCARE_METHOD,
+        которому не нужна сетка значений).
+    :param max_workers: Количество процессов для PARALLEL_METHOD.
+    :param statistics: Статистика поиска (см. iter_cycles_on_grid).
+    :param kwargs: Коэффициенты уравнения и ограничения проверки.
+
+    :return: Массив из объектов того же вида, что возвращает
+        find_cycles_in_phase_field, в порядке значений y0.
+    """
+    return list(iter_cycles_on_grid(
+        x0, y0, method, max_workers, statistics, **kwargs
+    ))
+
+
+def iter_cycles_on_grid(
+    x0: float,
+    y0: np.ndarray,
+    method: str = BATCH_METHOD,
+    max_workers: int | None = None,
+    statistics: SearchStatistics | None = None,
+    prune: bool = True,
+    prune_heuristic: bool = False,
+    keep_trajectories: bool = True,
+    **kwargs
+) -> Iterator[dict]:
+    """
+    Потоковый вариант find_cycles_on_grid: каждый цикл возвращается
+    сразу после подтверждения.
+
+    :param x0: Начальное значение x(0).
+    :param y0: Проверяемые значения x'(0).
+    :param method: Способ поиска (кроме POINCARE_METHOD).
+    :param max_workers: Количество процессов для PARALLEL_METHOD.
+    :param statistics: Статистика поиска. В ней, помимо счётчиков
+        методов интегрирования, подсчитывается количество точек
+        по результатам проверки: STATUS_CYCLE, STATUS_NOT_CYCLE
+        и STATUS_UNDECIDED из models.runge_kutta. Точки со статусом
+        STATUS_UNDECIDED исчерпали ограничения проверки и не считаются
+        циклами. Пропущенные точки учитываются как STATUS_NOT_CYCLE
+        с причиной завершения EXIT_EXCLUDED.
+    :param prune: Пропускать ли начальные точки, если доказано, что
+        циклов у уравнения нет (см. models.cycle_exclusion).
+    :param prune_heuristic: Пропускать ли также точки в эллипсе вокруг
+        устойчивого или неустойчивого фокуса (узла), в котором функция
+        Ляпунова монотонна вдоль траекторий. Монотонность проверяется
+        только в конечном наборе точек, поэтому это эвристика: эллипс
+        может задеть цикл, проходящий близко к положению равновесия.
+        Учитывается только вместе с prune.
+    :param keep_trajectories: Нужны ли траектории циклов. Если нет,
+        BATCH_METHOD и PARALLEL_METHOD не хранят историю шагов,
+        и траектории циклов не возвращаются (вместо них None или
+        пустой массив).
+    :param kwargs: Коэффициенты уравнения и ограничения проверки
+        одной точки: max_steps, max_time и max_wall_time.
+
+    :return: Объекты того же вида, что и элементы результата
+        find_cycles_in_phase_field, в порядке значений y0.
+    """
+    # Правая часть уравнения с зафиксированными коэффициентами
+    rhs = BoundEquation(**kwargs)
+
+    y0 = np.asarray(y0, dtype=float)
+    if prune:
+        with timer(statistics, PHASE_EXCLUSION):
+            excluded = CycleExclusion(rhs, prune_heuristic).excluded(
+                x0, y0
+            )
+        count_excluded = int(excluded.sum())
+        if statistics is not None:
+            statistics.count_status(STATUS_NOT_CYCLE, count_excluded)
+            statistics.count_exit(EXIT_EXCLUDED, count_excluded)
+        if count_excluded:
+            y0 = y0[~excluded]
+    if not len(y0):
+        return
+
+    if method == PARALLEL_METHOD:
+        yield from __iter_cycles_in_parallel(
+            x0, y0, max_workers, statistics,
+            keep_trajectories=keep_trajectories, **kwargs
+        )
+        return
+
+    if method == BATCH_METHOD:
+        # Точки интегрируются частями, чтобы история шагов
+        # не росла неограниченно
+        checked = (
+            result
+            for start in range(0, len(y0), BATCH_SIZE)
+            for result in iter_cycle_batch(
+                np.column_stack((
+                    np.full(len(y0[start:start + BATCH_SIZE]), x0),
+                    y0[start:start + BATCH_SIZE]
+                )),
+                rhs,
+                statistics=statistics,
+                keep_trajectories=keep_trajectories,
+                **kwargs
+            )
+        )
+    elif method == SCALAR_METHOD:
+        checked = (
+            is_cycle_specialized(
+                np.array([x0, value]), rhs, statistics=statistics, **kwargs
+            )
+            for value in y0
+        )
+    elif method == ADAPTIVE_METHOD:
+        checked = (
+            is_cycle_adaptive(
+                np.array([x0, value]), rhs, statistics=statistics, **kwargs
+            )
+            for value in y0
+        )
+    else:
+        raise ValueError(f'Неизвестный способ поиска циклов: {method}')
+
+    # Возвращаем начальные условия, порождающие цикл,
     # а также сами траектории, являющиеся циклом
-    results = []
-    for value in y0:
-        result = is_cycle(np.array([x0, value]), equation, **kwargs)
-        if result['result']:
-            result.pop('result')
-            results.append(result)
-    return results
+    yield from __select_cycles(checked, statistics)
+
+
+def save_cycles(
+    path: str,
+    cycles: list[dict],
+    coefficients: dict | None = None,
+    dtype=np.float64
+) -> None:
+    """
+    Сохранение найденных циклов в файл.
+    Формат определяется путём: .csv - только начальные точки циклов,
+    .npz или каталог - столбцовое хранилище models.cycle_archive
+    с траекториями, характеристиками циклов и коэффициентами уравнения.
+
+    :param path: Путь к файлу или каталогу.
+    :param cycles: Результат функции find_cycles_in_phase_field.
+    :param coefficients: Коэффициенты уравнения.
+    :param dtype: Тип точек траекторий в хранилище: float32 или float64.
+    """
+    if path.endswith('.csv'):
+        np.savetxt(
+            path,
+            np.array(
+                [cycle['start_point'] for cycle in cycles],
+                dtype=np.float64
+            ).reshape(-1, 2),
+            delimiter=',',
+            header='x0,y0',
+            comments=''
+        )
+        return
+    save_cycle_archive(path, cycles, coefficients, dtype)
+
+
+def load_cycles(path: str) -> CycleArchive:
+    """
+    Открытие хранилища циклов, сохранённого функцией save_cycles.
+    Массивы читаются лениво, траектории из каталога отображаются
+    в память.
+
+    :param path: Путь к файлу .npz или каталогу.
+
+    :return: Хранилище, элементы которого имеют тот же вид, что и
+        элементы результата find_cycles_in_phase_field, с добавленными
+        характеристиками models.cycle_archive.METRIC_COLUMNS.
+    """
+    return CycleArchive(path)
+
+
+def __cache_key(
+    x0: float,
+    y_min: float,
+    y_max: float,
+    method: str,
+    **kwargs
+) -> str:
+    """
+    Ключ кэша результатов поиска циклов.
+
+    :param x0: Начальное значение x(0).
+    :param y_min: Минимальное значение для x'(0).
+    :param y_max: Максимальное значение для x'(0).
+    :param method: Способ поиска.
+    :param kwargs: Коэффициенты уравнения и параметры точности.
+
+    :return: Ключ записи кэша.
+    """
+    return make_cache_key(
+        x0=x0,
+        y_min=y_min,
+        y_max=y_max,
+        step=STEP,
+        method=method,
+        **search_parameters(**kwargs)
+    )
+
+
+def search_parameters(**kwargs) -> dict:
+    """
+    Приведение коэффициентов уравнения и параметров точности
+    к однозначному виду: отсутствующие коэффициенты заменяются
+    значениями по умолчанию, добавляется название системы
+    (models.ode_registry).
+
+    :param kwargs: Название системы, коэффициенты уравнения
+        и параметры точности.
+
+    :return: Словарь названия системы, всех её коэффициентов
+        и переданных параметров точности.
+    """
+    rhs = BoundEquation(**kwargs)
+    return {**kwargs, **rhs.named_coefficients, 'system': rhs.system.name}
+
+
+def __iter_cycles_in_parallel(
+    x0: float,
+    y0: np.ndarray,
+    max_workers: int | None,
+    statistics: SearchStatistics | None = None,
+    **kwargs
+) -> Iterator[dict]:
+    """
+    Параллельный поиск циклов. Диапазон значений x'(0) делится на части,
+    каждая из которых обрабатывается в отдельном процессе.
+
+    :param x0: Начальное значение x(0).
+    :param y0: Значения x'(0).
+    :param max_workers: Количество процессов.
+    :param statistics: Статистика поиска.
+    :param kwargs: Коэффициенты уравнения и ограничения проверки.
+
+    :return: Найденные циклы в порядке начальных точек. Траектории
+        и начальные точки циклов - представления массивов общей памяти
+        (см. models.shared_results), если её удалось выделить.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Частей должно быть не меньше, чем процессов
+    batches = [
+        batch
+        for batch in np.array_split(y0, max(COUNT_BATCHES, max_workers))
+        if len(batch)
+    ]
+
+    # Процессы записывают циклы в общую память, а не передают их
+    # сериализованными. Точки траекторий делятся между частями
+    # пропорционально их размеру
+    capacity = shared_points_capacity(len(y0))
+    try:
+        arena = SharedCycleArena.create(
+            [len(batch) for batch in batches],
+            [capacity * len(batch) // len(y0) for batch in batches]
+        )
+    except OSError:
+        arena = None
+
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [
+            executor.submit(
+                __process_one_batch,
+                batch,
+                x0,
+                statistics is not None,
+                None if arena is None else arena.layout,
+                part,
+                **kwargs
+            )
+            for part, batch in enumerate(batches)
+        ]
+        # Возвращаем результаты в порядке частей диапазона,
+        # чтобы порядок совпадал с последовательным поиском
+        for part, future in enumerate(futures):
+            results, batch_statistics = future.result()
+            if statistics is not None:
+                statistics.merge(batch_statistics)
+            if arena is not None:
+                yield from arena.read(part)
+            yield from results
+    finally:
+        # Если результаты больше не нужны, оставшиеся части не запускаем
+        executor.shutdown(cancel_futures=True)
+        if arena is not None:
+            arena.unlink()
+
+
+class IncrementalCycleSearch:
+    """
+    Поиск циклов с повторным использованием уже просмотренных
+    участков диапазона x'(0).
+
+    Значения x'(0) берутся на общей сетке (k + 1/2) * STEP, поэтому
+    результаты для пересекающихся диапазонов совпадают. Сдвиг на полшага
+    не даёт узлам попасть в положения равновесия на прямой x' = 0.
+    Для текущего набора коэффициентов хранятся просмотренные участки
+    сетки и найденные на них циклы, так что при расширении или сдвиге
+    диапазона интегрируются только новые участки.
+
+    Новые участки обрабатываются частями по CHUNK_SIZE узлов, после
+    каждой части можно получить найденные циклы и прервать поиск.
+    """
+
+    def __init__(
+        self,
+        method: str = BATCH_METHOD,
+        cache: ResultCache | None = None
+    ):
+        """
+        Конструктор класса
+
+        :param method: Способ поиска (кроме POINCARE_METHOD).
+        :param cache: Кэш результатов для отдельных участков сетки.
+        """
+        if method == POINCARE_METHOD:
+            raise ValueError(
+                'Поиск по отображению Пуанкаре не использует сетку x\'(0)'
+            )
+        self.__method = method
+        self.__cache = cache
+        self.__key = None
+        self.__scanned = IntervalIndex()
+        # Найденные циклы по индексу узла сетки
+        self.__cycles: dict[int, dict] = {}
+
+    @staticmethod
+    def __grid_index(value: float) -> int:
+        """
+        Индекс первого узла сетки, не меньшего value.
+
+        :param value: Значение x'(0).
+        """
+        # Округление убирает погрешность деления на шаг
+        return int(np.ceil(round(value / STEP - 0.5, 9)))
+
+    def search(
+        self,
+        x0: float,
+        y_min: float,
+        y_max: float,
+        on_progress: Callable[[int, int, list[dict]], None] | None = None,
+        cancel: Event | None = None,
+        statistics: SearchStatistics | None = None,
+        **kwargs
+    ) -> list[dict]:
+        """
+        Поиск циклов в диапазоне [y_min, y_max).
+
+        :param x0: Начальное значение x(0).
+        :param y_min: Минимальное значение для x'(0).
+        :param y_max: Максимальное значение для x'(0).
+        :param on_progress: Функция, вызываемая после обработки каждой
+            части с аргументами: количество обработанных частей, общее
+            количество частей, циклы, найденные в последней части.
+        :param cancel: Событие, установка которого прерывает поиск после
+            текущей части. Обработанные части при этом сохраняются.
+        :param statistics: Статистика поиска на новых участках.
+        :param kwargs: Коэффициенты уравнения.
+
+        :return: Массив из объектов того же вида, что возвращает
+            find_cycles_in_phase_field. При прерывании поиска - только
+            циклы на обработанных участках.
+        """
+        parameters = search_parameters(**kwargs)
+        key = make_cache_key(x0=x0, method=self.__method, **parameters)
+        # Коэффициенты изменились - накопленные результаты не годятся
+        if key != self.__key:
+            self.__key = key
+            self.__scanned.clear()
+            self.__cycles = {}
+
+        start, end = self.__grid_index(y_min), self.__grid_index(y_max)
+
+        # Делим непросмотренные участки на части, границы которых кратны
+        # CHUNK_SIZE, чтобы части совпадали между разными запросами
+        chunks = [
+            (max(chunk, gap_start), min(chunk + CHUNK_SIZE, gap_end))
+            for gap_start, gap_end in self.__scanned.uncovered(start, end)
+            for chunk in range(
+                gap_start - gap_start % CHUNK_SIZE,
+                gap_end,
+                CHUNK_SIZE
+            )
+        ]
+        for done, (chunk_start, chunk_end) in enumerate(chunks, start=1):
+            if cancel is not None and cancel.is_set():
+                break
+            with timer(statistics, PHASE_SEARCH):
+                found = self.__scan(
+                    x0, chunk_start, chunk_end, parameters, statistics
+                )
+            self.__scanned.add(chunk_start, chunk_end)
+            if on_progress is not None:
+                on_progress(done, len(chunks), found)
+
+        return [
+            self.__cycles[index]
+            for index in sorted(self.__cycles)
+            if start <= index < end
+        ]
+
+    def __scan(
+        self,
+        x0: float,
+        start: int,
+        end: int,
+        parameters: dict,
+        statistics: SearchStatistics | None = None
+    ) -> list[dict]:
+        """
+        Поиск циклов на участке сетки [start, end).
+
+        :param x0: Начальное значение x(0).
+        :param start: Индекс первого узла участка.
+        :param end: Индекс узла, следующего за последним узлом участка.
+        :param parameters: Коэффициенты уравнения и параметры точности.
+        :param statistics: Статистика поиска.
+
+        :return: Циклы, найденные на участке.
+        """
+        key = make_cache_key(
+            x0=x0,
+            start=start,
+            end=end,
+            step=STEP,
+            method=self.__method,
+            **parameters
+        )
+        with timer(statistics, PHASE_CACHE):
+            results = self.__cache.get(key) if self.__cache else None
+        if results is None:
+            results = find_cycles_on_grid(
+                x0,
+                (np.arange(start, end) + 0.5) * STEP,
+                self.__method,
+                statistics=statistics,
+                **parameters
+            )
+            if self.__cache:
+                with timer(statistics, PHASE_CACHE):
+                    self.__cache.put(key, results)
+
+        for result in results:
+            index = int(np.floor(result['start_point'][1] / STEP))
+            self.__cycles[index] = result
+        return results
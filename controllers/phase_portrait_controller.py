@@ -0,0 +1,158 @@
+"""
+Контроллер построения фазового портрета: карты областей притяжения
+на сетке начальных условий (x(0), x'(0)) и векторного поля уравнения.
+
+Автор: Петряшев К. С.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Final
+
+import numpy as np
+from models.basin_map import classify_initial_conditions, vector_field
+from models.equilibria import find_equilibria, is_stable
+from models.instrumentation import PHASE_SEARCH, SearchStatistics, timer
+from models.ode_storage import BoundEquation
+
+
+# Количество точек сетки, обрабатываемых одним процессом за раз
+BASIN_BLOCK_SIZE: Final = 65_536
+
+# Количество узлов прореженного векторного поля по каждой оси
+VECTOR_FIELD_RESOLUTION: Final = 32
+
+
+def __classify_block(
+    points: np.ndarray,
+    collect_statistics: bool = False,
+    **kwargs
+) -> tuple[np.ndarray, np.ndarray, SearchStatistics | None]:
+    """
+    Определение судьбы части точек сетки. Выполняется в отдельном
+    процессе, поэтому объявлена на уровне модуля.
+
+    :param points: Массив начальных точек формы (N, 2).
+    :param collect_statistics: Собирать ли статистику.
+    :param kwargs: Коэффициенты уравнения и параметры
+        models.basin_map.classify_initial_conditions.
+
+    :return: Кортеж (коды судьбы, индексы положений равновесия,
+        статистика или None).
+    """
+    rhs = BoundEquation(**kwargs)
+    equilibria = find_equilibria(rhs)
+    stable = [is_stable(rhs, point) for point in equilibria]
+    statistics = SearchStatistics() if collect_statistics else None
+    fates, attractors = classify_initial_conditions(
+        points, rhs, equilibria, stable, statistics=statistics, **kwargs
+    )
+    return fates, attractors, statistics
+
+
+def compute_basin_map(
+    x_min: float,
+    x_max: float,
+    y_min: float,
+    y_max: float,
+    resolution: int,
+    max_workers: int | None = None,
+    statistics: SearchStatistics | None = None,
+    **kwargs
+) -> dict:
+    """
+    Карта областей притяжения на сетке начальных условий.
+
+    Сетка делится на части по BASIN_BLOCK_SIZE точек, каждая из которых
+    обрабатывается векторизованно в отдельном процессе.
+
+    :param x_min: Минимальное значение x(0).
+    :param x_max: Максимальное значение x(0).
+    :param y_min: Минимальное значение x'(0).
+    :param y_max: Максимальное значение x'(0).
+    :param resolution: Количество узлов сетки по каждой оси.
+    :param max_workers: Количество процессов. При значении 1 расчёт
+        выполняется в текущем процессе.
+    :param statistics: Статистика построения карты
+        (см. models.basin_map.classify_initial_conditions).
+    :param kwargs: Коэффициенты уравнения и параметры
+        models.basin_map.classify_initial_conditions: hop, max_time,
+        settle_radius, blow_up_radius.
+
+    :return: Словарь:
+        'x', 'y' - узлы сетки по осям;
+        'fate' - коды судьбы (models.basin_map.FATE_*) формы
+        (resolution, resolution), строки соответствуют значениям x'(0);
+        'equilibrium' - индексы положений равновесия той же формы,
+        -1 для точек, не сошедшихся к положению равновесия;
+        'equilibria' - положения равновесия формы (K, 2);
+        'stable' - признаки их устойчивости;
+        'field_x', 'field_y', 'field_u', 'field_v' - прореженное
+        векторное поле (см. models.basin_map.vector_field).
+    """
+    rhs = BoundEquation(**kwargs)
+    equilibria = find_equilibria(rhs)
+
+    x = np.linspace(x_min, x_max, resolution)
+    y = np.linspace(y_min, y_max, resolution)
+    grid_x, grid_y = np.meshgrid(x, y)
+    points = np.column_stack((grid_x.ravel(), grid_y.ravel()))
+
+    blocks = np.array_split(
+        points, max(1, int(np.ceil(len(points) / BASIN_BLOCK_SIZE)))
+    )
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with timer(statistics, PHASE_SEARCH):
+        if max_workers == 1 or len(blocks) == 1:
+            results = [
+                __classify_block(block, statistics is not None, **kwargs)
+                for block in blocks
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        __classify_block,
+                        block,
+                        statistics is not None,
+                        **kwargs
+                    )
+                    for block in blocks
+                ]
+                results = [future.result() for future in futures]
+
+    if statistics is not None:
+        for _, _, block_statistics in results:
+            statistics.merge(block_statistics)
+
+    field_x, field_y, field_u, field_v = vector_field(
+        rhs, x_min, x_max, y_min, y_max,
+        min(resolution, VECTOR_FIELD_RESOLUTION)
+    )
+    return {
+        'x': x,
+        'y': y,
+        'fate': np.concatenate(
+            [fates for fates, _, _ in results]
+        ).reshape(grid_x.shape),
+        'equilibrium': np.concatenate(
+            [attractors for _, attractors, _ in results]
+        ).reshape(grid_x.shape),
+        'equilibria': equilibria,
+        'stable': np.array([is_stable(rhs, point) for point in equilibria]),
+        'field_x': field_x,
+        'field_y': field_y,
+        'field_u': field_u,
+        'field_v': field_v
+    }
+
+
+def save_basin_map(path: str, basin_map: dict) -> None:
+    """
+    Сохранение карты областей притяжения в файл .npz.
+
+    :param path: Путь к файлу.
+    :param basin_map: Результат compute_basin_map.
+    """
+    np.savez_compressed(path, **basin_map)
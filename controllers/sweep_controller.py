@@ -0,0 +1,183 @@
+"""
+Контроллер перебора значений коэффициента уравнения
+(построение бифуркационной диаграммы предельных циклов).
+
+Автор: Петряшев К. С.
+"""
+
+from typing import Final
+
+import numpy as np
+from models.ode_storage import BoundEquation
+from models.poincare import (
+    COARSE_STEP,
+    closed_return,
+    describe_cycle,
+    find_limit_cycles,
+    is_same_cycle,
+    refine_cycle,
+    section_points
+)
+
+
+# Полуширина отрезка вокруг цикла предыдущего значения коэффициента,
+# на котором ищется цикл для следующего значения
+CONTINUATION_WINDOW: Final = 0.02
+
+# Через сколько значений коэффициента выполнять полный поиск
+# по грубой сетке, чтобы не пропустить новые циклы
+RESCAN_EVERY: Final = 10
+
+# Столбцы результата перебора
+SWEEP_COLUMNS: Final = (
+    'parameter',
+    'start_y',
+    'period',
+    'amplitude_x',
+    'amplitude_y'
+)
+
+
+def __continue_cycles(
+    x0: float,
+    y_min: float,
+    y_max: float,
+    previous: list[float],
+    window: float,
+    rhs: BoundEquation,
+    **kwargs
+) -> list[float] | None:
+    """
+    Поиск циклов рядом с циклами, найденными для предыдущего
+    значения коэффициента (метод продолжения по параметру).
+
+    :param x0: Начальное значение x(0).
+    :param y_min: Минимальное значение для x'(0).
+    :param y_max: Максимальное значение для x'(0).
+    :param previous: Значения x'(0) циклов для предыдущего значения.
+    :param window: Полуширина отрезка поиска вокруг каждого цикла.
+    :param rhs: Правая часть уравнения.
+    :param kwargs: Параметры поиска (rtol, atol, xtol).
+
+    :return: Значения x'(0) циклов или None, если хотя бы один цикл
+        не удалось продолжить или два цикла продолжились в один
+        и нужен полный поиск.
+    """
+    roots, found = [], []
+    for y in previous:
+        root = refine_cycle(
+            x0,
+            max(y - window, y_min),
+            min(y + window, y_max),
+            rhs,
+            **kwargs
+        )
+        if root is None:
+            return None
+        section_return = closed_return(x0, root, rhs, **kwargs)
+        period = section_return['period']
+        if any(is_same_cycle(root, period, other) for other in found):
+            return None
+        found.append((period, section_points(root, section_return)))
+        roots.append(root)
+    return roots
+
+
+def sweep_parameter(
+    x0: float,
+    y_min: float,
+    y_max: float,
+    parameter: str,
+    values: np.ndarray,
+    coarse_step: float = COARSE_STEP,
+    window: float = CONTINUATION_WINDOW,
+    rescan_every: int = RESCAN_EVERY,
+    **kwargs
+) -> dict[str, np.ndarray]:
+    """
+    Поиск предельных циклов для каждого значения одного из коэффициентов
+    уравнения. Циклы, найденные для очередного значения, используются
+    как начальные приближения для следующего. Полный поиск по грубой
+    сетке выполняется для первого значения, каждые rescan_every значений
+    и тогда, когда какой-либо цикл продолжить не удалось.
+
+    :param x0: Начальное значение x(0).
+    :param y_min: Минимальное значение для x'(0).
+    :param y_max: Максимальное значение для x'(0).
+    :param parameter: Название перебираемого коэффициента.
+    :param values: Значения перебираемого коэффициента.
+    :param coarse_step: Шаг грубой сетки полного поиска.
+    :param window: Полуширина отрезка поиска вокруг известного цикла.
+    :param rescan_every: Период полного поиска.
+    :param kwargs: Название системы (system), остальные коэффициенты
+        уравнения и параметры поиска (rtol, atol, xtol).
+
+    :return: Столбцы результата (см. SWEEP_COLUMNS), по строке на каждый
+        найденный цикл, а также столбцы 'values' и 'count' с количеством
+        циклов для каждого значения коэффициента.
+    """
+    if parameter not in BoundEquation(**kwargs).system.coefficient_names:
+        raise ValueError(f'Неизвестный коэффициент: {parameter}')
+
+    values = np.asarray(values, dtype=np.float64)
+    columns = {name: [] for name in SWEEP_COLUMNS}
+    counts = np.zeros(len(values), dtype=int)
+    previous = None
+
+    for i, value in enumerate(values):
+        coefficients = {**kwargs, parameter: value}
+        rhs = BoundEquation(**coefficients)
+
+        roots = None
+        if previous is not None and i % rescan_every != 0:
+            roots = __continue_cycles(
+                x0, y_min, y_max, previous, window, rhs, **coefficients
+            )
+
+        if roots is None:
+            cycles = find_limit_cycles(
+                x0, y_min, y_max, rhs, coarse_step, **coefficients
+            )
+        else:
+            cycles = [
+                describe_cycle(x0, root, rhs, **coefficients)
+                for root in roots
+            ]
+
+        for cycle in cycles:
+            columns['parameter'].append(value)
+            columns['start_y'].append(cycle['start_point'][1])
+            columns['period'].append(cycle['period'])
+            columns['amplitude_x'].append(cycle['amplitude_x'])
+            columns['amplitude_y'].append(cycle['amplitude_y'])
+        counts[i] = len(cycles)
+        previous = [cycle['start_point'][1] for cycle in cycles]
+
+    result = {
+        name: np.array(column, dtype=np.float64)
+        for name, column in columns.items()
+    }
+    result['values'] = values
+    result['count'] = counts
+    return result
+
+
+def save_sweep(path: str, sweep: dict[str, np.ndarray]) -> None:
+    """
+    Сохранение результата перебора в столбцовом виде.
+    Формат определяется расширением файла: .npz или .csv
+    (в CSV сохраняются только столбцы SWEEP_COLUMNS).
+
+    :param path: Путь к файлу.
+    :param sweep: Результат функции sweep_parameter.
+    """
+    if path.endswith('.csv'):
+        np.savetxt(
+            path,
+            np.column_stack([sweep[name] for name in SWEEP_COLUMNS]),
+            delimiter=',',
+            header=','.join(SWEEP_COLUMNS),
+            comments=''
+        )
+    else:
+        np.savez(path, **sweep)
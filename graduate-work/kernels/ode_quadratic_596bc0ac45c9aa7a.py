@@ -0,0 +1,213 @@
+"""
+    Модуль системы 'quadratic', сгенерированный
+    models.ode_registry. Не редактируется вручную.
+
+    x' = y
+    y' = mu * y - x - a1 * (x * x) - a2 * x * y - a3 * (y * y)
+"""
+# pylint: skip-file
+import math
+
+import numpy as np
+
+from models.rk4_kernels import (
+    CYCLE,
+    DIVERGED,
+    NOT_CYCLE,
+    OVERFLOW,
+    STATE_DIRECTION,
+    STATE_HOPS,
+    STATE_INTERSECTIONS,
+    STATE_LOG_MULTIPLIER,
+    STATE_RETURN_TIME,
+    STATE_SUM_DIFFERENCES,
+    STATE_X,
+    STATE_Y,
+    UNDECIDED,
+    jit
+)
+
+COEFFICIENT_NAMES = ('mu', 'a1', 'a2', 'a3')
+
+
+def rhs_scalar(x, y, coefficients):
+    """Значения x' и y' для чисел с плавающей точкой"""
+    mu = coefficients[0]
+    a1 = coefficients[1]
+    a2 = coefficients[2]
+    a3 = coefficients[3]
+    return (y, mu * y - x - a1 * (x * x) - a2 * x * y - a3 * (y * y))
+
+
+def divergence_scalar(x, y, coefficients):
+    """Дивергенция для чисел с плавающей точкой"""
+    mu = coefficients[0]
+    a2 = coefficients[2]
+    a3 = coefficients[3]
+    return mu - a2 * x - a3 * (y + y)
+
+
+def rhs_array(x, y, coefficients):
+    """Значения x' и y' для массивов"""
+    mu = coefficients[0]
+    a1 = coefficients[1]
+    a2 = coefficients[2]
+    a3 = coefficients[3]
+    return (y, mu * y - x - a1 * (x * x) - a2 * x * y - a3 * (y * y))
+
+
+def jacobian_array(x, y, coefficients):
+    """Элементы матрицы Якоби по строкам для массивов"""
+    mu = coefficients[0]
+    a1 = coefficients[1]
+    a2 = coefficients[2]
+    a3 = coefficients[3]
+    return (0, 1, -1 - a1 * (x + x) - a2 * y, mu - a2 * x - a3 * (y + y))
+
+
+def divergence_array(x, y, coefficients):
+    """Дивергенция для массивов"""
+    mu = coefficients[0]
+    a2 = coefficients[2]
+    a3 = coefficients[3]
+    return mu - a2 * x - a3 * (y + y)
+
+
+__rhs = jit(rhs_scalar, inline=True)
+__divergence = jit(divergence_scalar, inline=True)
+
+
+def __rk4_cycle_loop(
+    x0: float,
+    y0: float,
+    coefficients: np.ndarray,
+    hop: float,
+    max_steps: int,
+    blow_up_radius: float,
+    trajectory: np.ndarray,
+    size: int,
+    state: np.ndarray
+) -> tuple:
+    """
+    Цикл метода Рунге-Кутты 4-го порядка с проверкой замыкания
+    траектории. Повторяет арифметику и условия выхода функции
+    models.runge_kutta.is_cycle.
+
+    Попутно находится время первого возвращения на прямую x = x0
+    в исходном направлении (линейной интерполяцией) и интеграл
+    дивергенции вдоль траектории, вычисляемый теми же стадиями метода.
+
+    Цикл можно продолжить с места остановки: его состояние хранится
+    в массиве state (см. models.rk4_kernels.initial_loop_state)
+    и обновляется при выходе.
+
+    :param x0: Начальное значение x.
+    :param y0: Начальное значение x'.
+    :param coefficients: Коэффициенты системы (см. kernel_coefficients).
+    :param hop: Шаг метода.
+    :param max_steps: Номер шага, после которого цикл останавливается.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность.
+    :param trajectory: Массив точек траектории формы (M, 2).
+    :param size: Количество записанных точек траектории.
+    :param state: Состояние цикла.
+
+    :return: Кортеж (код результата проверки, массив точек траектории,
+        количество записанных точек). Код UNDECIDED означает, что цикл
+        остановлен на шаге max_steps.
+    """
+    x = state[STATE_X]
+    y = state[STATE_Y]
+    count_x_intersections = int(state[STATE_INTERSECTIONS])
+    sum_differences = state[STATE_SUM_DIFFERENCES]
+    count_hops = int(state[STATE_HOPS])
+
+    # Направление движения по x в начале траектории,
+    # время возвращения и интеграл дивергенции
+    direction = state[STATE_DIRECTION]
+    return_time = state[STATE_RETURN_TIME]
+    log_multiplier = state[STATE_LOG_MULTIPLIER]
+
+    status = UNDECIDED
+    while count_hops < max_steps:
+        # Стадии метода
+        k1x, k1y = __rhs(x, y, coefficients)
+        x2 = x + k1x * hop / 2.
+        y2 = y + k1y * hop / 2.
+        k2x, k2y = __rhs(x2, y2, coefficients)
+        x3 = x + k2x * hop / 2.
+        y3 = y + k2y * hop / 2.
+        k3x, k3y = __rhs(x3, y3, coefficients)
+        x4 = x + k3x * hop
+        y4 = y + k3y * hop
+        k4x, k4y = __rhs(x4, y4, coefficients)
+
+        difference_x = (hop / 6.) * (k1x + 2 * k2x + 2 * k3x + k4x)
+        difference_y = (hop / 6.) * (k1y + 2 * k2y + 2 * k3y + k4y)
+
+        log_multiplier += (hop / 6.) * (
+            __divergence(x, y, coefficients)
+            + 2 * __divergence(x2, y2, coefficients)
+            + 2 * __divergence(x3, y3, coefficients)
+            + __divergence(x4, y4, coefficients)
+        )
+
+        previous_x = x
+        x += difference_x
+        y += difference_y
+
+        # Траектория уходит на бесконечность. Сравнение с NaN ложно,
+        # поэтому неконечные значения тоже не проходят проверку
+        if not (abs(x) <= blow_up_radius and abs(y) <= blow_up_radius):
+            if math.isfinite(x) and math.isfinite(y):
+                status = DIVERGED
+            else:
+                status = OVERFLOW
+            break
+
+        sum_differences += abs(difference_y)
+        count_hops += 1
+        tolerance = sum_differences / count_hops
+
+        # Удваиваем вместимость массива траектории при заполнении
+        if size == len(trajectory):
+            grown = np.empty((2 * size, 2))
+            grown[:size] = trajectory
+            trajectory = grown
+        trajectory[size, 0] = x
+        trajectory[size, 1] = y
+        size += 1
+
+        if count_hops == 1:
+            direction = difference_x
+
+        if (x > x0 and previous_x < x0) or (x < x0 and previous_x > x0):
+            count_x_intersections += 1
+            # Возвращение в исходном направлении
+            if math.isnan(return_time) and difference_x * direction > 0:
+                return_time = hop * (
+                    count_hops - 1 + (x0 - previous_x) / (x - previous_x)
+                )
+
+        if count_x_intersections >= 1 \
+                and abs(x0 - x) <= tolerance \
+                and abs(y0 - y) <= tolerance:
+            status = CYCLE
+            break
+
+        if count_x_intersections >= 2 and x - x0 >= tolerance:
+            status = NOT_CYCLE
+            break
+
+    state[STATE_X] = x
+    state[STATE_Y] = y
+    state[STATE_INTERSECTIONS] = count_x_intersections
+    state[STATE_SUM_DIFFERENCES] = sum_differences
+    state[STATE_HOPS] = count_hops
+    state[STATE_DIRECTION] = direction
+    state[STATE_RETURN_TIME] = return_time
+    state[STATE_LOG_MULTIPLIER] = log_multiplier
+    return status, trajectory, size
+
+
+rk4_cycle_loop = jit(__rk4_cycle_loop)
@@ -0,0 +1,260 @@
+"""
+    Карта областей притяжения фазовой плоскости
+
+    Для каждой начальной точки (x(0), x'(0)) определяется её судьба:
+    траектория сходится к устойчивому положению равновесия, уходит
+    на бесконечность или остаётся ограниченной вдали от положений
+    равновесия (притягивается предельным циклом). Все точки
+    интегрируются методом Рунге-Кутты одновременно, а завершившиеся
+    точки удаляются из активного набора.
+
+    Автор: Петряшев К. С.
+"""
+from typing import Final
+
+import numpy as np
+
+from models.divergence import BLOW_UP_RADIUS
+from models.instrumentation import SearchStatistics
+
+
+# Коды судьбы начальной точки
+# Не определена (например, точка не проверялась)
+FATE_UNDECIDED: Final = 0
+# Траектория сходится к устойчивому положению равновесия
+FATE_EQUILIBRIUM: Final = 1
+# Траектория остаётся ограниченной вдали от положений равновесия
+FATE_CYCLE: Final = 2
+# Траектория уходит на бесконечность
+FATE_DIVERGED: Final = 3
+
+# Названия судеб в порядке кодов
+FATE_NAMES: Final = ('undecided', 'equilibrium', 'cycle', 'diverged')
+
+# Шаг метода Рунге-Кутты. Карта строится для миллионов точек,
+# поэтому шаг крупнее, чем при поиске циклов
+BASIN_HOP: Final = 0.05
+
+# Время интегрирования каждой точки
+BASIN_MAX_TIME: Final = 300.0
+
+# Расстояние до положения равновесия, ближе которого
+# траектория считается сошедшейся к нему
+SETTLE_RADIUS: Final = 1e-3
+
+# Через сколько шагов проверяются условия завершения траекторий
+BASIN_CHECK_INTERVAL: Final = 32
+
+# Допустимое изменение размаха колебаний за последнюю четверть
+# времени интегрирования, при котором траектория считается вышедшей
+# на предельный цикл
+AMPLITUDE_TOLERANCE: Final = 0.05
+
+
+def __nearest_equilibrium(
+    points: np.ndarray,
+    equilibria: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ближайшее к каждой точке положение равновесия.
+
+    :param points: Массив точек формы (N, 2).
+    :param equilibria: Массив положений равновесия формы (K, 2).
+
+    :return: Кортеж (индексы ближайших положений равновесия,
+        расстояния до них).
+    """
+    distances = np.hypot(
+        points[:, 0, None] - equilibria[None, :, 0],
+        points[:, 1, None] - equilibria[None, :, 1]
+    )
+    nearest = np.argmin(distances, axis=1)
+    return nearest, distances[np.arange(len(points)), nearest]
+
+
+# pylint: disable=too-many-locals
+def classify_initial_conditions(
+    start_points: np.ndarray,
+    ode: callable,
+    equilibria: np.ndarray,
+    stable: np.ndarray,
+    hop: float = BASIN_HOP,
+    max_time: float = BASIN_MAX_TIME,
+    settle_radius: float = SETTLE_RADIUS,
+    blow_up_radius: float = BLOW_UP_RADIUS,
+    statistics: SearchStatistics | None = None,
+    **kwargs
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Определение судьбы начальных точек.
+
+    Каждые BASIN_CHECK_INTERVAL шагов траектории, вышедшие за радиус
+    blow_up_radius или получившие неконечные значения, помечаются
+    как FATE_DIVERGED, а подошедшие к устойчивому положению равновесия
+    ближе settle_radius - как FATE_EQUILIBRIUM. Траектории, оставшиеся
+    к моменту max_time рядом с каким-либо положением равновесия, тоже
+    помечаются как FATE_EQUILIBRIUM (медленная сходимость).
+    Для остальных ограниченных траекторий сравнивается наибольшее
+    расстояние до ближайшего положения равновесия за третью и последнюю
+    четверти времени интегрирования: если оно изменилось не более чем
+    на AMPLITUDE_TOLERANCE, траектория вышла на предельный цикл
+    (FATE_CYCLE), иначе она ещё не установилась (FATE_UNDECIDED),
+    и нужно увеличить max_time. Если положений равновесия нет,
+    все ограниченные траектории остаются FATE_UNDECIDED.
+
+    Функция ode должна принимать массив формы (2, N) и возвращать
+    массив той же формы.
+
+    :param start_points: Массив начальных точек формы (N, 2).
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param equilibria: Положения равновесия формы (K, 2)
+        (см. models.equilibria.find_equilibria).
+    :param stable: Признаки устойчивости положений равновесия формы (K,).
+    :param hop: Шаг метода Рунге-Кутты.
+    :param max_time: Время интегрирования каждой точки.
+    :param settle_radius: Расстояние, ближе которого траектория
+        считается сошедшейся к положению равновесия.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность.
+    :param statistics: Статистика. Если задана, в ней учитываются
+        вычисления правой части, шаги и количество точек по судьбам
+        (названия из FATE_NAMES).
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Кортеж (коды судьбы формы (N,), индексы положений
+        равновесия формы (N,), -1 для точек, не сошедшихся
+        к положению равновесия).
+    """
+    start_points = np.array(start_points, dtype=float).reshape(-1, 2)
+    equilibria = np.array(equilibria, dtype=float).reshape(-1, 2)
+    stable = np.asarray(stable, dtype=bool)
+    count_points = len(start_points)
+
+    fates = np.full(count_points, FATE_UNDECIDED, dtype=np.int8)
+    attractors = np.full(count_points, -1, dtype=np.int8)
+
+    # Индексы активных траекторий и их текущие точки
+    active = np.arange(count_points)
+    current = start_points.copy()
+
+    max_steps = int(np.ceil(max_time / hop))
+    count_hops = 0
+    total_steps = 0
+
+    # Наибольшие расстояния до положений равновесия за третью
+    # и последнюю четверти времени интегрирования
+    amplitudes = np.zeros((count_points, 2))
+
+    if statistics is not None:
+        ode = statistics.counting(ode)
+
+    def settle(
+        ids: np.ndarray,
+        points: np.ndarray,
+        candidates: np.ndarray
+    ) -> np.ndarray:
+        """
+        Пометка траекторий с индексами ids и текущими точками points,
+        подошедших к положениям равновесия из набора candidates.
+
+        :return: Маска помеченных траекторий.
+        """
+        settled = np.zeros(len(points), dtype=bool)
+        if not candidates.any():
+            return settled
+        nearest, distance = __nearest_equilibrium(
+            points, equilibria[candidates]
+        )
+        settled = distance <= settle_radius
+        fates[ids[settled]] = FATE_EQUILIBRIUM
+        attractors[ids[settled]] = \
+            np.flatnonzero(candidates)[nearest[settled]]
+        return settled
+
+    # Переполнения отлавливаем по маске конечности значений,
+    # поэтому предупреждения numpy здесь не нужны
+    with np.errstate(over='ignore', invalid='ignore'):
+        while active.size and count_hops < max_steps:
+            for _ in range(min(BASIN_CHECK_INTERVAL, max_steps - count_hops)):
+                k1 = ode(current.T, 0., **kwargs).T
+                k2 = ode((current + k1 * hop / 2.).T, 0., **kwargs).T
+                k3 = ode((current + k2 * hop / 2.).T, 0., **kwargs).T
+                k4 = ode((current + k3 * hop).T, 0., **kwargs).T
+                current = current + (hop / 6.) * (k1 + 2 * k2 + 2 * k3 + k4)
+                count_hops += 1
+                total_steps += active.size
+
+            # Сравнение с NaN ложно, поэтому неконечные значения
+            # тоже не проходят проверку
+            inside = (np.abs(current) <= blow_up_radius).all(axis=1)
+            fates[active[~inside]] = FATE_DIVERGED
+
+            finished = ~inside
+            finished[inside] = settle(
+                active[inside], current[inside], stable
+            )
+
+            keep = ~finished
+            active = active[keep]
+            current = current[keep]
+
+            quarter = 4 * count_hops // max_steps - 2
+            if quarter >= 0 and active.size and len(equilibria):
+                column = min(quarter, 1)
+                _, distance = __nearest_equilibrium(current, equilibria)
+                amplitudes[active, column] = np.maximum(
+                    amplitudes[active, column], distance
+                )
+
+        # Оставшиеся траектории: рядом с положением равновесия -
+        # медленная сходимость, иначе - притяжение к циклу,
+        # если размах колебаний установился. Без положений равновесия
+        # размах не измеряется, и траектории остаются неопределёнными
+        if len(equilibria):
+            settled = settle(
+                active, current, np.ones(len(equilibria), dtype=bool)
+            )
+            active = active[~settled]
+            early, late = amplitudes[active].T
+            steady = np.abs(late - early) <= AMPLITUDE_TOLERANCE * early
+            fates[active[steady]] = FATE_CYCLE
+
+    if statistics is not None:
+        statistics.steps += total_steps
+        for code, name in enumerate(FATE_NAMES):
+            statistics.count_status(name, int((fates == code).sum()))
+
+    return fates, attractors
+# pylint: enable=too-many-locals
+
+
+def vector_field(
+    ode: callable,
+    x_min: float,
+    x_max: float,
+    y_min: float,
+    y_max: float,
+    resolution: int,
+    **kwargs
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Векторное поле уравнения на равномерной сетке
+    (например, для matplotlib.pyplot.quiver).
+
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param x_min: Минимальное значение x.
+    :param x_max: Максимальное значение x.
+    :param y_min: Минимальное значение x'.
+    :param y_max: Максимальное значение x'.
+    :param resolution: Количество узлов сетки по каждой оси.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Кортеж (X, Y, U, V) массивов формы
+        (resolution, resolution): координаты узлов и значения x', x''.
+    """
+    x, y = np.meshgrid(
+        np.linspace(x_min, x_max, resolution),
+        np.linspace(y_min, y_max, resolution)
+    )
+    u, v = ode(np.array([x.ravel(), y.ravel()]), 0., **kwargs)
+    return x, y, u.reshape(x.shape), v.reshape(x.shape)
@@ -0,0 +1,447 @@
+"""
+    Столбцовое хранилище найденных циклов
+
+    Траектории всех циклов хранятся подряд в одном массиве точек,
+    границы траекторий - в массиве смещений offsets: траектория i
+    занимает строки offsets[i]:offsets[i + 1]. Рядом хранятся начальные
+    точки, характеристики циклов (METRIC_COLUMNS) и коэффициенты
+    уравнения.
+
+    Поддерживаются два вида хранилища:
+        - файл .npz - удобен для передачи, массивы читаются
+          по отдельности при первом обращении;
+        - каталог с файлами .npy и сырым файлом траекторий - массивы
+          отображаются в память, поэтому архив из миллионов точек
+          открывается без чтения в оперативную память, а запись ведётся
+          потоково, по одному циклу.
+
+    Автор: Петряшев К. С.
+"""
+import json
+import os
+from typing import Final, Iterator
+
+import numpy as np
+
+
+# Версия формата хранилища
+ARCHIVE_VERSION: Final = 1
+
+# Характеристики цикла, хранящиеся в архиве
+METRIC_COLUMNS: Final = (
+    'period',
+    'amplitude_x',
+    'amplitude_y',
+    'closure_error',
+    'multiplier'
+)
+
+# Имена файлов каталога хранилища
+META_FILE: Final = 'meta.json'
+TRAJECTORIES_FILE: Final = 'trajectories.bin'
+OFFSETS_FILE: Final = 'offsets.npy'
+START_POINTS_FILE: Final = 'start_points.npy'
+METRICS_FILE: Final = 'metrics.npy'
+
+# Поддерживаемые типы точек траекторий
+ARCHIVE_DTYPES: Final = ('float32', 'float64')
+
+
+def cycle_metrics(cycle: dict) -> tuple[float, ...]:
+    """
+    Характеристики цикла в порядке METRIC_COLUMNS.
+
+    Характеристики, уже вычисленные при поиске, берутся из словаря
+    цикла. Размах и ошибка замыкания (расстояние между первой
+    и последней точками) при их отсутствии вычисляются по траектории,
+    отсутствующие период и мультипликатор заменяются на NaN.
+
+    :param cycle: Цикл в формате результата
+        controllers.phase_controller.find_cycles_in_phase_field.
+
+    :return: Значения характеристик.
+    """
+    trajectory = np.reshape(cycle.get('trajectory', ()), (-1, 2))
+    computed = dict.fromkeys(METRIC_COLUMNS, np.nan)
+    if len(trajectory):
+        amplitude = (trajectory.max(axis=0) - trajectory.min(axis=0)) / 2
+        computed['amplitude_x'], computed['amplitude_y'] = amplitude
+        computed['closure_error'] = np.hypot(
+            *(trajectory[-1] - trajectory[0])
+        )
+    return tuple(
+        float(cycle.get(name, computed[name])) for name in METRIC_COLUMNS
+    )
+
+
+def metric_mask(cycle: dict) -> int:
+    """
+    Маска характеристик, имеющихся в словаре цикла: бит i установлен,
+    если есть характеристика METRIC_COLUMNS[i].
+
+    :param cycle: Цикл в формате результата
+        controllers.phase_controller.find_cycles_in_phase_field.
+    """
+    return sum(
+        1 << column
+        for column, name in enumerate(METRIC_COLUMNS)
+        if name in cycle
+    )
+
+
+def pack_cycles(cycles: list[dict], dtype=np.float64) -> dict[str, np.ndarray]:
+    """
+    Упаковка циклов в столбцовые массивы: start_points, offsets,
+    trajectories, metrics (см. cycle_metrics) и metric_mask
+    (см. функцию metric_mask).
+
+    :param cycles: Циклы в формате результата
+        controllers.phase_controller.find_cycles_in_phase_field.
+    :param dtype: Тип точек траекторий: float32 или float64.
+
+    :return: Массивы по именам.
+    """
+    dtype = archive_dtype(dtype)
+    trajectories = [
+        np.reshape(cycle.get('trajectory', ()), (-1, 2)) for cycle in cycles
+    ]
+    offsets = np.zeros(len(cycles) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(points) for points in trajectories])
+    return {
+        'start_points': np.array(
+            [cycle['start_point'] for cycle in cycles],
+            dtype=np.float64
+        ).reshape(-1, 2),
+        'offsets': offsets,
+        'trajectories': np.concatenate(trajectories, dtype=dtype)
+        if cycles else np.empty((0, 2), dtype=dtype),
+        'metrics': np.array(
+            [cycle_metrics(cycle) for cycle in cycles],
+            dtype=np.float64
+        ).reshape(-1, len(METRIC_COLUMNS)),
+        'metric_mask': np.array(
+            [metric_mask(cycle) for cycle in cycles], dtype=np.int64
+        )
+    }
+
+
+def unpack_cycles(arrays) -> list[dict]:
+    """
+    Распаковка циклов из массивов, полученных функцией pack_cycles.
+
+    :param arrays: Массивы по именам (например, прочитанные из .npz).
+
+    :return: Циклы в том же виде, в каком они были упакованы:
+        траектории - представления общего массива точек, из
+        характеристик - только имевшиеся в словарях циклов.
+    """
+    offsets = arrays['offsets']
+    trajectories = arrays['trajectories']
+    metrics = arrays['metrics'].tolist()
+    return [
+        {
+            'start_point': start_point,
+            'trajectory': trajectories[offsets[i]:offsets[i + 1]],
+            **{
+                name: value
+                for column, (name, value) in enumerate(
+                    zip(METRIC_COLUMNS, metrics[i])
+                )
+                if mask >> column & 1
+            }
+        }
+        for i, (start_point, mask) in enumerate(zip(
+            arrays['start_points'], arrays['metric_mask'].tolist()
+        ))
+    ]
+
+
+def archive_dtype(dtype) -> np.dtype:
+    """
+    Проверка типа точек траекторий (см. ARCHIVE_DTYPES).
+
+    :param dtype: Тип точек.
+
+    :return: Тип numpy.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.name not in ARCHIVE_DTYPES:
+        raise ValueError(f'Неподдерживаемый тип точек траекторий: {dtype}')
+    return dtype
+
+
+class CycleArchiveWriter:
+    """
+    Потоковая запись циклов в каталог хранилища.
+
+    Траектории дописываются в сырой файл сразу при добавлении цикла,
+    в памяти хранятся только смещения, начальные точки
+    и характеристики. Используется как контекстный менеджер:
+
+        with CycleArchiveWriter('cycles.archive', coefficients) as writer:
+            for cycle in iter_cycles_in_phase_field(...):
+                writer.append(cycle)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        coefficients: dict | None = None,
+        dtype=np.float64
+    ):
+        """
+        Конструктор класса
+
+        :param path: Путь к каталогу хранилища. Существующие файлы
+            хранилища в каталоге перезаписываются.
+        :param coefficients: Коэффициенты уравнения.
+        :param dtype: Тип точек траекторий: float32 или float64.
+        """
+        self.__path = path
+        self.__dtype = archive_dtype(dtype)
+        self.__coefficients = dict(coefficients or {})
+        os.makedirs(path, exist_ok=True)
+        # pylint: disable=consider-using-with
+        self.__trajectories = open(
+            os.path.join(path, TRAJECTORIES_FILE), 'wb'
+        )
+        # pylint: enable=consider-using-with
+        self.__offsets = [0]
+        self.__start_points = []
+        self.__metrics = []
+
+    def __enter__(self) -> 'CycleArchiveWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__start_points)
+
+    def append(self, cycle: dict) -> None:
+        """
+        Добавление цикла.
+
+        :param cycle: Цикл в формате результата
+            controllers.phase_controller.find_cycles_in_phase_field.
+            Траектория может отсутствовать.
+        """
+        points = np.ascontiguousarray(
+            np.reshape(cycle.get('trajectory', ()), (-1, 2)),
+            dtype=self.__dtype
+        )
+        self.__trajectories.write(points.tobytes())
+        self.__offsets.append(self.__offsets[-1] + len(points))
+        self.__start_points.append(cycle['start_point'])
+        self.__metrics.append(cycle_metrics(cycle))
+
+    def close(self) -> None:
+        """Завершение записи: сохранение индексов и описания хранилища"""
+        if self.__trajectories.closed:
+            return
+        self.__trajectories.close()
+        np.save(
+            os.path.join(self.__path, OFFSETS_FILE),
+            np.array(self.__offsets, dtype=np.int64)
+        )
+        np.save(
+            os.path.join(self.__path, START_POINTS_FILE),
+            np.array(self.__start_points, dtype=np.float64).reshape(-1, 2)
+        )
+        np.save(
+            os.path.join(self.__path, METRICS_FILE),
+            np.array(self.__metrics, dtype=np.float64).reshape(
+                -1, len(METRIC_COLUMNS)
+            )
+        )
+        with open(
+            os.path.join(self.__path, META_FILE), 'w', encoding='utf-8'
+        ) as file:
+            json.dump({
+                'version': ARCHIVE_VERSION,
+                'dtype': self.__dtype.name,
+                'count': len(self),
+                'points': self.__offsets[-1],
+                'coefficients': self.__coefficients,
+                'metric_columns': list(METRIC_COLUMNS)
+            }, file, indent=2)
+
+
+def save_cycle_archive(
+    path: str,
+    cycles: list[dict],
+    coefficients: dict | None = None,
+    dtype=np.float64
+) -> None:
+    """
+    Сохранение циклов в хранилище. Вид хранилища определяется путём:
+    файл .npz или каталог (см. CycleArchiveWriter).
+
+    :param path: Путь к файлу .npz или каталогу.
+    :param cycles: Циклы в формате результата
+        controllers.phase_controller.find_cycles_in_phase_field.
+    :param coefficients: Коэффициенты уравнения.
+    :param dtype: Тип точек траекторий: float32 или float64.
+    """
+    if not path.endswith('.npz'):
+        with CycleArchiveWriter(path, coefficients, dtype) as writer:
+            for cycle in cycles:
+                writer.append(cycle)
+        return
+
+    coefficients = dict(coefficients or {})
+    np.savez(
+        path,
+        version=ARCHIVE_VERSION,
+        **pack_cycles(cycles, dtype),
+        metric_columns=np.array(METRIC_COLUMNS),
+        coefficient_names=np.array(list(coefficients), dtype=str),
+        coefficient_values=np.array(
+            list(coefficients.values()), dtype=np.float64
+        )
+    )
+
+
+class CycleArchive:
+    """
+    Чтение хранилища циклов.
+
+    Массивы читаются лениво: из каталога - отображением в память,
+    из файла .npz - при первом обращении. Траектория цикла
+    возвращается как представление общего массива без копирования.
+    """
+
+    def __init__(self, path: str):
+        """
+        Конструктор класса
+
+        :param path: Путь к файлу .npz или каталогу хранилища.
+        """
+        self.__path = path
+        self.__arrays = {}
+        if os.path.isdir(path):
+            with open(
+                os.path.join(path, META_FILE), encoding='utf-8'
+            ) as file:
+                meta = json.load(file)
+            self.__npz = None
+            self.__coefficients = meta['coefficients']
+            self.__metric_columns = tuple(meta['metric_columns'])
+            self.__dtype = np.dtype(meta['dtype'])
+            self.__count_points = meta['points']
+        else:
+            self.__npz = np.load(path)
+            self.__coefficients = dict(zip(
+                self.__npz['coefficient_names'].tolist(),
+                self.__npz['coefficient_values'].tolist()
+            ))
+            self.__metric_columns = tuple(
+                self.__npz['metric_columns'].tolist()
+            )
+
+    def __array(self, name: str) -> np.ndarray:
+        """
+        Массив хранилища, прочитанный при первом обращении.
+
+        :param name: Имя массива: trajectories, offsets, start_points
+            или metrics.
+
+        :return: Массив (для каталога - отображённый в память).
+        """
+        if name not in self.__arrays:
+            if self.__npz is not None:
+                self.__arrays[name] = self.__npz[name]
+            elif name == 'trajectories':
+                self.__arrays[name] = np.memmap(
+                    os.path.join(self.__path, TRAJECTORIES_FILE),
+                    dtype=self.__dtype,
+                    mode='r',
+                    shape=(self.__count_points, 2)
+                ) if self.__count_points else np.empty((0, 2), self.__dtype)
+            else:
+                self.__arrays[name] = np.load(
+                    os.path.join(self.__path, f'{name}.npy'),
+                    mmap_mode='r'
+                )
+        return self.__arrays[name]
+
+    @property
+    def coefficients(self) -> dict:
+        """Коэффициенты уравнения"""
+        return dict(self.__coefficients)
+
+    @property
+    def start_points(self) -> np.ndarray:
+        """Начальные точки циклов формы (N, 2)"""
+        return self.__array('start_points')
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Границы траекторий в общем массиве точек формы (N + 1,)"""
+        return self.__array('offsets')
+
+    @property
+    def trajectories(self) -> np.ndarray:
+        """Точки всех траекторий подряд, массив формы (M, 2)"""
+        return self.__array('trajectories')
+
+    @property
+    def metrics(self) -> dict[str, np.ndarray]:
+        """Характеристики циклов по названиям столбцов"""
+        metrics = self.__array('metrics')
+        return {
+            name: metrics[:, column]
+            for column, name in enumerate(self.__metric_columns)
+        }
+
+    def trajectory(self, index: int) -> np.ndarray:
+        """
+        Траектория цикла.
+
+        :param index: Номер цикла.
+
+        :return: Представление общего массива точек формы (n, 2).
+        """
+        offsets = self.offsets
+        return self.trajectories[offsets[index]:offsets[index + 1]]
+
+    def close(self) -> None:
+        """Закрытие файла .npz и освобождение отображённых массивов"""
+        self.__arrays.clear()
+        if self.__npz is not None:
+            self.__npz.close()
+
+    def __enter__(self) -> 'CycleArchive':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.start_points)
+
+    def __getitem__(self, index: int) -> dict:
+        """
+        Цикл в формате результата
+        controllers.phase_controller.find_cycles_in_phase_field
+        с добавленными характеристиками.
+
+        :param index: Номер цикла.
+        """
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        index %= len(self)
+        metrics = self.__array('metrics')[index]
+        return {
+            'start_point': np.array(self.start_points[index]),
+            'trajectory': self.trajectory(index),
+            **{
+                name: float(value)
+                for name, value in zip(self.__metric_columns, metrics)
+            }
+        }
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self)):
+            yield self[index]
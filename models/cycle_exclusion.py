@@ -0,0 +1,281 @@
+"""
+    Области фазовой плоскости, через которые не проходят циклы
+
+    Перед поиском циклов по сетке начальных точек находятся положения
+    равновесия и их устойчивость, и по ним отбрасываются начальные
+    точки, которые заведомо не лежат на цикле:
+
+    - если дивергенция правой части при заданных коэффициентах
+      постоянна и не равна нулю, циклов нет (признак Бендиксона);
+    - если положения равновесия заданы явно (см. models.ode_registry)
+      и все они - сёдла, циклов нет: цикл окружает положения
+      равновесия с суммой индексов 1, а индекс седла равен -1;
+    - по запросу (эвристика) вокруг устойчивого или неустойчивого
+      фокуса (узла) строится эллипс - множество уровня квадратичной
+      функции Ляпунова линейного приближения, в котором она строго
+      убывает (для неустойчивого - возрастает) вдоль траекторий.
+      Траектория из точки эллипса в неё не возвращается, значит,
+      точка не лежит на цикле.
+
+    Первые два признака - доказательства отсутствия циклов. Эллипсы
+    же эвристические: убывание функции Ляпунова проверяется только
+    в конечном наборе точек на лучах из положения равновесия, а
+    найденный радиус уменьшается в EXCLUSION_MARGIN раз. Между точками
+    проверки условие может нарушаться, и тогда эллипс может задеть
+    цикл, проходящий близко к положению равновесия.
+
+    Автор: Петряшев К. С.
+"""
+from typing import Final
+
+import numpy as np
+
+from models.equilibria import find_equilibria
+from models.expressions import constant_value, parse_expression, substitute
+from models.ode_registry import VARIABLES
+from models.ode_storage import BoundEquation
+
+
+# Количество лучей и точек на каждом луче, в которых проверяется
+# убывание функции Ляпунова. Точки расположены в геометрической
+# прогрессии, чтобы одинаково подробно проверять и маленькие эллипсы
+# (например, вокруг слабого фокуса), и большие
+EXCLUSION_ANGLES: Final = 256
+EXCLUSION_RADII: Final = 512
+
+# Наибольшая и наименьшая полуоси проверяемых эллипсов
+EXCLUSION_MAX_RADIUS: Final = 10.0
+EXCLUSION_MIN_RADIUS: Final = 1e-6
+
+# Доля радиуса, на котором проверка выполнена на всех лучах,
+# используемая для эллипса. Запас покрывает промежутки между лучами
+# и точками проверки
+EXCLUSION_MARGIN: Final = 0.9
+
+
+class ExclusionRegion:
+    """
+    Эллипс (p - center)^T P (p - center) <= level вокруг положения
+    равновесия, через который не проходят циклы.
+    """
+
+    def __init__(self, center: np.ndarray, matrix: np.ndarray, level: float):
+        """
+        Конструктор класса
+
+        :param center: Положение равновесия.
+        :param matrix: Положительно определённая матрица P.
+        :param level: Уровень функции Ляпунова на границе эллипса.
+        """
+        self.__center = np.asarray(center, dtype=float)
+        self.__matrix = np.asarray(matrix, dtype=float)
+        self.__level = float(level)
+
+    @property
+    def center(self) -> np.ndarray:
+        """Положение равновесия"""
+        return self.__center
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Матрица квадратичной функции Ляпунова"""
+        return self.__matrix
+
+    @property
+    def level(self) -> float:
+        """Уровень функции Ляпунова на границе эллипса"""
+        return self.__level
+
+    def interval(self, x0: float) -> tuple[float, float] | None:
+        """
+        Пересечение эллипса с прямой x = x0.
+
+        :param x0: Значение x.
+
+        :return: Границы интервала значений x' или None, если прямая
+            не пересекает эллипс.
+        """
+        dx = x0 - self.__center[0]
+        (p11, p12), (_, p22) = self.__matrix
+        # Квадратное неравенство относительно dy = x' - center[1]:
+        # p22 * dy^2 + 2 * p12 * dx * dy + p11 * dx^2 - level <= 0
+        discriminant = (p12 * dx) ** 2 - p22 * (p11 * dx ** 2 - self.__level)
+        if discriminant <= 0:
+            return None
+        middle = self.__center[1] - p12 * dx / p22
+        half_width = np.sqrt(discriminant) / p22
+        return middle - half_width, middle + half_width
+
+
+def lyapunov_matrix(jacobian: np.ndarray) -> np.ndarray:
+    """
+    Решение уравнения Ляпунова J^T P + P J = -I.
+
+    :param jacobian: Матрица J формы (2, 2). Если её собственные
+        значения имеют отрицательную действительную часть, решение
+        положительно определено.
+
+    :return: Симметричная матрица P.
+    """
+    identity = np.eye(2)
+    # vec(J^T P + P J) = (I ⊗ J^T + J^T ⊗ I) vec(P)
+    system = np.kron(identity, jacobian.T) + np.kron(jacobian.T, identity)
+    matrix = np.linalg.solve(system, -identity.ravel()).reshape(2, 2)
+    return (matrix + matrix.T) / 2
+
+
+def is_constant_divergence(rhs: BoundEquation) -> bool:
+    """
+    Постоянна ли и отлична ли от нуля дивергенция правой части
+    при заданных коэффициентах.
+
+    :param rhs: Правая часть уравнения с зафиксированными коэффициентами.
+    """
+    system = rhs.system
+    divergence = substitute(
+        parse_expression(
+            system.divergence_expression,
+            VARIABLES + system.coefficient_names
+        ),
+        rhs.named_coefficients
+    )
+    value = constant_value(divergence)
+    return value is not None and value != 0
+
+
+def has_only_saddles(rhs: BoundEquation) -> bool:
+    """
+    Являются ли все положения равновесия сёдлами (в том числе если
+    их нет). Проверяется, только если положения равновесия заданы
+    явно: численный поиск может пропустить часть из них.
+
+    :param rhs: Правая часть уравнения с зафиксированными коэффициентами.
+    """
+    equilibria = rhs.system.equilibria(rhs.coefficients)
+    if equilibria is None:
+        return False
+    return all(
+        np.linalg.det(rhs.jacobian(point)) < 0 for point in equilibria
+    )
+
+
+def lyapunov_region(
+    rhs: BoundEquation,
+    center: np.ndarray
+) -> ExclusionRegion | None:
+    """
+    Эллипс вокруг положения равновесия, в котором квадратичная
+    функция Ляпунова линейного приближения строго монотонна вдоль
+    траекторий. Монотонность проверяется только в точках на лучах
+    (см. EXCLUSION_ANGLES и EXCLUSION_RADII), поэтому результат
+    эвристический, а не доказательство.
+
+    :param rhs: Правая часть уравнения с зафиксированными коэффициентами.
+    :param center: Положение равновесия.
+
+    :return: Эллипс или None, если положение равновесия не является
+        гиперболическим фокусом или узлом.
+    """
+    jacobian = rhs.jacobian(center)
+    trace, determinant = np.trace(jacobian), np.linalg.det(jacobian)
+    if not (np.isfinite(jacobian).all() and determinant > 0 and trace != 0):
+        return None
+
+    # Для неустойчивого положения равновесия функция строится
+    # по обращённому времени и должна возрастать
+    sign = 1. if trace < 0 else -1.
+    matrix = lyapunov_matrix(sign * jacobian)
+
+    # Направления u, для которых u^T P u = 1, поэтому в точке
+    # center + r * u функция Ляпунова равна r^2
+    angles = np.linspace(0, 2 * np.pi, EXCLUSION_ANGLES, endpoint=False)
+    directions = np.linalg.solve(
+        np.linalg.cholesky(matrix).T,
+        np.array([np.cos(angles), np.sin(angles)])
+    )
+    # Наибольшая полуось эллипса уровня r^2 равна r / sqrt(lambda_min)
+    scale = np.sqrt(np.linalg.eigvalsh(matrix)[0])
+    radii = scale * np.geomspace(
+        EXCLUSION_MIN_RADIUS, EXCLUSION_MAX_RADIUS, EXCLUSION_RADII
+    )
+
+    offsets = directions[:, :, np.newaxis] * radii
+    with np.errstate(all='ignore'):
+        velocity = rhs(
+            (center[:, np.newaxis, np.newaxis] + offsets).reshape(2, -1)
+        ).reshape(offsets.shape)
+        # Производная функции Ляпунова вдоль траекторий: 2 (p - e)^T P f(p)
+        derivative = sign * 2 * np.einsum(
+            'iar,ij,jar->ar', offsets, matrix, velocity
+        )
+
+    # Количество точек от центра, в которых условие выполнено
+    # на всех лучах. Сравнение с NaN ложно, поэтому неконечные
+    # значения тоже нарушают условие
+    violated = ~(derivative < 0)
+    count = np.where(
+        violated.any(axis=1), violated.argmax(axis=1), EXCLUSION_RADII
+    ).min()
+    if count == 0:
+        return None
+    return ExclusionRegion(
+        center, matrix, (EXCLUSION_MARGIN * radii[count - 1]) ** 2
+    )
+
+
+class CycleExclusion:
+    """
+    Области фазовой плоскости, через которые заведомо не проходят
+    циклы уравнения с зафиксированными коэффициентами.
+    """
+
+    def __init__(self, rhs: BoundEquation, heuristic: bool = False):
+        """
+        Конструктор класса. Проверяет признаки отсутствия циклов
+        и, если нужно, находит положения равновесия и строит области.
+
+        :param rhs: Правая часть уравнения с зафиксированными
+            коэффициентами.
+        :param heuristic: Строить ли эллипсы вокруг фокусов и узлов
+            (см. lyapunov_region). Без них исключаются только точки
+            уравнений, у которых доказано отсутствие циклов.
+        """
+        self.__no_cycles = is_constant_divergence(rhs) \
+            or has_only_saddles(rhs)
+        self.__regions = () if self.__no_cycles or not heuristic else tuple(
+            region
+            for region in (
+                lyapunov_region(rhs, point)
+                for point in find_equilibria(rhs)
+            )
+            if region is not None
+        )
+
+    @property
+    def no_cycles(self) -> bool:
+        """Доказано ли, что у уравнения нет циклов"""
+        return self.__no_cycles
+
+    @property
+    def regions(self) -> tuple[ExclusionRegion, ...]:
+        """Эллипсы вокруг фокусов и узлов (пусто без heuristic)"""
+        return self.__regions
+
+    def excluded(self, x0: float, y0: np.ndarray) -> np.ndarray:
+        """
+        Начальные точки (x0, y0), которые не лежат на циклах.
+
+        :param x0: Начальное значение x(0).
+        :param y0: Значения x'(0).
+
+        :return: Массив признаков той же формы, что и y0.
+        """
+        y0 = np.asarray(y0, dtype=float)
+        if self.__no_cycles:
+            return np.ones(y0.shape, dtype=bool)
+        excluded = np.zeros(y0.shape, dtype=bool)
+        for region in self.__regions:
+            bounds = region.interval(x0)
+            if bounds is not None:
+                excluded |= (bounds[0] < y0) & (y0 < bounds[1])
+        return excluded
@@ -0,0 +1,59 @@
+"""
+    Обнаружение уходящих на бесконечность траекторий
+
+    Траектории проверяются не на каждом шаге, а блоками точек:
+    через каждые DIVERGENCE_CHECK_INTERVAL шагов и перед выходом
+    из цикла интегрирования. Неконечные значения между проверками
+    не приводят к ложному выходу, так как траектория обрезается
+    по первой точке, не прошедшей проверку.
+
+    Автор: Петряшев К. С.
+"""
+from typing import Final
+
+import numpy as np
+
+from models.instrumentation import EXIT_DIVERGED, EXIT_OVERFLOW
+
+
+# Радиус, при выходе за который траектория считается
+# уходящей на бесконечность
+BLOW_UP_RADIUS: Final = 1e6
+
+# Через сколько шагов проверяется очередной блок точек траектории
+DIVERGENCE_CHECK_INTERVAL: Final = 64
+
+
+def first_divergent(
+    points: np.ndarray,
+    radius: float = BLOW_UP_RADIUS,
+    start: int = 0
+) -> int | None:
+    """
+    Поиск первой точки траектории с неконечными значениями
+    или вышедшей за радиус radius по одной из координат.
+
+    :param points: Массив точек траектории формы (N, 2).
+    :param radius: Радиус, за который не должна выходить траектория.
+    :param start: Индекс, с которого начинается проверка
+        (предыдущие точки уже проверены).
+
+    :return: Индекс первой такой точки или None.
+    """
+    # Сравнение с NaN ложно, поэтому NaN тоже не проходит проверку
+    inside = (np.abs(points[start:]) <= radius).all(axis=1)
+    if inside.all():
+        return None
+    return start + int(np.argmin(inside))
+
+
+def divergence_reason(point: np.ndarray) -> str:
+    """
+    Причина завершения траектории по точке, не прошедшей проверку.
+
+    :param point: Точка траектории.
+
+    :return: EXIT_OVERFLOW для неконечных значений,
+        иначе EXIT_DIVERGED.
+    """
+    return EXIT_DIVERGED if np.isfinite(point).all() else EXIT_OVERFLOW
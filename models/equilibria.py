@@ -0,0 +1,101 @@
+"""
+    Положения равновесия уравнения и их устойчивость
+
+    Автор: Петряшев К. С.
+"""
+from typing import Final
+
+import numpy as np
+
+from models.ode_storage import BoundEquation
+
+
+# Полуширина квадрата начальных приближений численного поиска
+# положений равновесия и количество приближений по каждой оси
+EQUILIBRIUM_SEARCH_RADIUS: Final = 10.0
+EQUILIBRIUM_SEEDS: Final = 21
+
+# Точность и максимальное количество итераций метода Ньютона
+NEWTON_TOLERANCE: Final = 1e-12
+NEWTON_MAX_ITERATIONS: Final = 50
+
+# Расстояние, ближе которого найденные положения равновесия совпадают
+EQUILIBRIUM_MERGE_DISTANCE: Final = 1e-8
+
+
+def __newton_equilibria(rhs: BoundEquation) -> np.ndarray:
+    """
+    Численный поиск положений равновесия методом Ньютона
+    из узлов равномерной сетки начальных приближений. Все приближения
+    уточняются одновременно.
+
+    :param rhs: Правая часть уравнения с зафиксированными коэффициентами.
+
+    :return: Массив положений равновесия формы (K, 2).
+    """
+    seeds = np.linspace(
+        -EQUILIBRIUM_SEARCH_RADIUS, EQUILIBRIUM_SEARCH_RADIUS,
+        EQUILIBRIUM_SEEDS
+    )
+    grid_x, grid_y = np.meshgrid(seeds, seeds)
+    points = np.array([grid_x.ravel(), grid_y.ravel()])
+
+    with np.errstate(all='ignore'):
+        for _ in range(NEWTON_MAX_ITERATIONS):
+            (a, b), (c, d) = rhs.jacobian(points)
+            f, g = rhs(points)
+            determinant = a * d - b * c
+            # Решение системы 2x2 по формулам Крамера
+            points = points - np.array([
+                (d * f - b * g) / determinant,
+                (a * g - c * f) / determinant
+            ])
+            points = points[:, np.isfinite(points).all(axis=0)]
+            if np.abs(rhs(points)).max(initial=0.) <= NEWTON_TOLERANCE:
+                break
+        residual = np.abs(rhs(points)).max(axis=0, initial=0.)
+
+    found = []
+    for point in points[:, residual <= np.sqrt(NEWTON_TOLERANCE)].T:
+        if all(
+            np.hypot(*(point - other)) > EQUILIBRIUM_MERGE_DISTANCE
+            for other in found
+        ):
+            found.append(point)
+    if not found:
+        return np.empty((0, 2))
+    found = np.array(found)
+    return found[np.lexsort((found[:, 1], found[:, 0]))]
+
+
+def find_equilibria(rhs: BoundEquation) -> np.ndarray:
+    """
+    Положения равновесия уравнения.
+
+    Если при объявлении системы задана функция положений равновесия
+    (см. models.ode_registry.OdeSystem), используется она. Иначе
+    положения равновесия ищутся методом Ньютона из узлов сетки
+    в квадрате со стороной 2 * EQUILIBRIUM_SEARCH_RADIUS.
+
+    :param rhs: Правая часть уравнения с зафиксированными коэффициентами.
+
+    :return: Массив положений равновесия формы (K, 2).
+    """
+    equilibria = rhs.system.equilibria(rhs.coefficients)
+    if equilibria is None:
+        equilibria = __newton_equilibria(rhs)
+    return equilibria
+
+
+def is_stable(rhs: BoundEquation, point: np.ndarray) -> bool:
+    """
+    Асимптотическая устойчивость положения равновесия
+    по линейному приближению: все собственные значения матрицы Якоби
+    имеют отрицательную действительную часть.
+
+    :param rhs: Правая часть уравнения с зафиксированными коэффициентами.
+    :param point: Положение равновесия.
+
+    :return: Устойчиво ли положение равновесия.
+    """
+    return bool((np.linalg.eigvals(rhs.jacobian(point)).real < 0).all())
@@ -0,0 +1,409 @@
+"""
+    Разбор и символьное дифференцирование выражений правых частей
+    систем дифференциальных уравнений
+
+    Выражение записывается на языке Python: числа, имена переменных
+    и коэффициентов, операции + - * / ** и функции из FUNCTIONS.
+    Производные строятся по дереву разбора (модуль ast) и упрощаются
+    ровно настолько, чтобы в них не было сложений с нулём, умножений
+    на 0 и 1 и действий над одними числами.
+
+    Автор: Петряшев К. С.
+"""
+import ast
+import operator
+from typing import Final
+
+
+# Допустимые функции и их производные по аргументу u
+FUNCTIONS: Final = {
+    'sin': 'cos(u)',
+    'cos': '-sin(u)',
+    'tan': '1 + tan(u) ** 2',
+    'exp': 'exp(u)',
+    'log': '1 / u',
+    'sqrt': '1 / (2 * sqrt(u))',
+    'sinh': 'cosh(u)',
+    'cosh': 'sinh(u)',
+    'tanh': '1 - tanh(u) ** 2',
+    'atan': '1 / (1 + u ** 2)'
+}
+
+# Допустимые операции. Двуместные операции над числами
+# вычисляются сразу
+__BINARY_OPERATIONS: Final = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow
+}
+__UNARY_OPERATIONS: Final = (ast.UAdd, ast.USub)
+
+
+def __number(node: ast.expr) -> float | None:
+    """
+    Значение числа.
+
+    :param node: Узел выражения.
+
+    :return: Значение, если узел - число, иначе None.
+    """
+    if isinstance(node, ast.Constant) and \
+            isinstance(node.value, (int, float)) and \
+            not isinstance(node.value, bool):
+        return node.value
+    return None
+
+
+def __constant(value: float) -> ast.expr:
+    """
+    Узел числа. Отрицательные числа записываются через унарный минус,
+    как их разбирает ast.
+
+    :param value: Значение.
+    """
+    if value < 0:
+        return ast.UnaryOp(ast.USub(), ast.Constant(-value))
+    return ast.Constant(value)
+
+
+def __negative(node: ast.expr) -> ast.expr:
+    """Узел -node"""
+    value = __number(node)
+    if value is not None:
+        return __constant(-value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        inner = __number(node.operand)
+        return node.operand if inner is None else ast.Constant(inner)
+    return ast.UnaryOp(ast.USub(), node)
+
+
+def __signed(node: ast.expr) -> float | None:
+    """
+    Значение числа с учётом унарного минуса.
+
+    :param node: Узел выражения.
+
+    :return: Значение, если узел - число или минус число, иначе None.
+    """
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = __number(node.operand)
+        return None if value is None else -value
+    return __number(node)
+
+
+def __binary(left: ast.expr, operation: ast.operator, right: ast.expr):
+    """
+    Узел двуместной операции с упрощением.
+
+    :param left: Левый операнд.
+    :param operation: Операция.
+    :param right: Правый операнд.
+
+    :return: Узел выражения.
+    """
+    a, b = __signed(left), __signed(right)
+    if a is not None and b is not None:
+        try:
+            value = __BINARY_OPERATIONS[type(operation)](a, b)
+        except (ZeroDivisionError, OverflowError):
+            value = None
+        if isinstance(value, (int, float)):
+            return __constant(value)
+    if isinstance(operation, ast.Add):
+        if a == 0:
+            return right
+        if b == 0:
+            return left
+        if b is not None and b < 0:
+            return ast.BinOp(left, ast.Sub(), __constant(-b))
+        if isinstance(right, ast.UnaryOp) and isinstance(right.op, ast.USub):
+            return ast.BinOp(left, ast.Sub(), right.operand)
+    elif isinstance(operation, ast.Sub):
+        if b == 0:
+            return left
+        if a == 0:
+            return __negative(right)
+        if isinstance(right, ast.UnaryOp) and isinstance(right.op, ast.USub):
+            return ast.BinOp(left, ast.Add(), right.operand)
+    elif isinstance(operation, ast.Mult):
+        if a == 0 or b == 0:
+            return ast.Constant(0)
+        if a == 1:
+            return right
+        if b == 1:
+            return left
+        if a == -1:
+            return __negative(right)
+        if b == -1:
+            return __negative(left)
+    elif isinstance(operation, ast.Div):
+        if a == 0:
+            return ast.Constant(0)
+        if b == 1:
+            return left
+    elif isinstance(operation, ast.Pow):
+        if b == 0:
+            return ast.Constant(1)
+        if b == 1:
+            return left
+    return ast.BinOp(left, operation, right)
+
+
+def __call(name: str, argument: ast.expr) -> ast.expr:
+    """Узел вызова функции name от аргумента argument"""
+    return ast.Call(ast.Name(name, ast.Load()), [argument], [])
+
+
+def __substitute(node: ast.expr, name: str, value: ast.expr) -> ast.expr:
+    """
+    Подстановка выражения вместо имени.
+
+    :param node: Выражение.
+    :param name: Имя переменной.
+    :param value: Подставляемое выражение.
+
+    :return: Новое выражение (исходное не изменяется).
+    """
+    if isinstance(node, ast.Name) and node.id == name:
+        return value
+    if isinstance(node, ast.BinOp):
+        return __binary(
+            __substitute(node.left, name, value),
+            node.op,
+            __substitute(node.right, name, value)
+        )
+    if isinstance(node, ast.UnaryOp):
+        operand = __substitute(node.operand, name, value)
+        return operand if isinstance(node.op, ast.UAdd) \
+            else __negative(operand)
+    if isinstance(node, ast.Call):
+        return __call(
+            node.func.id, __substitute(node.args[0], name, value)
+        )
+    return node
+
+
+def parse_expression(text: str, names: tuple[str, ...]) -> ast.expr:
+    """
+    Разбор выражения с проверкой допустимых операций и имён.
+
+    :param text: Выражение на языке Python.
+    :param names: Допустимые имена переменных и коэффициентов.
+
+    :return: Корень дерева разбора.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode='eval')
+    except SyntaxError as error:
+        raise ValueError(f'Ошибка в выражении {text!r}: {error.msg}') \
+            from error
+
+    # Имена функций допустимы только в вызовах
+    functions = {
+        id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)
+    }
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or \
+                    node.func.id not in FUNCTIONS or \
+                    len(node.args) != 1 or node.keywords:
+                raise ValueError(
+                    f'Недопустимый вызов функции в выражении {text!r}. '
+                    f'Допустимы функции одного аргумента: '
+                    f'{", ".join(FUNCTIONS)}'
+                )
+        elif isinstance(node, ast.Name):
+            if node.id not in names and id(node) not in functions:
+                raise ValueError(
+                    f'Неизвестное имя {node.id!r} в выражении {text!r}'
+                )
+        elif isinstance(node, ast.Constant):
+            if __number(node) is None:
+                raise ValueError(
+                    f'Недопустимая константа {node.value!r} '
+                    f'в выражении {text!r}'
+                )
+        elif isinstance(node, ast.BinOp):
+            if not isinstance(node.op, tuple(__BINARY_OPERATIONS)):
+                raise ValueError(
+                    f'Недопустимая операция в выражении {text!r}'
+                )
+        elif isinstance(node, ast.UnaryOp):
+            if not isinstance(node.op, __UNARY_OPERATIONS):
+                raise ValueError(
+                    f'Недопустимая операция в выражении {text!r}'
+                )
+        elif not isinstance(
+            node, (ast.Expression, ast.Load, ast.operator, ast.unaryop)
+        ):
+            raise ValueError(
+                f'Недопустимая конструкция в выражении {text!r}'
+            )
+    return tree.body
+
+
+def differentiate(node: ast.expr, variable: str) -> ast.expr:
+    """
+    Символьная производная выражения.
+
+    :param node: Выражение (результат parse_expression).
+    :param variable: Имя переменной дифференцирования.
+
+    :return: Выражение производной.
+    """
+    if isinstance(node, ast.Constant):
+        return ast.Constant(0)
+    if isinstance(node, ast.Name):
+        return ast.Constant(int(node.id == variable))
+    if isinstance(node, ast.UnaryOp):
+        derivative = differentiate(node.operand, variable)
+        return derivative if isinstance(node.op, ast.UAdd) \
+            else __negative(derivative)
+    if isinstance(node, ast.Call):
+        # Производная сложной функции: f'(u) * u'
+        rule = ast.parse(FUNCTIONS[node.func.id], mode='eval').body
+        return __binary(
+            __substitute(rule, 'u', node.args[0]),
+            ast.Mult(),
+            differentiate(node.args[0], variable)
+        )
+
+    left, right = node.left, node.right
+    d_left = differentiate(left, variable)
+    d_right = differentiate(right, variable)
+    if isinstance(node.op, (ast.Add, ast.Sub)):
+        return __binary(d_left, node.op, d_right)
+    if isinstance(node.op, ast.Mult):
+        return __binary(
+            __binary(d_left, ast.Mult(), right),
+            ast.Add(),
+            __binary(left, ast.Mult(), d_right)
+        )
+    if isinstance(node.op, ast.Div):
+        return __binary(
+            __binary(
+                __binary(d_left, ast.Mult(), right),
+                ast.Sub(),
+                __binary(left, ast.Mult(), d_right)
+            ),
+            ast.Div(),
+            __binary(right, ast.Pow(), ast.Constant(2))
+        )
+
+    # Степень: при постоянном показателе n * u ** (n - 1) * u',
+    # иначе u ** v * (v' * log(u) + v * u' / u)
+    if __signed(d_right) == 0:
+        return __binary(
+            __binary(
+                right,
+                ast.Mult(),
+                __binary(
+                    left,
+                    ast.Pow(),
+                    __binary(right, ast.Sub(), ast.Constant(1))
+                )
+            ),
+            ast.Mult(),
+            d_left
+        )
+    return __binary(
+        node,
+        ast.Mult(),
+        __binary(
+            __binary(d_right, ast.Mult(), __call('log', left)),
+            ast.Add(),
+            __binary(__binary(right, ast.Mult(), d_left), ast.Div(), left)
+        )
+    )
+
+
+def add_expressions(left: ast.expr, right: ast.expr) -> ast.expr:
+    """
+    Сумма выражений с упрощением.
+
+    :param left: Первое слагаемое.
+    :param right: Второе слагаемое.
+
+    :return: Выражение суммы.
+    """
+    return __binary(left, ast.Add(), right)
+
+
+def is_zero(node: ast.expr) -> bool:
+    """
+    Является ли выражение нулём.
+
+    :param node: Выражение.
+    """
+    return __signed(node) == 0
+
+
+def to_source(node: ast.expr, module: str | None = None) -> str:
+    """
+    Текст выражения на языке Python.
+
+    :param node: Выражение.
+    :param module: Имя модуля, из которого вызываются функции
+        (например, math или np). По умолчанию функции записываются
+        без имени модуля.
+
+    :return: Текст выражения.
+    """
+    if module is not None:
+        node = __qualify_functions(node, module)
+    return ast.unparse(ast.fix_missing_locations(node))
+
+
+def __qualify_functions(node: ast.expr, module: str) -> ast.expr:
+    """
+    Замена вызовов f(u) на module.f(u).
+
+    :param node: Выражение.
+    :param module: Имя модуля.
+
+    :return: Новое выражение (исходное не изменяется).
+    """
+    if isinstance(node, ast.Call):
+        return ast.Call(
+            ast.Attribute(ast.Name(module, ast.Load()), node.func.id,
+                          ast.Load()),
+            [__qualify_functions(node.args[0], module)],
+            []
+        )
+    if isinstance(node, ast.BinOp):
+        return ast.BinOp(
+            __qualify_functions(node.left, module),
+            node.op,
+            __qualify_functions(node.right, module)
+        )
+    if isinstance(node, ast.UnaryOp):
+        return ast.UnaryOp(node.op, __qualify_functions(node.operand, module))
+    return node
+
+
+def substitute(node: ast.expr, values: dict[str, float]) -> ast.expr:
+    """
+    Подстановка чисел вместо имён с упрощением. Например, после
+    подстановки нулевых коэффициентов слагаемые с ними исчезают.
+
+    :param node: Выражение.
+    :param values: Значения по именам.
+
+    :return: Новое выражение (исходное не изменяется).
+    """
+    for name, value in values.items():
+        node = __substitute(node, name, __constant(value))
+    return node
+
+
+def constant_value(node: ast.expr) -> float | None:
+    """
+    Значение выражения, являющегося числом.
+
+    :param node: Выражение.
+
+    :return: Значение или None, если выражение зависит от имён.
+    """
+    return __signed(node)
@@ -0,0 +1,198 @@
+"""
+    Сбор статистики работы методов поиска циклов
+
+    Статистика собирается, только если в функции поиска передан
+    объект SearchStatistics, поэтому без него дополнительных
+    вычислений не выполняется.
+
+    Автор: Петряшев К. С.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Final
+
+import numpy as np
+
+
+# Причины завершения построения траектории
+# Выполнены условия положительного выхода - траектория замкнулась
+EXIT_POSITIVE: Final = 'positive'
+# Выполнены условия отрицательного выхода
+EXIT_NEGATIVE: Final = 'negative'
+# Получены неконечные значения - траектория уходит на бесконечность
+EXIT_OVERFLOW: Final = 'overflow'
+# Траектория вышла за радиус models.divergence.BLOW_UP_RADIUS
+EXIT_DIVERGED: Final = 'diverged'
+# Исчерпано ограничение на количество шагов или время
+EXIT_TIMEOUT: Final = 'timeout'
+# Траектория не вернулась на секущую прямую (метод с адаптивным шагом)
+EXIT_NO_RETURN: Final = 'no_return'
+# Начальная точка лежит в области, через которую не проходят циклы
+# (models.cycle_exclusion), и траектория не строилась
+EXIT_EXCLUDED: Final = 'excluded'
+
+# Этапы, время которых замеряется
+# Вычисление правой части уравнения
+PHASE_RHS: Final = 'rhs'
+# Восстановление траекторий после векторизованного поиска
+PHASE_RESTORE: Final = 'restore'
+# Чтение и запись кэша результатов
+PHASE_CACHE: Final = 'cache'
+# Построение областей, через которые не проходят циклы
+PHASE_EXCLUSION: Final = 'exclusion'
+# Поиск целиком
+PHASE_SEARCH: Final = 'search'
+
+
+class SearchStatistics:
+    """
+    Счётчики и замеры времени одного или нескольких поисков циклов:
+    количество вычислений правой части, принятых и отброшенных шагов,
+    причины завершения траекторий, результаты проверки точек и время
+    отдельных этапов.
+    """
+
+    def __init__(self):
+        self.rhs_evaluations = 0
+        self.steps = 0
+        self.rejected_steps = 0
+        # Количество траекторий по причинам завершения (EXIT_*)
+        self.exits: dict[str, int] = {}
+        # Количество точек по результатам проверки
+        # (models.runge_kutta.STATUS_*)
+        self.statuses: dict[str, int] = {}
+        # Суммарное время этапов (PHASE_*) в секундах
+        self.timings: dict[str, float] = {}
+
+    def count_exit(
+        self,
+        reason: str,
+        count: int = 1,
+        steps: int = 0,
+        rhs_evaluations: int = 0
+    ) -> None:
+        """
+        Учёт завершения построения траекторий.
+
+        :param reason: Причина завершения (EXIT_*).
+        :param count: Количество траекторий.
+        :param steps: Количество шагов, сделанных этими траекториями.
+        :param rhs_evaluations: Количество вычислений правой части,
+            не учтённых обёрткой counting (например, в скомпилированном
+            цикле).
+        """
+        if count:
+            self.exits[reason] = self.exits.get(reason, 0) + count
+        self.steps += steps
+        self.rhs_evaluations += rhs_evaluations
+
+    def count_status(self, status: str, count: int = 1) -> None:
+        """
+        Учёт результата проверки точек.
+
+        :param status: Результат проверки.
+        :param count: Количество точек.
+        """
+        if count:
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        """
+        Учёт времени этапа.
+
+        :param phase: Этап (PHASE_*).
+        :param seconds: Время в секундах.
+        """
+        self.timings[phase] = self.timings.get(phase, 0.) + seconds
+
+    @contextmanager
+    def timer(self, phase: str):
+        """
+        Контекстный менеджер, замеряющий время этапа.
+
+        :param phase: Этап (PHASE_*).
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - started)
+
+    def counting(self, ode: callable) -> callable:
+        """
+        Обёртка правой части уравнения, подсчитывающая её вычисления
+        и замеряющая их время. Для массива точек формы (2, N)
+        учитывается N вычислений.
+
+        :param ode: Функция, задающая дифференциальное уравнение.
+
+        :return: Функция с той же сигнатурой.
+        """
+        def wrapper(x0: np.ndarray, *args, **kwargs) -> np.ndarray:
+            started = time.perf_counter()
+            result = ode(x0, *args, **kwargs)
+            self.add_time(PHASE_RHS, time.perf_counter() - started)
+            self.rhs_evaluations += x0.shape[1] if x0.ndim == 2 else 1
+            return result
+        return wrapper
+
+    def merge(self, other: 'SearchStatistics') -> None:
+        """
+        Добавление статистики другого поиска (например, выполненного
+        в отдельном процессе).
+
+        :param other: Статистика, которую нужно добавить.
+        """
+        self.rhs_evaluations += other.rhs_evaluations
+        self.steps += other.steps
+        self.rejected_steps += other.rejected_steps
+        for reason, count in other.exits.items():
+            self.count_exit(reason, count)
+        for status, count in other.statuses.items():
+            self.count_status(status, count)
+        for phase, seconds in other.timings.items():
+            self.add_time(phase, seconds)
+
+    def as_dict(self) -> dict:
+        """Статистика в виде словаря (например, для записи в JSON)"""
+        return {
+            'rhs_evaluations': self.rhs_evaluations,
+            'steps': self.steps,
+            'rejected_steps': self.rejected_steps,
+            'exits': dict(self.exits),
+            'statuses': dict(self.statuses),
+            'timings': dict(self.timings)
+        }
+
+    def __str__(self) -> str:
+        lines = [
+            f'Вычислений правой части: {self.rhs_evaluations}',
+            f'Шагов: {self.steps}, отброшено: {self.rejected_steps}'
+        ]
+        if self.statuses:
+            lines.append('Точек: ' + ', '.join(
+                f'{status} {count}'
+                for status, count in self.statuses.items()
+            ))
+        if self.exits:
+            lines.append('Завершение траекторий: ' + ', '.join(
+                f'{reason} {count}' for reason, count in self.exits.items()
+            ))
+        if self.timings:
+            lines.append('Время, с: ' + ', '.join(
+                f'{phase} {seconds:.3f}'
+                for phase, seconds in self.timings.items()
+            ))
+        return '\n'.join(lines)
+
+
+def timer(statistics: SearchStatistics | None, phase: str):
+    """
+    Замер времени этапа, если статистика собирается.
+
+    :param statistics: Статистика или None.
+    :param phase: Этап (PHASE_*).
+
+    :return: Контекстный менеджер.
+    """
+    return nullcontext() if statistics is None else statistics.timer(phase)
@@ -0,0 +1,69 @@
+"""
+    Набор уже обработанных полуинтервалов целочисленной сетки
+
+    Автор: Петряшев К. С.
+"""
+
+
+class IntervalIndex:
+    """
+    Объединение непересекающихся полуинтервалов [start, end)
+    целых чисел. Используется для учёта уже просмотренных
+    участков сетки значений x'(0).
+    """
+
+    def __init__(self):
+        # Отсортированные непересекающиеся и несоприкасающиеся полуинтервалы
+        self.__intervals: list[tuple[int, int]] = []
+
+    def __iter__(self):
+        return iter(self.__intervals)
+
+    def __len__(self) -> int:
+        return len(self.__intervals)
+
+    def add(self, start: int, end: int) -> None:
+        """
+        Добавить полуинтервал, объединив его с пересекающимися
+        и соседними полуинтервалами.
+
+        :param start: Начало полуинтервала.
+        :param end: Конец полуинтервала (не включается).
+        """
+        if start >= end:
+            return
+        merged = []
+        for left, right in self.__intervals:
+            if right < start or left > end:
+                merged.append((left, right))
+            else:
+                start, end = min(start, left), max(end, right)
+        merged.append((start, end))
+        self.__intervals = sorted(merged)
+
+    def uncovered(self, start: int, end: int) -> list[tuple[int, int]]:
+        """
+        Получить части полуинтервала, ещё не входящие в набор.
+
+        :param start: Начало полуинтервала.
+        :param end: Конец полуинтервала (не включается).
+
+        :return: Отсортированный список непокрытых полуинтервалов.
+        """
+        gaps = []
+        position = start
+        for left, right in self.__intervals:
+            if right <= position:
+                continue
+            if left >= end:
+                break
+            if left > position:
+                gaps.append((position, left))
+            position = max(position, right)
+        if position < end:
+            gaps.append((position, end))
+        return gaps
+
+    def clear(self) -> None:
+        """Очистить набор"""
+        self.__intervals = []
@@ -0,0 +1,626 @@
+"""
+    Реестр систем дифференциальных уравнений
+
+    Система x' = f(x, y), y' = g(x, y) объявляется один раз: названиями
+    коэффициентов с их значениями по умолчанию и выражениями правых
+    частей (см. models.expressions). По объявлению генерируется модуль
+    системы, в котором есть:
+        - правая часть и дивергенция для чисел с плавающей точкой;
+        - правая часть, матрица Якоби и дивергенция для массивов numpy;
+        - цикл метода Рунге-Кутты с проверкой замыкания траектории
+          (CYCLE_LOOP_TEMPLATE), в который встроена правая часть,
+          скомпилированный numba при её наличии.
+
+    Модуль системы записывается в файл в каталоге KERNEL_DIRECTORY:
+    numba кэширует скомпилированный код только для функций, объявленных
+    в файле, а без кэша компиляция цикла занимает несколько секунд
+    в каждом процессе. Имя файла содержит хэш его текста, поэтому
+    изменённое объявление или цикл не используют устаревший код.
+    Если каталог недоступен для записи, модуль создаётся в памяти.
+
+    Автор: Петряшев К. С.
+"""
+import ast
+import hashlib
+import importlib.util
+import keyword
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import Callable, Final
+
+import numpy as np
+
+from models.expressions import (
+    FUNCTIONS,
+    add_expressions,
+    differentiate,
+    parse_expression,
+    to_source
+)
+from models.paths import DEFAULT_CACHE_DIRECTORY
+
+
+# Каталог сгенерированных модулей систем
+KERNEL_DIRECTORY: Final = os.path.join(DEFAULT_CACHE_DIRECTORY, 'kernels')
+
+# Имена переменных системы
+VARIABLES: Final = ('x', 'y')
+
+# Имена, которые нельзя использовать для коэффициентов:
+# они заняты в тексте сгенерированного модуля
+RESERVED_NAMES: Final = (*VARIABLES, 'coefficients', 'math', 'np')
+
+# Система, используемая по умолчанию
+DEFAULT_SYSTEM: Final = 'quadratic'
+
+# Текст цикла метода Рунге-Кутты для модуля системы. Цикл не зависит
+# от системы: правая часть и дивергенция вызываются через функции
+# __rhs и __divergence, объявленные в модуле системы, поэтому каждая
+# система получает свой цикл со встроенной правой частью. Константы
+# импортируются модулем системы из models.rk4_kernels
+CYCLE_LOOP_TEMPLATE: Final = r'''def __rk4_cycle_loop(
+    x0: float,
+    y0: float,
+    coefficients: np.ndarray,
+    hop: float,
+    max_steps: int,
+    blow_up_radius: float,
+    trajectory: np.ndarray,
+    size: int,
+    state: np.ndarray
+) -> tuple:
+    """
+    Цикл метода Рунге-Кутты 4-го порядка с проверкой замыкания
+    траектории. Повторяет арифметику и условия выхода функции
+    models.runge_kutta.is_cycle.
+
+    Попутно находится время первого возвращения на прямую x = x0
+    в исходном направлении (линейной интерполяцией) и интеграл
+    дивергенции вдоль траектории, вычисляемый теми же стадиями метода.
+
+    Цикл можно продолжить с места остановки: его состояние хранится
+    в массиве state (см. models.rk4_kernels.initial_loop_state)
+    и обновляется при выходе.
+
+    :param x0: Начальное значение x.
+    :param y0: Начальное значение x'.
+    :param coefficients: Коэффициенты системы (см. kernel_coefficients).
+    :param hop: Шаг метода.
+    :param max_steps: Номер шага, после которого цикл останавливается.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность.
+    :param trajectory: Массив точек траектории формы (M, 2).
+    :param size: Количество записанных точек траектории.
+    :param state: Состояние цикла.
+
+    :return: Кортеж (код результата проверки, массив точек траектории,
+        количество записанных точек). Код UNDECIDED означает, что цикл
+        остановлен на шаге max_steps.
+    """
+    x = state[STATE_X]
+    y = state[STATE_Y]
+    count_x_intersections = int(state[STATE_INTERSECTIONS])
+    sum_differences = state[STATE_SUM_DIFFERENCES]
+    count_hops = int(state[STATE_HOPS])
+
+    # Направление движения по x в начале траектории,
+    # время возвращения и интеграл дивергенции
+    direction = state[STATE_DIRECTION]
+    return_time = state[STATE_RETURN_TIME]
+    log_multiplier = state[STATE_LOG_MULTIPLIER]
+
+    status = UNDECIDED
+    while count_hops < max_steps:
+        # Стадии метода
+        k1x, k1y = __rhs(x, y, coefficients)
+        x2 = x + k1x * hop / 2.
+        y2 = y + k1y * hop / 2.
+        k2x, k2y = __rhs(x2, y2, coefficients)
+        x3 = x + k2x * hop / 2.
+        y3 = y + k2y * hop / 2.
+        k3x, k3y = __rhs(x3, y3, coefficients)
+        x4 = x + k3x * hop
+        y4 = y + k3y * hop
+        k4x, k4y = __rhs(x4, y4, coefficients)
+
+        difference_x = (hop / 6.) * (k1x + 2 * k2x + 2 * k3x + k4x)
+        difference_y = (hop / 6.) * (k1y + 2 * k2y + 2 * k3y + k4y)
+
+        log_multiplier += (hop / 6.) * (
+            __divergence(x, y, coefficients)
+            + 2 * __divergence(x2, y2, coefficients)
+            + 2 * __divergence(x3, y3, coefficients)
+            + __divergence(x4, y4, coefficients)
+        )
+
+        previous_x = x
+        x += difference_x
+        y += difference_y
+
+        # Траектория уходит на бесконечность. Сравнение с NaN ложно,
+        # поэтому неконечные значения тоже не проходят проверку
+        if not (abs(x) <= blow_up_radius and abs(y) <= blow_up_radius):
+            if math.isfinite(x) and math.isfinite(y):
+                status = DIVERGED
+            else:
+                status = OVERFLOW
+            break
+
+        sum_differences += abs(difference_y)
+        count_hops += 1
+        tolerance = sum_differences / count_hops
+
+        # Удваиваем вместимость массива траектории при заполнении
+        if size == len(trajectory):
+            grown = np.empty((2 * size, 2))
+            grown[:size] = trajectory
+            trajectory = grown
+        trajectory[size, 0] = x
+        trajectory[size, 1] = y
+        size += 1
+
+        if count_hops == 1:
+            direction = difference_x
+
+        if (x > x0 and previous_x < x0) or (x < x0 and previous_x > x0):
+            count_x_intersections += 1
+            # Возвращение в исходном направлении
+            if math.isnan(return_time) and difference_x * direction > 0:
+                return_time = hop * (
+                    count_hops - 1 + (x0 - previous_x) / (x - previous_x)
+                )
+
+        if count_x_intersections >= 1 \
+                and abs(x0 - x) <= tolerance \
+                and abs(y0 - y) <= tolerance:
+            status = CYCLE
+            break
+
+        if count_x_intersections >= 2 and x - x0 >= tolerance:
+            status = NOT_CYCLE
+            break
+
+    state[STATE_X] = x
+    state[STATE_Y] = y
+    state[STATE_INTERSECTIONS] = count_x_intersections
+    state[STATE_SUM_DIFFERENCES] = sum_differences
+    state[STATE_HOPS] = count_hops
+    state[STATE_DIRECTION] = direction
+    state[STATE_RETURN_TIME] = return_time
+    state[STATE_LOG_MULTIPLIER] = log_multiplier
+    return status, trajectory, size
+'''
+
+
+class OdeSystem:
+    """
+    Система дифференциальных уравнений второго порядка
+
+        x' = f(x, y),
+        y' = g(x, y),
+
+    заданная выражениями правых частей. Матрица Якоби и дивергенция
+    находятся символьным дифференцированием при создании объекта,
+    модуль системы генерируется при первом обращении к kernels.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        coefficients: dict[str, float],
+        x_dot: str,
+        y_dot: str,
+        description: str = '',
+        equilibria: Callable[..., np.ndarray] | None = None
+    ):
+        """
+        Конструктор класса
+
+        :param name: Название системы (идентификатор Python).
+        :param coefficients: Названия коэффициентов и их значения
+            по умолчанию.
+        :param x_dot: Выражение правой части для x'.
+        :param y_dot: Выражение правой части для y'.
+        :param description: Описание системы.
+        :param equilibria: Функция, возвращающая положения равновесия
+            формы (K, 2) по коэффициентам, переданным по именам.
+            Если не задана, положения равновесия ищутся численно
+            (см. models.equilibria.find_equilibria).
+        """
+        if not name.isidentifier():
+            raise ValueError(f'Недопустимое название системы: {name!r}')
+        for coefficient in coefficients:
+            if not coefficient.isidentifier() \
+                    or keyword.iskeyword(coefficient) \
+                    or coefficient.startswith('_') \
+                    or coefficient in RESERVED_NAMES \
+                    or coefficient in FUNCTIONS:
+                raise ValueError(
+                    f'Недопустимое название коэффициента: {coefficient!r}'
+                )
+
+        self.__name = name
+        self.__description = description
+        self.__defaults = {
+            coefficient: float(value)
+            for coefficient, value in coefficients.items()
+        }
+        self.__equilibria = equilibria
+
+        names = (*VARIABLES, *self.__defaults)
+        self.__rhs = (
+            parse_expression(x_dot, names),
+            parse_expression(y_dot, names)
+        )
+        self.__jacobian = tuple(
+            tuple(differentiate(expression, variable)
+                  for variable in VARIABLES)
+            for expression in self.__rhs
+        )
+        self.__divergence = add_expressions(
+            self.__jacobian[0][0], self.__jacobian[1][1]
+        )
+
+        self.__kernels = None
+        self.__lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """Название системы"""
+        return self.__name
+
+    @property
+    def description(self) -> str:
+        """Описание системы"""
+        return self.__description
+
+    @property
+    def coefficient_names(self) -> tuple[str, ...]:
+        """Названия коэффициентов в порядке объявления"""
+        return tuple(self.__defaults)
+
+    @property
+    def defaults(self) -> dict[str, float]:
+        """Значения коэффициентов по умолчанию"""
+        return dict(self.__defaults)
+
+    @property
+    def expressions(self) -> tuple[str, str]:
+        """Выражения правых частей для x' и y'"""
+        return tuple(to_source(expression) for expression in self.__rhs)
+
+    @property
+    def jacobian_expressions(self) -> tuple[tuple[str, str], ...]:
+        """Выражения элементов матрицы Якоби по строкам"""
+        return tuple(
+            tuple(to_source(expression) for expression in row)
+            for row in self.__jacobian
+        )
+
+    @property
+    def divergence_expression(self) -> str:
+        """Выражение дивергенции (следа матрицы Якоби)"""
+        return to_source(self.__divergence)
+
+    def coefficient_values(self, **kwargs) -> tuple[float, ...]:
+        """
+        Значения коэффициентов в порядке объявления. Отсутствующие
+        коэффициенты заменяются значениями по умолчанию, остальные
+        параметры игнорируются.
+
+        :param kwargs: Значения коэффициентов по названиям.
+
+        :return: Значения коэффициентов.
+        """
+        return tuple(
+            float(kwargs.get(name, default))
+            for name, default in self.__defaults.items()
+        )
+
+    def equilibria(self, coefficients: tuple[float, ...]) -> np.ndarray | None:
+        """
+        Положения равновесия, заданные при объявлении системы.
+
+        :param coefficients: Значения коэффициентов в порядке объявления.
+
+        :return: Массив формы (K, 2) или None, если функция положений
+            равновесия не задана.
+        """
+        if self.__equilibria is None:
+            return None
+        return np.array(
+            self.__equilibria(**dict(zip(self.__defaults, coefficients))),
+            dtype=np.float64
+        ).reshape(-1, 2)
+
+    def __function_source(
+        self,
+        name: str,
+        expressions: tuple,
+        module: str,
+        description: str
+    ) -> str:
+        """
+        Текст функции модуля системы.
+
+        :param name: Имя функции.
+        :param expressions: Выражения возвращаемых значений.
+        :param module: Модуль математических функций: math или np.
+        :param description: Строка документации.
+
+        :return: Текст функции.
+        """
+        lines = [
+            f'def {name}(x, y, coefficients):',
+            f'    """{description}"""'
+        ]
+        used = {
+            node.id
+            for expression in expressions
+            for node in ast.walk(expression)
+            if isinstance(node, ast.Name)
+        }
+        lines.extend(
+            f'    {coefficient} = coefficients[{index}]'
+            for index, coefficient in enumerate(self.__defaults)
+            if coefficient in used
+        )
+        values = ', '.join(
+            to_source(expression, module) for expression in expressions
+        )
+        lines.append(
+            f'    return {values}' if len(expressions) == 1
+            else f'    return ({values})'
+        )
+        return '\n'.join(lines)
+
+    def source(self) -> str:
+        """
+        Текст модуля системы.
+
+        :return: Исходный текст модуля.
+        """
+        jacobian = self.__jacobian
+        functions = (
+            self.__function_source(
+                'rhs_scalar', self.__rhs, 'math',
+                "Значения x' и y' для чисел с плавающей точкой"
+            ),
+            self.__function_source(
+                'divergence_scalar', (self.__divergence,), 'math',
+                'Дивергенция для чисел с плавающей точкой'
+            ),
+            self.__function_source(
+                'rhs_array', self.__rhs, 'np',
+                "Значения x' и y' для массивов"
+            ),
+            self.__function_source(
+                'jacobian_array',
+                (*jacobian[0], *jacobian[1]),
+                'np',
+                'Элементы матрицы Якоби по строкам для массивов'
+            ),
+            self.__function_source(
+                'divergence_array', (self.__divergence,), 'np',
+                'Дивергенция для массивов'
+            )
+        )
+        x_dot, y_dot = self.expressions
+        return '\n'.join((
+            '"""',
+            f'    Модуль системы {self.__name!r}, сгенерированный',
+            '    models.ode_registry. Не редактируется вручную.',
+            '',
+            f"    x' = {x_dot}",
+            f"    y' = {y_dot}",
+            '"""',
+            '# pylint: skip-file',
+            'import math',
+            '',
+            'import numpy as np',
+            '',
+            'from models.rk4_kernels import (',
+            '    CYCLE,',
+            '    DIVERGED,',
+            '    NOT_CYCLE,',
+            '    OVERFLOW,',
+            '    STATE_DIRECTION,',
+            '    STATE_HOPS,',
+            '    STATE_INTERSECTIONS,',
+            '    STATE_LOG_MULTIPLIER,',
+            '    STATE_RETURN_TIME,',
+            '    STATE_SUM_DIFFERENCES,',
+            '    STATE_X,',
+            '    STATE_Y,',
+            '    UNDECIDED,',
+            '    jit',
+            ')',
+            '',
+            f'COEFFICIENT_NAMES = {self.coefficient_names!r}',
+            '',
+            *(f'\n{function}\n' for function in functions),
+            '',
+            '__rhs = jit(rhs_scalar, inline=True)',
+            '__divergence = jit(divergence_scalar, inline=True)',
+            '',
+            '',
+            CYCLE_LOOP_TEMPLATE,
+            '',
+            'rk4_cycle_loop = jit(__rk4_cycle_loop)',
+            ''
+        ))
+
+    @property
+    def kernels(self) -> ModuleType:
+        """
+        Модуль системы: функции rhs_scalar, divergence_scalar,
+        rhs_array, jacobian_array, divergence_array и rk4_cycle_loop
+        (см. CYCLE_LOOP_TEMPLATE). Функции принимают x, y и коэффициенты
+        в порядке объявления.
+        """
+        with self.__lock:
+            if self.__kernels is None:
+                self.__kernels = self.__load_kernels()
+        return self.__kernels
+
+    def __load_kernels(self) -> ModuleType:
+        """
+        Запись модуля системы в файл, если его нет или его содержимое
+        не совпадает с хэшем в имени, и импорт. Если каталог
+        KERNEL_DIRECTORY недоступен для записи, модуль создаётся
+        в памяти: всё работает так же, но numba компилирует цикл
+        заново в каждом процессе.
+
+        :return: Модуль системы.
+        """
+        source = self.source().encode()
+        digest = hashlib.sha256(source).hexdigest()[:16]
+        module_name = f'ode_{self.__name}_{digest}'
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+
+        try:
+            path = write_kernels(module_name, source, digest)
+        except OSError:
+            path = None
+
+        if path is None:
+            module = ModuleType(module_name)
+            code = compile(source, f'<{module_name}>', 'exec')
+        else:
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            if path is None:
+                exec(code, module.__dict__)  # pylint: disable=exec-used
+            else:
+                spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+        return module
+
+    def __repr__(self) -> str:
+        x_dot, y_dot = self.expressions
+        return f"<OdeSystem {self.__name}: x' = {x_dot}, y' = {y_dot}>"
+
+
+def write_kernels(module_name: str, source: bytes, digest: str) -> str:
+    """
+    Запись модуля системы в каталог KERNEL_DIRECTORY.
+
+    Файл с верным хэшем текста не перезаписывается: numba сбрасывает
+    кэш при изменении времени модификации файла. Повреждённый или
+    изменённый файл записывается заново. Запись через временный файл
+    защищает от чтения недописанного модуля другим процессом.
+
+    :param module_name: Имя модуля.
+    :param source: Текст модуля.
+    :param digest: Хэш текста (см. file_digest).
+
+    :return: Путь к файлу модуля.
+    """
+    os.makedirs(KERNEL_DIRECTORY, exist_ok=True)
+    path = os.path.join(KERNEL_DIRECTORY, f'{module_name}.py')
+    if file_digest(path) != digest:
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(source)
+        os.replace(temporary, path)
+    return path
+
+
+def file_digest(path: str) -> str | None:
+    """
+    Хэш содержимого файла в том виде, в каком он входит в имя
+    модуля системы.
+
+    :param path: Путь к файлу.
+
+    :return: Первые 16 символов SHA-256 или None, если файл
+        не удалось прочитать.
+    """
+    try:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()[:16]
+    except OSError:
+        return None
+
+
+# Зарегистрированные системы по названиям
+__systems: dict[str, OdeSystem] = {}
+
+
+def register_system(system: OdeSystem, replace: bool = False) -> OdeSystem:
+    """
+    Регистрация системы.
+
+    Для параллельных расчётов система должна регистрироваться
+    при импорте модуля, чтобы она была доступна в дочерних процессах.
+
+    :param system: Система.
+    :param replace: Заменять ли систему с тем же названием.
+
+    :return: Зарегистрированная система.
+    """
+    if system.name in __systems and not replace:
+        raise ValueError(f'Система {system.name!r} уже зарегистрирована')
+    __systems[system.name] = system
+    return system
+
+
+def get_system(name: str = DEFAULT_SYSTEM) -> OdeSystem:
+    """
+    Зарегистрированная система по названию.
+
+    :param name: Название системы.
+
+    :return: Система.
+    """
+    try:
+        return __systems[name]
+    except KeyError:
+        raise ValueError(
+            f'Неизвестная система: {name!r}. '
+            f'Доступны: {", ".join(__systems)}'
+        ) from None
+
+
+def system_names() -> tuple[str, ...]:
+    """Названия зарегистрированных систем"""
+    return tuple(__systems)
+
+
+def __quadratic_equilibria(a1: float, **kwargs) -> np.ndarray:
+    """
+    Положения равновесия квадратичной системы. При y = 0 второе
+    уравнение принимает вид -x - a1 * x^2 = 0, откуда x = 0
+    или x = -1 / a1.
+
+    :param a1: Коэффициент a1.
+    :param kwargs: Остальные коэффициенты не влияют на результат.
+    """
+    if a1 == 0:
+        return np.zeros((1, 2))
+    return np.array([[0., 0.], [-1. / a1, 0.]])
+
+
+register_system(OdeSystem(
+    'quadratic',
+    {'mu': 0.0, 'a1': 0.0, 'a2': 0.0, 'a3': 0.0},
+    'y',
+    'mu * y - x - a1 * (x * x) - a2 * x * y - a3 * (y * y)',
+    description="x'' - mu * x' + x + a1 * x^2 + a2 * x * x' + a3 * x'^2 = 0",
+    equilibria=__quadratic_equilibria
+))
+
+register_system(OdeSystem(
+    'van_der_pol',
+    {'mu': 0.0},
+    'y',
+    'mu * (1 - x * x) * y - x',
+    description="x'' - mu * (1 - x^2) * x' + x = 0"
+))
@@ -3,9 +3,19 @@
     
     Автор: Кирилл Петряшев
 """
+from functools import lru_cache
+from typing import Final
 
 import numpy as np
 
+from models.ode_registry import DEFAULT_SYSTEM, OdeSystem, get_system
+from models.rk4_kernels import kernel_coefficients
+
+
+# Количество правых частей с зафиксированными коэффициентами,
+# которые equation хранит между вызовами
+EQUATION_CACHE_SIZE: Final = 64
+
 
 # В сигнатуре функции задан необязательный параметр t
 # Это сделано для совместимости функции задающей наше уравнение с
@@ -25,21 +35,168 @@ def equation(x0: np.ndarray, t: np.ndarray, **kwargs) -> np.ndarray:
         x' = y
         y' = mu * y - x - a1 * x^2 - a2 * x * y + a3 * y^2
 
+        Другая система из реестра models.ode_registry выбирается
+        параметром system. Объект BoundEquation для тех же системы
+        и параметров создаётся один раз (см. bound_equation).
+
         :param x0: Массив начальных условий x(0) и x'(0)
         :param t: Массив значений t
         :param args: Значения дифференциального уравнения
 
         :returns: Значения x' и x'' при заданных начальных условиях
     """
-    x, y = x0
+    system = get_system(kwargs.pop('system', DEFAULT_SYSTEM))
+    try:
+        rhs = bound_equation(system, frozenset(kwargs.items()))
+    except TypeError:
+        # Нехэшируемые параметры (например, массивы) не кэшируются
+        rhs = BoundEquation(system.name, **kwargs)
+    return rhs(x0)
+# pylint: enable=unused-argument
 
-    mu = kwargs.get('mu', 0.0)
-    a1 = kwargs.get('a1', 0.0)
-    a2 = kwargs.get('a2', 0.0)
-    a3 = kwargs.get('a3', 0.0)
 
-    return np.array([
-        y,
-        mu * y - x - a1 * x ** 2 - a2 * x * y - a3 * y ** 2
-    ])
-# pylint: enable=unused-argument
+@lru_cache(maxsize=EQUATION_CACHE_SIZE)
+def bound_equation(
+    system: OdeSystem,
+    parameters: frozenset[tuple[str, object]]
+) -> 'BoundEquation':
+    """
+    Правая часть системы с зафиксированными коэффициентами
+    для повторных вызовов equation с теми же параметрами.
+
+    Ключом служит сам объект системы, а не её название, поэтому
+    после замены системы в реестре (register_system с replace=True)
+    создаётся новый объект.
+
+    :param system: Система уравнений.
+    :param parameters: Пары (название, значение) параметров equation.
+
+    :return: Правая часть уравнения.
+    """
+    return BoundEquation(system.name, **dict(parameters))
+
+
+class BoundEquation:
+    """
+    Правая часть системы из реестра models.ode_registry
+    с зафиксированными коэффициентами.
+
+    Коэффициенты разбираются один раз при создании объекта, поэтому
+    при каждом вычислении не тратится время на разбор kwargs.
+    Вычисления выполняются функциями модуля, сгенерированного
+    по объявлению системы. Объект совместим по сигнатуре с equation
+    и может передаваться в методы Рунге-Кутты вместо неё.
+    """
+
+    def __init__(self, system: str = DEFAULT_SYSTEM, **kwargs):
+        """
+        Конструктор класса
+
+        :param system: Название системы в реестре models.ode_registry.
+        :param kwargs: Коэффициенты системы (для системы по умолчанию -
+            mu, a1, a2, a3). Отсутствующие коэффициенты заменяются
+            значениями по умолчанию, остальные параметры игнорируются.
+        """
+        self.__system = get_system(system)
+        self.__coefficients = self.__system.coefficient_values(**kwargs)
+        kernels = self.__system.kernels
+        self.__rhs_array = kernels.rhs_array
+        self.__rhs_scalar = kernels.rhs_scalar
+        self.__jacobian_array = kernels.jacobian_array
+        self.__divergence_array = kernels.divergence_array
+
+    @property
+    def system(self) -> OdeSystem:
+        """Система уравнений"""
+        return self.__system
+
+    @property
+    def coefficients(self) -> tuple[float, ...]:
+        """
+        Коэффициенты системы в порядке объявления
+        (для системы по умолчанию - mu, a1, a2, a3)
+        """
+        return self.__coefficients
+
+    @property
+    def named_coefficients(self) -> dict[str, float]:
+        """Коэффициенты системы по названиям"""
+        return dict(zip(self.__system.coefficient_names, self.__coefficients))
+
+    @property
+    def kernel_coefficients(self) -> np.ndarray | tuple[float, ...]:
+        """Коэффициенты для цикла rk4_cycle_loop модуля системы"""
+        return kernel_coefficients(self.__coefficients)
+
+    # Параметры t и kwargs нужны для совместимости с equation
+    #
+    # pylint: disable=unused-argument
+    def __call__(
+        self,
+        x0: np.ndarray,
+        t: float = 0.0,
+        out: np.ndarray | None = None,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Вычисление правой части уравнения.
+
+        :param x0: Массив значений x и x' формы (2,) или (2, N).
+        :param t: Значение t.
+        :param out: Массив той же формы, куда будет записан результат.
+            Если не задан, создаётся новый массив.
+        :param kwargs: Игнорируются.
+
+        :returns: Значения x' и x''.
+        """
+        x, y = x0
+        if out is None:
+            out = np.empty(np.shape(x0))
+        out[0], out[1] = self.__rhs_array(x, y, self.__coefficients)
+        return out
+    # pylint: enable=unused-argument
+
+    def scalar(self, x: float, y: float) -> tuple[float, float]:
+        """
+        Вычисление правой части уравнения для чисел с плавающей точкой,
+        без создания массивов.
+
+        :param x: Значение x.
+        :param y: Значение x'.
+
+        :returns: Значения x' и x''.
+        """
+        return self.__rhs_scalar(x, y, self.__coefficients)
+
+    def jacobian(self, x0: np.ndarray) -> np.ndarray:
+        """
+        Матрица Якоби правой части уравнения.
+
+        :param x0: Массив значений x и x' формы (2,) или (2, N).
+
+        :returns: Матрица формы (2, 2) или массив матриц формы (2, 2, N).
+        """
+        x, y = x0
+        shape = np.broadcast(x, y).shape
+        return np.array([
+            np.broadcast_to(value, shape)
+            for value in self.__jacobian_array(x, y, self.__coefficients)
+        ], dtype=np.float64).reshape((2, 2, *shape))
+
+    def divergence(self, x0: np.ndarray) -> np.ndarray | float:
+        """
+        Дивергенция правой части уравнения (след матрицы Якоби).
+        Её интеграл вдоль цикла равен логарифму нетривиального
+        мультипликатора Флоке (формула Лиувилля).
+
+        :param x0: Массив значений x и x' формы (2,) или (2, N).
+
+        :returns: Значение или массив значений формы (N,).
+        """
+        x, y = x0
+        divergence = self.__divergence_array(x, y, self.__coefficients)
+        # Постоянная дивергенция (например, у линейной системы)
+        # вычисляется как число
+        if np.ndim(divergence) == 0 and (np.ndim(x) or np.ndim(y)):
+            return np.full(np.broadcast(x, y).shape, divergence, dtype=float)
+        return divergence
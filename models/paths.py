@@ -0,0 +1,16 @@
+"""
+    Каталоги файлов, которые программа создаёт сама
+
+    Автор: Петряшев К. С.
+"""
+import os
+from typing import Final
+
+
+# Каталог кэша по умолчанию: записи кэша результатов поиска
+# (models.result_cache) и сгенерированные модули систем
+# (models.ode_registry)
+DEFAULT_CACHE_DIRECTORY: Final = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+    'graduate-work'
+)
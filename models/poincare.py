@@ -0,0 +1,431 @@
+"""
+    Поиск предельных циклов через отображение Пуанкаре
+    на прямой x = x0
+
+    Секущая прямая делится на две полупрямые по знаку x' в её точках:
+    траектория возвращается на ту полупрямую, с которой стартовала,
+    поэтому каждая полупрямая отображается в себя. Там, где x' = 0
+    (касание прямой или положение равновесия на ней), отображение
+    разрывно, поэтому отрезки поиска корня через такие точки
+    не проходят.
+
+    Автор: Петряшев К. С.
+"""
+from typing import Final, Iterator
+
+import numpy as np
+
+from models.runge_kutta import divergence_function, poincare_return
+
+# Шаг грубой сетки, на которой ищется смена знака P(y) - y.
+COARSE_STEP: Final = 0.02
+
+# Точность интегрирования при вычислении отображения Пуанкаре.
+POINCARE_RTOL: Final = 1e-9
+POINCARE_ATOL: Final = 1e-12
+
+# Точность уточнения x'(0) цикла и максимальное число итераций.
+XTOL: Final = 1e-10
+MAX_ITERATIONS: Final = 100
+
+# Наибольшее значение |P(y) - y| в найденном корне. Метод Брента
+# сходится и к точке разрыва P(y) - y, в которой траектория
+# не замыкается
+CLOSURE_TOLERANCE: Final = 1e-6
+
+# Циклы совпадают, если их периоды отличаются не больше чем
+# на PERIOD_TOLERANCE (относительно), а точки пересечения секущей
+# прямой - не больше чем на SECTION_TOLERANCE
+PERIOD_TOLERANCE: Final = 1e-6
+SECTION_TOLERANCE: Final = 1e-6
+
+
+def crossing_direction(x0: float, y: float, ode: callable, **kwargs) -> float:
+    """
+    Знак x' в точке (x0, y) секущей прямой: 1, если траектория
+    пересекает прямую слева направо, -1 - справа налево, 0 -
+    при касании или в положении равновесия.
+
+    :param x0: Абсцисса секущей прямой.
+    :param y: Значение x'(0) на секущей прямой.
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param kwargs: Параметры дифференциального уравнения.
+    """
+    return float(np.sign(
+        ode(np.array([x0, y], dtype=np.float64), 0.0, **kwargs)[0]
+    ))
+
+
+def return_map_difference(
+    x0: float,
+    y: float,
+    ode: callable,
+    rtol: float = POINCARE_RTOL,
+    atol: float = POINCARE_ATOL,
+    **kwargs
+) -> float:
+    """
+    Функция вычисляет разность P(y) - y, где P - отображение Пуанкаре
+    прямой x = x0 в себя.
+
+    :param x0: Абсцисса секущей прямой.
+    :param y: Значение x'(0) на секущей прямой.
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Значение P(y) - y или nan, если траектория не вернулась
+        на секущую прямую.
+    """
+    section_return = poincare_return(
+        np.array([x0, y], dtype=np.float64), ode, rtol, atol, **kwargs
+    )
+    if section_return['return_point'] is None:
+        return np.nan
+    return section_return['return_point'][1] - y
+
+
+def brent(
+    function: callable,
+    left: float,
+    right: float,
+    f_left: float,
+    f_right: float,
+    xtol: float = XTOL,
+    max_iterations: int = MAX_ITERATIONS
+) -> float:
+    """
+    Поиск корня функции на отрезке со сменой знака методом Брента
+    (сочетание обратной квадратичной интерполяции, секущих и бисекции).
+
+    :param function: Функция одной переменной.
+    :param left: Левая граница отрезка.
+    :param right: Правая граница отрезка.
+    :param f_left: Значение функции на левой границе.
+    :param f_right: Значение функции на правой границе.
+    :param xtol: Допустимая погрешность корня.
+    :param max_iterations: Максимальное количество итераций.
+
+    :return: Приближённое значение корня.
+    """
+    a, b, fa, fb = left, right, f_left, f_right
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iterations):
+        # Точка b - лучшее приближение, корень лежит между b и c
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tolerance = 2 * np.finfo(float).eps * abs(b) + xtol / 2
+        middle = (c - b) / 2
+        if abs(middle) <= tolerance or fb == 0:
+            return b
+
+        if abs(e) >= tolerance and abs(fa) > abs(fb):
+            # Пробуем интерполяцию
+            s = fb / fa
+            if a == c:
+                # Метод секущих
+                p = 2 * middle * s
+                q = 1 - s
+            else:
+                # Обратная квадратичная интерполяция
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * middle * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            if 2 * p < min(3 * middle * q - abs(tolerance * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                # Интерполяция неудачна - делаем шаг бисекции
+                d = e = middle
+        else:
+            d = e = middle
+
+        a, fa = b, fb
+        b += d if abs(d) > tolerance else np.copysign(tolerance, middle)
+        fb = function(b)
+    return b
+
+
+def refine_cycle(
+    x0: float,
+    left: float,
+    right: float,
+    ode: callable,
+    rtol: float = POINCARE_RTOL,
+    atol: float = POINCARE_ATOL,
+    xtol: float = XTOL,
+    **kwargs
+) -> float | None:
+    """
+    Поиск x'(0) предельного цикла на отрезке [left, right] прямой x = x0.
+
+    :param x0: Абсцисса секущей прямой.
+    :param left: Левая граница отрезка x'(0).
+    :param right: Правая граница отрезка x'(0).
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param xtol: Допустимая погрешность значения x'(0) цикла.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Значение x'(0) цикла или None, если на концах отрезка
+        P(y) - y не меняет знак, концы отрезка лежат на разных
+        полупрямых секущей или траектория из найденного корня
+        не замыкается.
+    """
+    def difference(y: float) -> float:
+        return return_map_difference(x0, y, ode, rtol, atol, **kwargs)
+
+    direction = crossing_direction(x0, left, ode, **kwargs)
+    if direction == 0 or \
+            crossing_direction(x0, right, ode, **kwargs) != direction:
+        return None
+
+    f_left, f_right = difference(left), difference(right)
+    if np.isnan(f_left) or np.isnan(f_right) or f_left * f_right > 0:
+        return None
+    root = brent(difference, left, right, f_left, f_right, xtol)
+    if closed_return(x0, root, ode, rtol, atol, **kwargs) is None:
+        return None
+    return root
+
+
+def closed_return(
+    x0: float,
+    root: float,
+    ode: callable,
+    rtol: float = POINCARE_RTOL,
+    atol: float = POINCARE_ATOL,
+    **kwargs
+) -> dict | None:
+    """
+    Проверка того, что траектория из найденного корня замыкается.
+
+    :param x0: Абсцисса секущей прямой.
+    :param root: Корень, найденный методом Брента.
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Результат models.runge_kutta.poincare_return для корня
+        или None, если траектория не вернулась или |P(root) - root|
+        больше CLOSURE_TOLERANCE (корень - точка разрыва).
+    """
+    section_return = poincare_return(
+        np.array([x0, root], dtype=np.float64), ode, rtol, atol, **kwargs
+    )
+    return_point = section_return['return_point']
+    if return_point is None or \
+            abs(return_point[1] - root) > CLOSURE_TOLERANCE:
+        return None
+    return section_return
+
+
+def section_points(root: float, section_return: dict) -> tuple[float, ...]:
+    """
+    Значения x' точек, в которых цикл пересекает секущую прямую.
+
+    :param root: Значение x'(0) цикла.
+    :param section_return: Результат closed_return для цикла.
+    """
+    crossing_point = section_return['crossing_point']
+    if crossing_point is None:
+        return root,
+    return root, float(crossing_point[1])
+
+
+def is_same_cycle(
+    root: float,
+    period: float,
+    other: tuple[float, tuple[float, ...]]
+) -> bool:
+    """
+    Совпадает ли цикл с уже найденным (например, на другой полупрямой
+    секущей): периоды равны, а x'(0) цикла совпадает с одной из точек
+    пересечения секущей найденным циклом.
+
+    :param root: Значение x'(0) цикла.
+    :param period: Период цикла.
+    :param other: Период найденного цикла и результат section_points
+        для него.
+    """
+    other_period, other_points = other
+    if abs(period - other_period) > \
+            PERIOD_TOLERANCE * max(1., abs(other_period)):
+        return False
+    return any(abs(root - y) <= SECTION_TOLERANCE for y in other_points)
+
+
+def describe_cycle(
+    x0: float,
+    y: float,
+    ode: callable,
+    rtol: float = POINCARE_RTOL,
+    atol: float = POINCARE_ATOL,
+    floquet: bool = False,
+    **kwargs
+) -> dict:
+    """
+    Построение найденного цикла и вычисление его характеристик.
+
+    :param x0: Абсцисса секущей прямой.
+    :param y: Значение x'(0) цикла.
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param floquet: Вычислять ли мультипликатор Флоке цикла
+        (см. models.runge_kutta.is_cycle).
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Словарь вида:
+
+    {
+        # Начальные условия порождающие цикл
+        'start_point': [0, 0.3],
+        # Массив описывающий фазовую траекторию
+        'trajectory': [[0, 0.3], ..., [0, 0.3]],
+        # Период цикла
+        'period': 6.28,
+        # Полуразмах цикла по x и по x'
+        'amplitude_x': 0.3,
+        'amplitude_y': 0.3,
+        # Расстояние между начальной точкой и точкой возвращения
+        'closure_error': 1e-10,
+        # Мультипликатор Флоке (только если задан параметр floquet)
+        'multiplier': 0.5
+    }
+    """
+    start_point = np.array([x0, y], dtype=np.float64)
+    section_return = poincare_return(
+        start_point, ode, rtol, atol,
+        divergence=divergence_function(ode, **kwargs) if floquet else None,
+        **kwargs
+    )
+    trajectory = section_return['trajectory']
+    amplitude = (trajectory.max(axis=0) - trajectory.min(axis=0)) / 2
+    cycle = {
+        'start_point': start_point,
+        'trajectory': trajectory,
+        'period': section_return['period'],
+        'amplitude_x': amplitude[0],
+        'amplitude_y': amplitude[1],
+        'closure_error': float(np.hypot(*(trajectory[-1] - start_point)))
+    }
+    if floquet:
+        cycle['multiplier'] = float(np.exp(section_return['log_multiplier']))
+    return cycle
+
+
+def iter_limit_cycles(
+    x0: float,
+    y_min: float,
+    y_max: float,
+    ode: callable,
+    coarse_step: float = COARSE_STEP,
+    rtol: float = POINCARE_RTOL,
+    atol: float = POINCARE_ATOL,
+    xtol: float = XTOL,
+    floquet: bool = False,
+    **kwargs
+) -> Iterator[dict]:
+    """
+    Поиск предельных циклов, пересекающих отрезок прямой x = x0.
+    Каждый цикл возвращается сразу после уточнения.
+
+    Функция P(y) - y вычисляется на грубой сетке значений x'(0).
+    На каждом отрезке сетки, где она меняет знак, а x' не меняет,
+    корень уточняется методом Брента. Корень принимается, если
+    траектория из него замыкается (см. closed_return). Цикл, уже
+    найденный на другой полупрямой секущей, повторно не возвращается
+    (см. is_same_cycle).
+
+    :param x0: Абсцисса секущей прямой.
+    :param y_min: Минимальное значение для x'(0).
+    :param y_max: Максимальное значение для x'(0).
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param coarse_step: Шаг грубой сетки.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param xtol: Допустимая погрешность значения x'(0) цикла.
+    :param floquet: Вычислять ли мультипликатор Флоке циклов.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Объекты того же вида, что возвращает describe_cycle
+        (совместимы с find_cycles_in_phase_field).
+    """
+    def difference(y: float) -> float:
+        return return_map_difference(x0, y, ode, rtol, atol, **kwargs)
+
+    # Грубая сетка включает обе границы диапазона
+    count_nodes = max(int(np.ceil((y_max - y_min) / coarse_step)), 1) + 1
+    grid = np.linspace(y_min, y_max, count_nodes)
+    values = np.array([difference(y) for y in grid])
+    directions = np.array([
+        crossing_direction(x0, y, ode, **kwargs) for y in grid
+    ])
+
+    found = []
+    for i in range(len(grid) - 1):
+        f_left, f_right = values[i], values[i + 1]
+
+        # Пропускаем отрезки, где траектория не вернулась
+        if np.isnan(f_left) or np.isnan(f_right):
+            continue
+
+        # Отрезок должен лежать на одной полупрямой секущей
+        if directions[i] == 0 or directions[i] != directions[i + 1]:
+            continue
+
+        # Корень в правом узле будет найден на следующем отрезке
+        if f_right == 0 or f_left * f_right > 0:
+            continue
+
+        root = brent(difference, grid[i], grid[i + 1], f_left, f_right, xtol)
+        section_return = closed_return(x0, root, ode, rtol, atol, **kwargs)
+        if section_return is None:
+            continue
+        period = section_return['period']
+        if any(is_same_cycle(root, period, other) for other in found):
+            continue
+        found.append((period, section_points(root, section_return)))
+        yield describe_cycle(x0, root, ode, rtol, atol, floquet, **kwargs)
+
+
+def find_limit_cycles(
+    x0: float,
+    y_min: float,
+    y_max: float,
+    ode: callable,
+    coarse_step: float = COARSE_STEP,
+    rtol: float = POINCARE_RTOL,
+    atol: float = POINCARE_ATOL,
+    xtol: float = XTOL,
+    **kwargs
+) -> list[dict]:
+    """
+    Поиск предельных циклов, пересекающих отрезок прямой x = x0
+    (см. iter_limit_cycles).
+
+    :return: Массив из объектов того же вида, что возвращает
+        describe_cycle (совместим с find_cycles_in_phase_field).
+    """
+    return list(iter_limit_cycles(
+        x0, y_min, y_max, ode, coarse_step, rtol, atol, xtol, **kwargs
+    ))
@@ -0,0 +1,145 @@
+"""
+    Дисковый кэш результатов поиска циклов
+
+    Автор: Петряшев К. С.
+"""
+import hashlib
+import json
+import os
+from typing import Final
+
+import numpy as np
+
+from models.cycle_archive import pack_cycles, unpack_cycles
+from models.paths import DEFAULT_CACHE_DIRECTORY
+
+
+# Максимальный размер кэша по умолчанию, в байтах
+DEFAULT_MAX_BYTES: Final = 512 * 1024 ** 2
+
+# Расширение файлов записей кэша
+ENTRY_EXTENSION: Final = '.npz'
+
+# Версия содержимого записей. Входит в ключ, поэтому записи
+# в старом виде (например, без характеристик циклов) не используются
+CACHE_FORMAT: Final = 3
+
+
+def make_cache_key(**parameters) -> str:
+    """
+    Формирование ключа записи кэша по параметрам поиска.
+
+    :param parameters: Параметры поиска: начальные условия, диапазон,
+        шаг, коэффициенты уравнения, способ поиска и точность.
+
+    :return: Хэш параметров в шестнадцатеричном виде.
+    """
+    # Числа приводим к float, чтобы 1 и 1.0 давали один ключ
+    normalized = {
+        name: float(value) if isinstance(value, (int, float)) else str(value)
+        for name, value in parameters.items()
+    }
+    normalized['cache_format'] = CACHE_FORMAT
+    payload = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Кэш результатов поиска циклов на диске.
+
+    Каждая запись - файл .npz со столбцовыми массивами циклов
+    (см. models.cycle_archive.pack_cycles): траектории всех циклов
+    хранятся в одном массиве, а границы траекторий - в массиве смещений.
+    При превышении максимального размера удаляются записи, к которым
+    дольше всего не обращались (время обращения - время изменения файла).
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIRECTORY,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        Конструктор класса
+
+        :param directory: Каталог для хранения записей.
+        :param max_bytes: Максимальный суммарный размер записей.
+        """
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        os.makedirs(self.__directory, exist_ok=True)
+
+    def __path(self, key: str) -> str:
+        """Путь к файлу записи по ключу"""
+        return os.path.join(self.__directory, key + ENTRY_EXTENSION)
+
+    def get(self, key: str) -> list[dict] | None:
+        """
+        Получение результатов поиска из кэша.
+
+        :param key: Ключ записи (см. make_cache_key).
+
+        :return: Результаты поиска или None, если записи нет.
+        """
+        path = self.__path(key)
+        try:
+            with np.load(path) as entry:
+                results = unpack_cycles(entry)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Отмечаем обращение к записи
+        os.utime(path)
+        return results
+
+    def put(self, key: str, results: list[dict]) -> None:
+        """
+        Сохранение результатов поиска в кэш.
+
+        :param key: Ключ записи (см. make_cache_key).
+        :param results: Результаты поиска.
+        """
+        path = self.__path(key)
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as file:
+            np.savez(file, **pack_cycles(results))
+        # Заменяем запись атомарно, чтобы не прочитать её недописанной
+        os.replace(temporary_path, path)
+        self.__evict()
+
+    def clear(self) -> None:
+        """Удаление всех записей кэша"""
+        for path, _, _ in self.__entries():
+            os.remove(path)
+
+    def __entries(self) -> list[tuple[str, float, int]]:
+        """
+        Список записей кэша.
+
+        :return: Кортежи (путь, время обращения, размер).
+        """
+        entries = []
+        for name in os.listdir(self.__directory):
+            if not name.endswith(ENTRY_EXTENSION):
+                continue
+            path = os.path.join(self.__directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def __evict(self) -> None:
+        """Удаление давно не использованных записей сверх размера кэша"""
+        entries = sorted(self.__entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.__max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,106 @@
+"""
+    Общие определения для специализированного цикла Рунге-Кутты,
+    который генерируется для каждой системы models.ode_registry
+    (см. CYCLE_LOOP_TEMPLATE): коды результата, начальная вместимость
+    траектории и JIT-компиляция.
+
+    Если установлен пакет numba, цикл целиком компилируется
+    JIT-компилятором. Иначе используется тот же код на чистом Python,
+    который всё равно быстрее варианта с массивами numpy, так как
+    не создаёт массивы на каждой стадии метода.
+
+    Автор: Петряшев К. С.
+"""
+import os
+from typing import Final
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# Доступна ли JIT-компиляция
+JIT_AVAILABLE: Final = njit is not None
+
+# Начальная вместимость массива траектории
+INITIAL_CAPACITY: Final = 1024
+
+# Элементы массива состояния цикла: текущая точка, количество
+# пересечений прямой x = x0, сумма изменений x', количество шагов,
+# направление движения по x в начале траектории, время возвращения
+# и интеграл дивергенции
+STATE_X: Final = 0
+STATE_Y: Final = 1
+STATE_INTERSECTIONS: Final = 2
+STATE_SUM_DIFFERENCES: Final = 3
+STATE_HOPS: Final = 4
+STATE_DIRECTION: Final = 5
+STATE_RETURN_TIME: Final = 6
+STATE_LOG_MULTIPLIER: Final = 7
+STATE_SIZE: Final = 8
+
+# Коды результата проверки траектории
+# (совпадают с models.runge_kutta.STATUS_CODES)
+NOT_CYCLE: Final = 0
+CYCLE: Final = 1
+UNDECIDED: Final = 2
+# Траектория не является циклом, так как уходит на бесконечность:
+# получены неконечные значения или превышен радиус blow_up_radius
+OVERFLOW: Final = 3
+DIVERGED: Final = 4
+
+
+def jit(function: callable, inline: bool = False) -> callable:
+    """
+    JIT-компиляция функции, если доступна numba. Скомпилированный код
+    кэшируется на диске, только если функция объявлена в файле
+    модуля: numba не может кэшировать функции модуля, созданного
+    в памяти.
+
+    :param function: Функция.
+    :param inline: Встраивать ли функцию в места вызова.
+
+    :return: Скомпилированная функция или исходная функция.
+    """
+    if not JIT_AVAILABLE:
+        return function
+    return njit(
+        cache=os.path.isfile(function.__code__.co_filename),
+        inline='always' if inline else 'never'
+    )(function)
+
+
+def kernel_coefficients(coefficients: tuple[float, ...]) -> np.ndarray:
+    """
+    Коэффициенты системы в виде, наиболее быстром для цикла:
+    массив для скомпилированного цикла, кортеж чисел - для цикла
+    на чистом Python (элементы массива numpy там медленнее чисел).
+
+    :param coefficients: Значения коэффициентов.
+
+    :return: Массив или кортеж значений.
+    """
+    if JIT_AVAILABLE:
+        return np.array(coefficients, dtype=np.float64)
+    return tuple(float(value) for value in coefficients)
+
+
+def initial_loop_state(x0: float, y0: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Начальные массив траектории и состояние цикла Рунге-Кутты.
+
+    :param x0: Начальное значение x.
+    :param y0: Начальное значение x'.
+
+    :return: Кортеж (массив точек траектории формы (INITIAL_CAPACITY, 2)
+        с начальной точкой, массив состояния).
+    """
+    trajectory = np.empty((INITIAL_CAPACITY, 2))
+    trajectory[0] = x0, y0
+    state = np.zeros(STATE_SIZE)
+    state[STATE_X], state[STATE_Y] = x0, y0
+    state[STATE_RETURN_TIME] = np.nan
+    return trajectory, state
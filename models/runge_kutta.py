@@ -4,61 +4,292 @@
 
     Автор: Петряшев К. С.
 """
-from typing import Final
+import time
+from typing import Final, Iterator
 
 import numpy as np
 
+from models.divergence import (
+    BLOW_UP_RADIUS,
+    DIVERGENCE_CHECK_INTERVAL,
+    divergence_reason,
+    first_divergent
+)
+from models.instrumentation import (
+    EXIT_DIVERGED,
+    EXIT_NEGATIVE,
+    EXIT_NO_RETURN,
+    EXIT_OVERFLOW,
+    EXIT_POSITIVE,
+    EXIT_TIMEOUT,
+    PHASE_RESTORE,
+    SearchStatistics,
+    timer
+)
+from models.ode_storage import BoundEquation
+from models.rk4_kernels import (
+    STATE_LOG_MULTIPLIER,
+    STATE_RETURN_TIME,
+    UNDECIDED,
+    initial_loop_state
+)
+from models.trajectory_buffer import TrajectoryBuffer
+
 # Шаг и допустимая погрешность для определения цикла.
 HOP: Final = 0.001
 TOLERANCE: Final = 0.0001
 
+# Ограничения на построение одной траектории при поиске цикла:
+# количество шагов и время интегрирования.
+MAX_STEPS: Final = 1_000_000
+MAX_TIME: Final = 1000.0
+
+# Количество шагов скомпилированного цикла между проверками
+# ограничения по времени работы (см. is_cycle_specialized).
+SPECIALIZED_CHUNK_STEPS: Final = 10_000
+
+# Результаты проверки траектории на цикл.
+STATUS_CYCLE: Final = 'cycle'
+STATUS_NOT_CYCLE: Final = 'not_cycle'
+# Ограничение исчерпано до того, как удалось определить результат.
+STATUS_UNDECIDED: Final = 'undecided'
+
+# Результаты проверки и причины завершения по их числовым кодам
+# (используются скомпилированным и векторизованным методами).
+STATUS_CODES: Final = (
+    STATUS_NOT_CYCLE,
+    STATUS_CYCLE,
+    STATUS_UNDECIDED,
+    STATUS_NOT_CYCLE,
+    STATUS_NOT_CYCLE
+)
+EXIT_CODES: Final = (
+    EXIT_NEGATIVE, EXIT_POSITIVE, EXIT_TIMEOUT, EXIT_OVERFLOW, EXIT_DIVERGED
+)
+
+# Допустимые относительная и абсолютная погрешности
+# для метода с адаптивным шагом.
+RTOL: Final = 1e-6
+ATOL: Final = 1e-9
+
+# Максимальный шаг метода с адаптивным шагом при поиске цикла.
+MAX_ADAPTIVE_HOP: Final = 0.1
+
+# Максимальное время ожидания возвращения траектории на секущую прямую.
+MAX_RETURN_TIME: Final = 100.0
+
+# Шаг, относительно которого считается погрешность замыкания цикла
+# в методе с адаптивным шагом (совпадает с шагом is_cycle).
+CYCLE_HOP: Final = 1e-2
+
+# Таблица Бутчера метода Дормана-Принса 5(4).
+DP_C: Final = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+DP_A: Final = (
+    np.array([]),
+    np.array([1 / 5]),
+    np.array([3 / 40, 9 / 40]),
+    np.array([44 / 45, -56 / 15, 32 / 9]),
+    np.array([19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729]),
+    np.array([
+        9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656
+    ]),
+)
+DP_B: Final = np.array([
+    35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0
+])
+# Разность весов решений 5-го и 4-го порядков - оценка погрешности шага.
+DP_E: Final = np.array([
+    71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40
+])
+# Коэффициенты плотной выдачи (непрерывного продолжения) 4-го порядка.
+DP_P: Final = np.array([
+    [
+        1, -8048581381 / 2820520608, 8663915743 / 2820520608,
+        -12715105075 / 11282082432
+    ],
+    [0, 0, 0, 0],
+    [
+        0, 131558114200 / 32700410799, -68118460800 / 10900136933,
+        87487479700 / 32700410799
+    ],
+    [
+        0, -1754552775 / 470086768, 14199869525 / 1410260304,
+        -10690763975 / 1880347072
+    ],
+    [
+        0, 127303824393 / 49829197408, -318862633887 / 49829197408,
+        701980252875 / 199316789632
+    ],
+    [
+        0, -282668133 / 205662961, 2019193451 / 616988883,
+        -1453857185 / 822651844
+    ],
+    [
+        0, 40617522 / 29380423, -110615467 / 29380423,
+        69997945 / 29380423
+    ],
+])
+
 
 def runge_kutta(
     y0: np.ndarray,
     ode: callable,
     time_: np.array,
+    blow_up_radius: float = BLOW_UP_RADIUS,
+    statistics: SearchStatistics | None = None,
     **kwargs
 ) -> np.array:
     '''
     Функция численно находит решение для краевой задачи
     дифференциального уравнения методом Рунге Кутты
 
-    :param y0: Массив начальных условий y(0) и y'(0).
+    :param y0: Массив начальных условий y(0) и y'(0) или массив
+        формы (N, 2) начальных условий N траекторий. Во втором случае
+        все траектории строятся одновременно, а функция ode должна
+        принимать массив формы (2, N) (см. is_cycle_batch).
     :param ode: Функция, задающая дифференциальное уравнение.
     :param time_: Массив значений переменной, задающей время.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность.
+    :param statistics: Статистика, в которой учитываются вычисления
+        правой части и причина досрочного завершения (EXIT_OVERFLOW
+        или EXIT_DIVERGED).
     :param kwargs: Параметры дифференциального уравнения.
 
     :return: Массив, содержащий точки, определяющие траекторию.
+        Если траектория ушла на бесконечность, массив обрезается
+        перед первой точкой с неконечными значениями или вне радиуса
+        blow_up_radius. Для N траекторий - массив формы (N, T, 2),
+        где T - длина time_; точки траекторий, ушедших
+        на бесконечность, начиная с первой непрошедшей проверку
+        заполняются NaN.
     '''
+    if np.ndim(y0) == 2:
+        return __runge_kutta_batch(
+            y0, ode, time_, blow_up_radius, statistics, **kwargs
+        )
+
     # Вычисляем количество точек
     n = len(time_)
 
-    # Задаем массив, в котором будет храниться результат
-    sol = np.zeros((n, len(y0)))
+    # Задаем хранилище, в котором будет храниться результат.
+    # Количество точек известно заранее, поэтому память выделяется один раз
+    sol = TrajectoryBuffer(len(y0), n)
 
     # Кладем первые значения в массив результата
-    sol[0] = y0
+    sol.append(y0)
+    current_point = np.array(y0, dtype=np.float64)
+
+    if statistics is not None:
+        ode = statistics.counting(ode)
 
-    # Запускаем основной цикл
-    for i in range(n - 1):
-        # Вычисляем шаг
-        hop = time_[i + 1] - time_[i]
-
-        with np.errstate(over='raise', invalid='raise'):
-            try:
-                # Вычисляем значения k1, k2, k3, k4
-                k1 = ode(sol[i], time_[i], **kwargs)
-                k2 = ode(sol[i] + k1 * hop / 2., time_[i] + hop / 2., **kwargs)
-                k3 = ode(sol[i] + k2 * hop / 2., time_[i] + hop / 2., **kwargs)
-                k4 = ode(sol[i] + k3 * hop, time_[i] + hop, **kwargs)
-            except FloatingPointError:
-                return sol
+    # Количество уже проверенных на уход на бесконечность точек
+    checked = 0
+
+    # Переполнения отлавливаем проверкой блоков точек,
+    # поэтому предупреждения numpy здесь не нужны
+    with np.errstate(over='ignore', invalid='ignore'):
+        # Запускаем основной цикл
+        for i in range(n - 1):
+            # Проверяем очередной блок точек
+            if i % DIVERGENCE_CHECK_INTERVAL == 0:
+                if first_divergent(sol.view(), blow_up_radius, checked) \
+                        is not None:
+                    break
+                checked = len(sol)
+
+            # Вычисляем шаг
+            hop = time_[i + 1] - time_[i]
+
+            # Вычисляем значения k1, k2, k3, k4
+            k1 = ode(current_point, time_[i], **kwargs)
+            k2 = ode(
+                current_point + k1 * hop / 2.,
+                time_[i] + hop / 2.,
+                **kwargs
+            )
+            k3 = ode(
+                current_point + k2 * hop / 2.,
+                time_[i] + hop / 2.,
+                **kwargs
+            )
+            k4 = ode(current_point + k3 * hop, time_[i] + hop, **kwargs)
 
             # Находим значения y и y' на текущем шаге
-            sol[i + 1] = sol[i] + (hop / 6.) * (k1 + 2 * k2 + 2 * k3 + k4)
+            current_point = current_point + (hop / 6.) * (
+                k1 + 2 * k2 + 2 * k3 + k4
+            )
+            sol.append(current_point)
+
+    # Обрезаем траекторию перед первой непрошедшей проверку точкой
+    trajectory = sol.view()
+    divergent = first_divergent(trajectory, blow_up_radius, checked)
+    if divergent is None:
+        return trajectory
+    if statistics is not None:
+        statistics.count_exit(divergence_reason(trajectory[divergent]))
+    return trajectory[:divergent]
 
-        if sol[i + 1, 0] == np.nan or sol[i + 1, 1] == np.nan:
-            return sol[:i + 1]
+
+def __runge_kutta_batch(
+    y0: np.ndarray,
+    ode: callable,
+    time_: np.array,
+    blow_up_radius: float,
+    statistics: SearchStatistics | None,
+    **kwargs
+) -> np.ndarray:
+    """
+    Векторизованный вариант runge_kutta для массива начальных
+    условий: все траектории продвигаются одновременно.
+
+    :param y0: Массив начальных условий формы (N, 2).
+    :param ode: Функция, принимающая массив формы (2, N).
+    :param time_: Массив значений переменной, задающей время.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность.
+    :param statistics: Статистика или None.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Массив траекторий формы (N, T, 2).
+    """
+    current = np.array(y0, dtype=np.float64)
+    sol = np.empty((len(current), len(time_), current.shape[1]))
+    sol[:, 0] = current
+
+    if statistics is not None:
+        ode = statistics.counting(ode)
+
+    # Переполнения отлавливаем по маске значений внутри радиуса,
+    # поэтому предупреждения numpy здесь не нужны
+    with np.errstate(over='ignore', invalid='ignore'):
+        for i in range(len(time_) - 1):
+            hop = time_[i + 1] - time_[i]
+
+            k1 = ode(current.T, time_[i], **kwargs).T
+            k2 = ode(
+                (current + k1 * hop / 2.).T, time_[i] + hop / 2., **kwargs
+            ).T
+            k3 = ode(
+                (current + k2 * hop / 2.).T, time_[i] + hop / 2., **kwargs
+            ).T
+            k4 = ode((current + k3 * hop).T, time_[i] + hop, **kwargs).T
+
+            current = current + (hop / 6.) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+            # Траектории, ушедшие на бесконечность, заполняем NaN:
+            # арифметика с NaN даёт NaN, поэтому они так и останутся NaN.
+            # Сравнение с NaN ложно, поэтому уже заполненные траектории
+            # тоже не проходят проверку
+            outside = ~(np.abs(current) <= blow_up_radius).all(axis=1)
+            if outside.any():
+                if statistics is not None:
+                    # Учитываем только траектории, ушедшие на этом шаге
+                    left = outside & ~np.isnan(sol[:, i]).any(axis=1)
+                    for point in current[left]:
+                        statistics.count_exit(divergence_reason(point))
+                current[outside] = np.nan
+            sol[:, i + 1] = current
     return sol
 
 
@@ -83,9 +314,173 @@ def __is_vertical_axe_intersected(
     return any(vertical_axes_intersection_criterios)
 
 
+def __cycle_result(
+    start_point: np.array,
+    status: str,
+    trajectory: np.ndarray,
+    characteristics: dict | None = None
+) -> dict:
+    """
+    Формирование результата проверки траектории на цикл.
+
+    :param start_point: Точка начала фазовой траектории.
+    :param status: Результат проверки (STATUS_CYCLE, STATUS_NOT_CYCLE
+        или STATUS_UNDECIDED).
+    :param trajectory: Фазовая траектория.
+    :param characteristics: Характеристики цикла
+        (см. __cycle_characteristics). Добавляются только к циклам.
+
+    :return: Словарь того же вида, что возвращает is_cycle.
+    """
+    result = {
+        'start_point': start_point,
+        'result': status == STATUS_CYCLE,
+        'status': status,
+        'trajectory': trajectory
+    }
+    if status == STATUS_CYCLE and characteristics is not None:
+        result.update(characteristics)
+    return result
+
+
+def __cycle_characteristics(
+    start_point: np.ndarray,
+    trajectory: np.ndarray,
+    period: float,
+    log_multiplier: float | None = None
+) -> dict:
+    """
+    Характеристики цикла, найденные при построении траектории.
+
+    :param start_point: Точка начала фазовой траектории.
+    :param trajectory: Фазовая траектория.
+    :param period: Время возвращения на прямую x = x(0).
+    :param log_multiplier: Интеграл дивергенции правой части вдоль
+        цикла или None, если он не вычислялся.
+
+    :return: Словарь вида:
+
+    {
+        # Период цикла
+        'period': 6.28,
+        # Полуразмах цикла по x и по x'
+        'amplitude_x': 0.3,
+        'amplitude_y': 0.3,
+        # Расстояние между начальной и последней точками траектории
+        'closure_error': 1e-4,
+        # Нетривиальный мультипликатор Флоке (только если вычислялся):
+        # меньше 1 для устойчивого цикла, больше 1 - для неустойчивого
+        'multiplier': 0.5
+    }
+    """
+    return __bounds_characteristics(
+        start_point,
+        trajectory.min(axis=0),
+        trajectory.max(axis=0),
+        trajectory[-1],
+        period,
+        log_multiplier
+    )
+
+
+def __bounds_characteristics(
+    start_point: np.ndarray,
+    low: np.ndarray,
+    high: np.ndarray,
+    last_point: np.ndarray,
+    period: float,
+    log_multiplier: float | None = None
+) -> dict:
+    """
+    Характеристики цикла по границам траектории, когда сама
+    траектория не хранится.
+
+    :param start_point: Точка начала фазовой траектории.
+    :param low: Наименьшие значения x и x' вдоль траектории.
+    :param high: Наибольшие значения x и x' вдоль траектории.
+    :param last_point: Последняя точка траектории.
+    :param period: Время возвращения на прямую x = x(0).
+    :param log_multiplier: Интеграл дивергенции правой части вдоль
+        цикла или None, если он не вычислялся.
+
+    :return: Словарь того же вида, что возвращает __cycle_characteristics.
+    """
+    amplitude = (high - low) / 2
+    characteristics = {
+        'period': float(period),
+        'amplitude_x': float(amplitude[0]),
+        'amplitude_y': float(amplitude[1]),
+        'closure_error': float(np.hypot(*(last_point - start_point)))
+    }
+    if log_multiplier is not None:
+        characteristics['multiplier'] = float(np.exp(log_multiplier))
+    return characteristics
+
+
+def __return_time(
+    start_x: np.ndarray | float,
+    current: np.ndarray,
+    time_: float,
+    return_time: np.ndarray | float,
+    velocity: np.ndarray | float
+) -> np.ndarray | float:
+    """
+    Время возвращения на прямую x = x(0) в исходном направлении.
+    Если траектория замкнулась чуть раньше пересечения прямой,
+    время пересечения экстраполируется по скорости x'
+    в последней точке.
+
+    :param start_x: Значение x(0) (число или массив формы (N,)).
+    :param current: Последняя точка формы (2,) или (N, 2).
+    :param time_: Время последней точки.
+    :param return_time: Время найденного пересечения или NaN.
+    :param velocity: Значение x' в последней точке
+        (число или массив формы (N,)).
+
+    :return: Время возвращения.
+    """
+    current = np.asarray(current)
+    extrapolated = time_ + (start_x - current[..., 0]) / velocity
+    return np.where(np.isnan(return_time), extrapolated, return_time)
+
+
+def divergence_function(ode: callable, **kwargs) -> callable:
+    """
+    Функция дивергенции правой части уравнения для вычисления
+    мультипликатора Флоке.
+
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param kwargs: Коэффициенты уравнения, если ode не хранит их сама.
+
+    :return: Функция точки (или массива точек формы (2, N)).
+    """
+    divergence = getattr(ode, 'divergence', None)
+    if divergence is None:
+        divergence = BoundEquation(**kwargs).divergence
+    return divergence
+
+
+def __deadline(max_wall_time: float | None) -> float | None:
+    """
+    Момент времени (по монотонным часам), после которого
+    построение траектории прекращается.
+
+    :param max_wall_time: Допустимое время работы в секундах или None.
+    """
+    if max_wall_time is None:
+        return None
+    return time.monotonic() + max_wall_time
+
+
 def is_cycle(
     start_point: np.array,
     ode: callable,
+    max_steps: int = MAX_STEPS,
+    max_time: float = MAX_TIME,
+    max_wall_time: float | None = None,
+    blow_up_radius: float = BLOW_UP_RADIUS,
+    statistics: SearchStatistics | None = None,
+    floquet: bool = False,
     **kwargs
 ) -> dict:
     """
@@ -93,9 +488,30 @@ def is_cycle(
     дифференциального уравнения методом Рунге Кутты
     и определяет, является ли решение циклом.
 
+    Для цикла попутно находятся его характеристики: время возвращения
+    на прямую x = x(0) в исходном направлении (период), полуразмах
+    и погрешность замыкания. Если задан параметр floquet, вместе
+    с траекторией интегрируется дивергенция правой части: для системы
+    второго порядка её интеграл вдоль цикла равен логарифму
+    нетривиального мультипликатора Флоке (формула Лиувилля для
+    уравнений в вариациях).
+
     :param start_point: Точка, с которой необходимо начать
         построение траектории.
     :param ode: функция, задающая дифференциальное уравнение.
+    :param max_steps: Максимальное количество шагов.
+    :param max_time: Максимальное время интегрирования.
+    :param max_wall_time: Максимальное время работы в секундах.
+        По умолчанию не ограничено.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность и не являющейся циклом.
+    :param statistics: Статистика, в которой учитываются вычисления
+        правой части, шаги и причина завершения. По умолчанию
+        не собирается.
+    :param floquet: Вычислять ли мультипликатор Флоке цикла.
+        Дивергенция берётся из метода divergence функции ode
+        (см. models.ode_storage.BoundEquation), а при его отсутствии
+        вычисляется для models.ode_storage.equation по kwargs.
     :param kwargs: Параметры дифференциального уравнения.
 
     :return: Словарь вида:
@@ -104,6 +520,10 @@ def is_cycle(
         # Результат, является ли траектория циклом
         'result': False,
 
+        # Результат проверки: STATUS_CYCLE, STATUS_NOT_CYCLE или
+        # STATUS_UNDECIDED, если ограничение исчерпано раньше
+        'status': 'not_cycle',
+
         # Массив описывающий фазовую траекторию
         'trajectory': [
             [0, 0.01],
@@ -113,13 +533,18 @@ def is_cycle(
             [0, 1]
         ]
     }
+
+    Для цикла в словарь добавляются характеристики 'period',
+    'amplitude_x', 'amplitude_y', 'closure_error' и, если задан
+    параметр floquet, 'multiplier' (см. __cycle_characteristics).
     """
     # Задаём шаг и допустимую погрешность
     hop, tolerance = 1e-2, 4e-4
 
     # Инициализируем траекторию, начиная со стартовой точки
-    current_point = np.copy(start_point)
-    points = np.array([current_point])
+    current_point = np.array(start_point, dtype=np.float64)
+    points = TrajectoryBuffer()
+    points.append(current_point)
 
     # Задаём переменную времени
     time_ = 0.0
@@ -131,77 +556,1061 @@ def is_cycle(
     sum_differences = 0.0
     count_hops = 0
 
-    # Основной цикл Рунге-Кутты
+    # Ограничения на построение траектории
+    max_steps = min(max_steps, int(np.ceil(max_time / hop)))
+    deadline = __deadline(max_wall_time)
+
+    # Направление движения по x в начале траектории, время
+    # возвращения в этом направлении и интеграл дивергенции
+    direction = 0.0
+    return_time = np.nan
+    divergence = divergence_function(ode, **kwargs) if floquet else None
+    log_multiplier = 0.0 if floquet else None
+
+    if statistics is not None:
+        ode = statistics.counting(ode)
+
+    # Количество уже проверенных на уход на бесконечность точек
+    checked = 0
+
+    def finish(status: str, reason: str) -> dict:
+        """
+        Завершение построения траектории. Непроверенные точки
+        проверяются на уход на бесконечность: неконечные значения
+        могли привести к выполнению условий выхода.
+        """
+        trajectory = points.view()
+        divergent = first_divergent(trajectory, blow_up_radius, checked)
+        if divergent is not None:
+            status = STATUS_NOT_CYCLE
+            reason = divergence_reason(trajectory[divergent])
+            trajectory = trajectory[:divergent]
+        if statistics is not None:
+            statistics.count_exit(reason, steps=len(trajectory) - 1)
+        if status != STATUS_CYCLE:
+            return __cycle_result(start_point, status, trajectory)
+
+        period = float(__return_time(
+            start_point[0],
+            current_point,
+            time_,
+            return_time,
+            ode(current_point, time_, **kwargs)[0]
+        ))
+        return __cycle_result(
+            start_point,
+            status,
+            trajectory,
+            __cycle_characteristics(
+                start_point,
+                trajectory,
+                period,
+                None if divergence is None else log_multiplier
+                + divergence(current_point) * (period - time_)
+            )
+        )
+
+    # Переполнения отлавливаем проверкой блоков точек,
+    # поэтому предупреждения numpy здесь не нужны
+    with np.errstate(over='ignore', invalid='ignore'):
+        # Основной цикл Рунге-Кутты
+        while True:
+            if count_hops >= max_steps or \
+                    deadline is not None and time.monotonic() > deadline:
+                return finish(STATUS_UNDECIDED, EXIT_TIMEOUT)
+
+            # Проверяем очередной блок точек
+            if count_hops % DIVERGENCE_CHECK_INTERVAL == 0:
+                if first_divergent(points.view(), blow_up_radius, checked) \
+                        is not None:
+                    return finish(STATUS_NOT_CYCLE, EXIT_DIVERGED)
+                checked = len(points)
+
+            time_ += hop
+            k1 = ode(current_point, time_, **kwargs)
+            stage2 = current_point + k1 * hop / 2.
+            k2 = ode(stage2, time_ + hop / 2., **kwargs)
+            stage3 = current_point + k2 * hop / 2.
+            k3 = ode(stage3, time_ + hop / 2., **kwargs)
+            stage4 = current_point + k3 * hop
+            k4 = ode(stage4, time_ + hop, **kwargs)
+
+            # Находим разницу между предыдущей и текущей точки
+            difference = (hop / 6.) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+            # Интеграл дивергенции вычисляется теми же стадиями метода
+            if divergence is not None:
+                log_multiplier += (hop / 6.) * (
+                    divergence(current_point) + 2 * divergence(stage2)
+                    + 2 * divergence(stage3) + divergence(stage4)
+                )
+
+            # Находим текущее значение погрешности
+            # Исходя из среднего значения разницы по всем итерациям
+            sum_differences += abs(difference[1])
+            count_hops += 1
+            tolerance = sum_differences / count_hops
+
+            # Находим значения y и y' на текущем шаге
+            current_point += difference
+            points.append(current_point)
+            if count_hops == 1:
+                direction = difference[0]
+
+            # Если мы пересекаем вертикальную ось - регистрируем это.
+            previous_point = points[-2]
+            if __is_vertical_axe_intersected(
+                current_point,
+                previous_point,
+                start_point
+            ):
+                count_x_intersections += 1
+                # Время возвращения в исходном направлении
+                # находим линейной интерполяцией
+                if np.isnan(return_time) and difference[0] * direction > 0:
+                    return_time = time_ - hop + hop * (
+                        (start_point[0] - previous_point[0])
+                        / (current_point[0] - previous_point[0])
+                    )
+
+            # Формируем условия для положительного выхода из цикла
+            # 1) Вертикальная ось была пересечена
+            positive_conditions = [
+                count_x_intersections >= 1,
+                abs(start_point[0] - current_point[0]) <= tolerance,
+                abs(start_point[1] - current_point[1]) <= tolerance
+            ]
+
+            # Если соблюдены условия для положительного выхода
+            #   Возвращаем положительный результат
+            if all(positive_conditions):
+                return finish(STATUS_CYCLE, EXIT_POSITIVE)
+
+            # Если мы пересекли вертикальную ось два или более раз
+            # Находимся далеко от неё и до сих пор не вышли из цикла - выходим
+            negative_conditions = (
+                count_x_intersections >= 2,
+                current_point[0] - start_point[0] >= tolerance
+            )
+            if all(negative_conditions):
+                return finish(STATUS_NOT_CYCLE, EXIT_NEGATIVE)
+
+
+def is_cycle_specialized(
+    start_point: np.array,
+    rhs: BoundEquation,
+    max_steps: int = MAX_STEPS,
+    max_time: float = MAX_TIME,
+    max_wall_time: float | None = None,
+    blow_up_radius: float = BLOW_UP_RADIUS,
+    statistics: SearchStatistics | None = None,
+    floquet: bool = False,
+    **kwargs
+) -> dict:
+    """
+    Аналог функции is_cycle для уравнения с зафиксированными
+    коэффициентами. Шаги метода вычисляются на числах с плавающей
+    точкой без создания массивов, а при наличии numba весь цикл
+    компилируется (см. models.ode_registry.CYCLE_LOOP_TEMPLATE).
+
+    Скомпилированный цикл не обращается к часам, поэтому при
+    ограничении по времени работы он выполняется частями по
+    SPECIALIZED_CHUNK_STEPS шагов, а время проверяется между ними.
+
+    :param start_point: Точка, с которой необходимо начать
+        построение траектории.
+    :param rhs: Правая часть уравнения с зафиксированными коэффициентами.
+    :param max_steps: Максимальное количество шагов.
+    :param max_time: Максимальное время интегрирования.
+    :param max_wall_time: Максимальное время работы в секундах.
+        По умолчанию не ограничено.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность. Скомпилированный цикл
+        проверяет его на каждом шаге, так как сравнение двух чисел
+        там ничего не стоит.
+    :param statistics: Статистика (см. is_cycle). Вычисления правой
+        части в скомпилированном цикле не замеряются по времени,
+        их количество определяется по числу шагов.
+    :param floquet: Добавлять ли к характеристикам цикла мультипликатор
+        Флоке. Интеграл дивергенции скомпилированный цикл вычисляет
+        всегда, так как это почти ничего не стоит.
+    :param kwargs: Игнорируются.
+
+    :return: Словарь того же вида, что возвращает is_cycle.
+    """
+    hop = 1e-2
+    rk4_cycle_loop = rhs.system.kernels.rk4_cycle_loop
+    x0, y0 = float(start_point[0]), float(start_point[1])
+    trajectory, state = initial_loop_state(x0, y0)
+    size = 1
+    limit = min(max_steps, int(np.ceil(max_time / hop)))
+    deadline = __deadline(max_wall_time)
+
+    count_hops = 0
     while True:
-        with np.errstate(over='raise', invalid='raise'):
-            try:
-                time_ += hop
-                k1 = ode(current_point, time_, **kwargs)
-                k2 = ode(
-                    current_point + k1 * hop / 2.,
-                    time_ + hop / 2.,
-                    **kwargs
+        # Без ограничения по времени цикл выполняется целиком
+        count_hops = limit if deadline is None \
+            else min(count_hops + SPECIALIZED_CHUNK_STEPS, limit)
+        status, trajectory, size = rk4_cycle_loop(
+            x0, y0, rhs.kernel_coefficients, hop, count_hops,
+            blow_up_radius, trajectory, size, state
+        )
+        if status != UNDECIDED or count_hops >= limit \
+                or time.monotonic() > deadline:
+            break
+    trajectory = trajectory[:size]
+    return_time = state[STATE_RETURN_TIME]
+    log_multiplier = state[STATE_LOG_MULTIPLIER]
+    if statistics is not None:
+        reason = EXIT_CODES[status]
+        steps = len(trajectory) - 1
+        statistics.count_exit(
+            reason,
+            steps=steps,
+            # Шаг, на котором траектория ушла на бесконечность,
+            # не попадает в траекторию
+            rhs_evaluations=4 * (
+                steps + (reason in (EXIT_OVERFLOW, EXIT_DIVERGED))
+            )
+        )
+    if STATUS_CODES[status] != STATUS_CYCLE:
+        return __cycle_result(start_point, STATUS_CODES[status], trajectory)
+
+    time_ = hop * (len(trajectory) - 1)
+    period = float(__return_time(
+        start_point[0],
+        trajectory[-1],
+        time_,
+        return_time,
+        rhs.scalar(*trajectory[-1])[0]
+    ))
+    return __cycle_result(
+        start_point,
+        STATUS_CYCLE,
+        trajectory,
+        __cycle_characteristics(
+            start_point,
+            trajectory,
+            period,
+            log_multiplier + rhs.divergence(trajectory[-1]) * (period - time_)
+            if floquet else None
+        )
+    )
+
+
+def is_cycle_batch(
+    start_points: np.ndarray,
+    ode: callable,
+    max_steps: int = MAX_STEPS,
+    max_time: float = MAX_TIME,
+    max_wall_time: float | None = None,
+    blow_up_radius: float = BLOW_UP_RADIUS,
+    statistics: SearchStatistics | None = None,
+    floquet: bool = False,
+    keep_trajectories: bool = True,
+    **kwargs
+) -> list[dict]:
+    """
+    Векторизованный аналог функции is_cycle (см. iter_cycle_batch).
+
+    :return: Список словарей того же вида, что возвращает is_cycle,
+        в порядке начальных точек. Траектория восстанавливается только
+        для циклов, для остальных точек вместо неё хранится None.
+    """
+    return list(iter_cycle_batch(
+        start_points, ode, max_steps, max_time, max_wall_time,
+        blow_up_radius, statistics, floquet, keep_trajectories, **kwargs
+    ))
+
+
+def iter_cycle_batch(
+    start_points: np.ndarray,
+    ode: callable,
+    max_steps: int = MAX_STEPS,
+    max_time: float = MAX_TIME,
+    max_wall_time: float | None = None,
+    blow_up_radius: float = BLOW_UP_RADIUS,
+    statistics: SearchStatistics | None = None,
+    floquet: bool = False,
+    keep_trajectories: bool = True,
+    **kwargs
+) -> Iterator[dict]:
+    """
+    Векторизованный аналог функции is_cycle.
+
+    Все траектории, заданные массивом начальных точек, продвигаются
+    методом Рунге-Кутты одновременно. Для каждой траектории хранится
+    своё количество пересечений вертикальной оси, своя погрешность и
+    признак завершения. Завершившиеся траектории удаляются из
+    активного набора.
+
+    Результат точки возвращается, как только завершились траектории
+    всех точек до неё включительно, поэтому результаты идут в порядке
+    начальных точек и появляются по мере интегрирования, а не после
+    завершения всего набора.
+
+    Функция ode должна принимать массив формы (2, N) и возвращать
+    массив той же формы (так устроена, например, models.ode_storage.equation).
+
+    :param start_points: Массив начальных точек формы (N, 2).
+    :param ode: функция, задающая дифференциальное уравнение.
+    :param max_steps: Максимальное количество шагов.
+    :param max_time: Максимальное время интегрирования.
+    :param max_wall_time: Максимальное время работы в секундах для
+        всего набора траекторий. По умолчанию не ограничено.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность. Проверяется на каждом
+        шаге сразу для всех активных траекторий.
+    :param statistics: Статистика (см. is_cycle).
+    :param floquet: Вычислять ли мультипликатор Флоке циклов
+        (см. is_cycle).
+    :param keep_trajectories: Восстанавливать ли траектории циклов.
+        Если нет, история шагов не хранится, и память не растёт
+        с длиной траекторий; размах цикла находится по границам,
+        обновляемым на каждом шаге.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Словари того же вида, что возвращает is_cycle, в порядке
+        начальных точек. Траектория восстанавливается только для циклов
+        и только если задан keep_trajectories, иначе вместо неё
+        хранится None.
+    """
+    # Задаём шаг
+    hop = 1e-2
+
+    start_points = np.array(start_points, dtype=float).reshape(-1, 2)
+    count_points = len(start_points)
+
+    # Индексы активных траекторий и их состояние
+    active = np.arange(count_points)
+    current = start_points.copy()
+    start = start_points.copy()
+    count_x_intersections = np.zeros(count_points, dtype=int)
+    sum_differences = np.zeros(count_points)
+
+    # Коды результатов (см. STATUS_CODES) и число шагов каждой траектории.
+    # Траектории, не завершившиеся до исчерпания ограничений,
+    # остаются неопределёнными
+    statuses = np.full(count_points, STATUS_CODES.index(STATUS_UNDECIDED))
+    lengths = np.zeros(count_points, dtype=int)
+
+    # Время возвращения на прямую x = x(0) в исходном направлении
+    # и интеграл дивергенции для активных траекторий, а также
+    # их итоговые значения для циклов
+    direction = np.zeros(count_points)
+    return_time = np.full(count_points, np.nan)
+    divergence = divergence_function(ode, **kwargs) if floquet else None
+    log_multiplier = np.zeros(count_points)
+    periods = np.full(count_points, np.nan)
+    log_multipliers = np.zeros(count_points)
+
+    # История шагов: точки активных траекторий и их индексы.
+    # Без неё размах циклов находится по границам траекторий
+    history_points = [start_points.copy()] if keep_trajectories else None
+    history_ids = [active.copy()] if keep_trajectories else None
+    low = start_points.copy()
+    high = start_points.copy()
+    last_points = start_points.copy()
+
+    # Завершившиеся траектории и количество уже возвращённых результатов
+    done = np.zeros(count_points, dtype=bool)
+    count_yielded = 0
+
+    time_ = 0.0
+    count_hops = 0
+
+    # Ограничения на построение траекторий
+    max_steps = min(max_steps, int(np.ceil(max_time / hop)))
+    deadline = __deadline(max_wall_time)
+
+    if statistics is not None:
+        ode = statistics.counting(ode)
+
+    # Переполнения отлавливаем по маске конечности значений,
+    # поэтому предупреждения numpy здесь не нужны
+    with np.errstate(over='ignore', invalid='ignore'):
+        while active.size:
+            if count_hops >= max_steps or \
+                    deadline is not None and time.monotonic() > deadline:
+                break
+
+            time_ += hop
+            k1 = ode(current.T, time_, **kwargs).T
+            stage2 = current + k1 * hop / 2.
+            k2 = ode(stage2.T, time_ + hop / 2., **kwargs).T
+            stage3 = current + k2 * hop / 2.
+            k3 = ode(stage3.T, time_ + hop / 2., **kwargs).T
+            stage4 = current + k3 * hop
+            k4 = ode(stage4.T, time_ + hop, **kwargs).T
+
+            # Находим разницу между предыдущей и текущей точками
+            difference = (hop / 6.) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+            # Интеграл дивергенции вычисляется теми же стадиями метода
+            if divergence is not None:
+                log_multiplier += (hop / 6.) * (
+                    divergence(current.T) + 2 * divergence(stage2.T)
+                    + 2 * divergence(stage3.T) + divergence(stage4.T)
+                )
+
+            # Погрешность - среднее значение разницы по всем итерациям
+            sum_differences += np.abs(difference[:, 1])
+            count_hops += 1
+            tolerance = sum_differences / count_hops
+
+            previous = current
+            current = current + difference
+
+            # Траектории, не ушедшие на бесконечность. Сравнение с NaN
+            # ложно, поэтому неконечные значения тоже не проходят проверку
+            inside = (np.abs(current) <= blow_up_radius).all(axis=1)
+
+            # Регистрируем пересечения вертикальной оси
+            intersected = (
+                (current[:, 0] > start[:, 0]) & (previous[:, 0] < start[:, 0])
+            ) | (
+                (current[:, 0] < start[:, 0]) & (previous[:, 0] > start[:, 0])
+            )
+            count_x_intersections += intersected
+            if count_hops == 1:
+                direction = difference[:, 0].copy()
+
+            # Время возвращения в исходном направлении
+            # находим линейной интерполяцией
+            returned = intersected & np.isnan(return_time) \
+                & (difference[:, 0] * direction > 0)
+            if returned.any():
+                return_time[returned] = time_ - hop + hop * (
+                    (start[returned, 0] - previous[returned, 0])
+                    / (current[returned, 0] - previous[returned, 0])
+                )
+
+            # Условия положительного и отрицательного выхода
+            positive = (
+                (count_x_intersections >= 1)
+                & (np.abs(start[:, 0] - current[:, 0]) <= tolerance)
+                & (np.abs(start[:, 1] - current[:, 1]) <= tolerance)
+            )
+            negative = (
+                (count_x_intersections >= 2)
+                & (current[:, 0] - start[:, 0] >= tolerance)
+            )
+            positive &= inside
+            finished = positive | negative | ~inside
+
+            # Сохраняем шаг для траекторий с конечными значениями
+            if keep_trajectories:
+                history_points.append(current[inside])
+                history_ids.append(active[inside])
+            else:
+                ids = active[inside]
+                low[ids] = np.minimum(low[ids], current[inside])
+                high[ids] = np.maximum(high[ids], current[inside])
+                last_points[ids] = current[inside]
+            lengths[active[inside]] = count_hops
+
+            statuses[active[positive]] = STATUS_CODES.index(STATUS_CYCLE)
+            if positive.any():
+                period = __return_time(
+                    start[positive, 0],
+                    current[positive],
+                    time_,
+                    return_time[positive],
+                    ode(current[positive].T, time_, **kwargs)[0]
+                )
+                periods[active[positive]] = period
+                if divergence is not None:
+                    log_multipliers[active[positive]] = \
+                        log_multiplier[positive] + divergence(
+                            current[positive].T
+                        ) * (period - time_)
+            statuses[active[finished & ~positive]] = \
+                STATUS_CODES.index(STATUS_NOT_CYCLE)
+
+            if statistics is not None:
+                statistics.count_exit(EXIT_POSITIVE, int(positive.sum()))
+                statistics.count_exit(
+                    EXIT_NEGATIVE,
+                    int((negative & inside & ~positive).sum())
+                )
+                finite = np.isfinite(current).all(axis=1)
+                statistics.count_exit(
+                    EXIT_OVERFLOW, int((~inside & ~finite).sum())
                 )
-                k3 = ode(
-                    current_point + k2 * hop / 2.,
-                    time_ + hop / 2.,
+                statistics.count_exit(
+                    EXIT_DIVERGED, int((~inside & finite).sum())
+                )
+
+            # Возвращаем результаты точек, до которых включительно
+            # все траектории завершились
+            done[active[finished]] = True
+            pending = np.flatnonzero(~done[count_yielded:])
+            ready = count_points if not pending.size \
+                else count_yielded + pending[0]
+            if ready > count_yielded:
+                yield from __batch_results(
+                    range(count_yielded, ready), start_points, statuses,
+                    lengths, periods, log_multipliers if floquet else None,
+                    (history_points, history_ids) if keep_trajectories
+                    else (low, high, last_points),
+                    statistics
+                )
+                count_yielded = ready
+
+            # Убираем завершившиеся траектории из активного набора
+            keep = ~finished
+            active = active[keep]
+            current = current[keep]
+            start = start[keep]
+            count_x_intersections = count_x_intersections[keep]
+            sum_differences = sum_differences[keep]
+            direction = direction[keep]
+            return_time = return_time[keep]
+            log_multiplier = log_multiplier[keep]
+
+    if statistics is not None:
+        statistics.count_exit(
+            EXIT_TIMEOUT,
+            active.size,
+            steps=int(lengths.sum())
+        )
+
+    yield from __batch_results(
+        range(count_yielded, count_points), start_points, statuses,
+        lengths, periods, log_multipliers if floquet else None,
+        (history_points, history_ids) if keep_trajectories
+        else (low, high, last_points),
+        statistics
+    )
+
+
+def __batch_results(
+    indices: range,
+    start_points: np.ndarray,
+    statuses: np.ndarray,
+    lengths: np.ndarray,
+    periods: np.ndarray,
+    log_multipliers: np.ndarray | None,
+    history: tuple,
+    statistics: SearchStatistics | None = None
+) -> list[dict]:
+    """
+    Результаты проверки точек векторизованного поиска циклов.
+
+    :param indices: Номера точек.
+    :param start_points: Начальные точки всех траекторий.
+    :param statuses: Коды результатов (см. STATUS_CODES).
+    :param lengths: Количество шагов каждой траектории.
+    :param periods: Периоды циклов.
+    :param log_multipliers: Интегралы дивергенции вдоль циклов или None,
+        если они не вычислялись.
+    :param history: История шагов (точки и индексы активных траекторий
+        на каждом шаге), по которой восстанавливаются траектории,
+        или кортеж (наименьшие значения, наибольшие значения,
+        последние точки) траекторий, если история не хранится.
+    :param statistics: Статистика, в которой учитывается время
+        восстановления траекторий.
+
+    :return: Словари того же вида, что возвращает is_cycle.
+    """
+    cycles = np.array(
+        [i for i in indices if STATUS_CODES[statuses[i]] == STATUS_CYCLE],
+        dtype=int
+    )
+    results = []
+    if len(history) == 2:
+        with timer(statistics, PHASE_RESTORE):
+            trajectories = __restore_trajectories(
+                cycles, lengths, *history
+            )
+        characteristics = {
+            i: __cycle_characteristics(
+                start_points[i],
+                trajectories[i],
+                periods[i],
+                None if log_multipliers is None else log_multipliers[i]
+            )
+            for i in cycles
+        }
+    else:
+        low, high, last_points = history
+        trajectories = {}
+        characteristics = {
+            i: __bounds_characteristics(
+                start_points[i],
+                low[i],
+                high[i],
+                last_points[i],
+                periods[i],
+                None if log_multipliers is None else log_multipliers[i]
+            )
+            for i in cycles
+        }
+    for i in indices:
+        results.append(__cycle_result(
+            start_points[i],
+            STATUS_CODES[statuses[i]],
+            trajectories.get(i),
+            characteristics.get(i)
+        ))
+    return results
+
+
+def __restore_trajectories(
+    indices: np.ndarray,
+    lengths: np.ndarray,
+    history_points: list,
+    history_ids: list
+) -> dict:
+    """
+    Восстанавливает траектории отдельных точек из истории шагов
+    векторизованного поиска циклов.
+
+    :param indices: Индексы точек, для которых нужны траектории.
+    :param lengths: Количество шагов каждой траектории.
+    :param history_points: Точки активных траекторий на каждом шаге.
+    :param history_ids: Индексы активных траекторий на каждом шаге.
+
+    :return: Словарь вида {индекс точки: траектория}.
+    """
+    trajectories = {i: np.empty((lengths[i] + 1, 2)) for i in indices}
+    for step, (points, ids) in enumerate(zip(history_points, history_ids)):
+        # Точки, траектории которых ещё продолжались на этом шаге
+        alive = indices[lengths[indices] >= step]
+        if not alive.size:
+            break
+        positions = np.searchsorted(ids, alive)
+        for i, position in zip(alive, positions):
+            trajectories[i][step] = points[position]
+    return trajectories
+
+
+def __dormand_prince_steps(
+    y0: np.ndarray,
+    ode: callable,
+    rtol: float,
+    atol: float,
+    max_hop: float,
+    statistics: SearchStatistics | None = None,
+    blow_up_radius: float = BLOW_UP_RADIUS,
+    **kwargs
+):
+    """
+    Генератор принятых шагов метода Дормана-Принса 5(4)
+    с адаптивным выбором шага.
+
+    :param y0: Начальные условия.
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param max_hop: Максимальный шаг.
+    :param statistics: Статистика, в которой учитываются вычисления
+        правой части, принятые и отброшенные шаги.
+    :param blow_up_radius: Радиус, при выходе за который решение
+        считается уходящим на бесконечность.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Кортежи (t, y, hop, k, y_new), где t и y - начало шага,
+        hop - длина шага, k - значения правой части на стадиях,
+        необходимые для плотной выдачи, y_new - конец шага.
+        Генератор завершается при получении неконечных значений,
+        при выходе принятого шага за радиус blow_up_radius или
+        при уменьшении шага до уровня машинной точности (решение
+        уходит на бесконечность).
+    """
+    time_ = 0.0
+    y = np.array(y0, dtype=np.float64)
+    k = np.empty((7, len(y)))
+
+    if statistics is not None:
+        ode = statistics.counting(ode)
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        k[0] = ode(y, time_, **kwargs)
+
+        # Начальный шаг выбираем по норме правой части
+        scale = atol + rtol * np.abs(y)
+        d0 = np.sqrt(np.mean((y / scale) ** 2))
+        d1 = np.sqrt(np.mean((k[0] / scale) ** 2))
+        hop = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+        hop = min(hop, max_hop)
+
+        while True:
+            # Вычисляем стадии метода
+            for stage in range(1, 6):
+                k[stage] = ode(
+                    y + hop * (DP_A[stage] @ k[:stage]),
+                    time_ + DP_C[stage] * hop,
                     **kwargs
                 )
-                k4 = ode(current_point + k3 * hop, time_ + hop, **kwargs)
-            except FloatingPointError:
+            y_new = y + hop * (DP_B[:6] @ k[:6])
+            k[6] = ode(y_new, time_ + hop, **kwargs)
+
+            if not (np.isfinite(y_new).all() and np.isfinite(k[6]).all()):
+                return
+
+            # Оцениваем погрешность шага
+            scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+            error = np.sqrt(np.mean((hop * (DP_E @ k) / scale) ** 2))
+
+            # Множитель нового шага
+            if error == 0:
+                factor = 10.
+            else:
+                factor = min(10., max(0.2, 0.9 * error ** -0.2))
+
+            if statistics is not None:
+                if error <= 1:
+                    statistics.steps += 1
+                else:
+                    statistics.rejected_steps += 1
+
+            if error <= 1:
+                if not (np.abs(y_new) <= blow_up_radius).all():
+                    return
+                yield time_, y, hop, k, y_new
+                time_ += hop
+                y = y_new
+                # Последняя стадия совпадает с первой стадией
+                # следующего шага (FSAL)
+                k = k.copy()
+                k[0] = k[6]
+            hop = min(hop * factor, max_hop)
+
+            # Шаг стал неразличим на фоне времени - дальше не продвинуться
+            if hop < 10 * np.spacing(time_):
+                return
+
+
+def __dense_output(
+    y: np.ndarray,
+    hop: float,
+    k: np.ndarray,
+    theta: float | np.ndarray
+) -> np.ndarray:
+    """
+    Значение решения внутри шага метода Дормана-Принса,
+    полученное интерполяцией 4-го порядка.
+
+    :param y: Значение решения в начале шага.
+    :param hop: Длина шага.
+    :param k: Значения правой части на стадиях шага.
+    :param theta: Доля шага (от 0 до 1) или массив долей.
+
+    :return: Значение решения (или массив значений) в заданных точках шага.
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    powers = np.stack([theta ** power for power in range(1, 5)])
+    return y + hop * np.tensordot(k.T @ DP_P, powers, axes=1).T
+
+
+def dormand_prince(
+    y0: np.ndarray,
+    ode: callable,
+    time_: np.ndarray,
+    rtol: float = RTOL,
+    atol: float = ATOL,
+    **kwargs
+) -> np.ndarray:
+    """
+    Функция численно находит решение задачи Коши методом
+    Дормана-Принса 5(4) с адаптивным шагом. Значения в заданные
+    моменты времени получаются плотной выдачей, поэтому шаг
+    метода не зависит от сетки time_.
+
+    :param y0: Массив начальных условий y(0) и y'(0).
+    :param ode: Функция, задающая дифференциальное уравнение.
+    :param time_: Возрастающий массив моментов времени, начиная с 0.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Массив, содержащий точки, определяющие траекторию.
+        При получении неконечных значений массив обрезается.
+    """
+    time_ = np.asarray(time_, dtype=np.float64)
+    sol = np.empty((len(time_), len(y0)))
+    sol[0] = y0
+
+    # Индекс следующего момента времени, для которого нужно значение
+    index = 1
+    max_hop = time_[-1] - time_[0] if len(time_) > 1 else 0.
+    if index >= len(time_):
+        return sol
+
+    for start, y, hop, k, _ in __dormand_prince_steps(
+        y0, ode, rtol, atol, max_hop, **kwargs
+    ):
+        end = np.searchsorted(time_, start + hop, side='right')
+        if end > index:
+            theta = (time_[index:end] - start) / hop
+            sol[index:end] = __dense_output(y, hop, k, theta)
+            index = end
+        if index >= len(time_):
+            return sol
+    return sol[:index]
+
+
+def __find_section_crossing(
+    y: np.ndarray,
+    hop: float,
+    k: np.ndarray,
+    section: float,
+    y_new: np.ndarray
+) -> float:
+    """
+    Поиск доли шага, на которой траектория пересекает прямую x = section.
+    Используется метод ложного положения (модификация Иллинойс)
+    для плотной выдачи шага.
+
+    :param y: Значение решения в начале шага.
+    :param hop: Длина шага.
+    :param k: Значения правой части на стадиях шага.
+    :param section: Абсцисса секущей прямой.
+    :param y_new: Значение решения в конце шага.
+
+    :return: Доля шага от 0 до 1.
+    """
+    left, right = 0., 1.
+    f_left, f_right = y[0] - section, y_new[0] - section
+    side = 0
+    for _ in range(50):
+        theta = (left * f_right - right * f_left) / (f_right - f_left)
+        f_theta = __dense_output(y, hop, k, theta)[0] - section
+        if abs(f_theta) < 1e-15 or right - left < 1e-15:
+            break
+        if f_theta * f_right > 0:
+            right, f_right = theta, f_theta
+            if side == -1:
+                f_left /= 2
+            side = -1
+        else:
+            left, f_left = theta, f_theta
+            if side == 1:
+                f_right /= 2
+            side = 1
+    return theta
+
+
+def poincare_return(
+    start_point: np.array,
+    ode: callable,
+    rtol: float = RTOL,
+    atol: float = ATOL,
+    max_hop: float = MAX_ADAPTIVE_HOP,
+    max_time: float = MAX_RETURN_TIME,
+    max_steps: int = MAX_STEPS,
+    max_wall_time: float | None = None,
+    blow_up_radius: float = BLOW_UP_RADIUS,
+    statistics: SearchStatistics | None = None,
+    divergence: callable = None,
+    **kwargs
+) -> dict:
+    """
+    Функция строит траекторию методом Дормана-Принса 5(4) до её
+    возвращения на прямую x = x(0) в том же направлении, в котором
+    она стартовала (отображение Пуанкаре). Точка возвращения находится
+    интерполяцией плотной выдачи.
+
+    :param start_point: Точка на секущей прямой, с которой необходимо
+        начать построение траектории.
+    :param ode: функция, задающая дифференциальное уравнение.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param max_hop: Максимальный шаг метода.
+    :param max_time: Время, после которого траектория считается
+        не вернувшейся (например, если она стартовала из положения
+        равновесия).
+    :param max_steps: Максимальное количество шагов.
+    :param max_wall_time: Максимальное время работы в секундах.
+        По умолчанию не ограничено.
+    :param blow_up_radius: Радиус, при выходе за который траектория
+        считается уходящей на бесконечность и не вернувшейся.
+    :param statistics: Статистика, в которой учитываются вычисления
+        правой части, принятые и отброшенные шаги.
+    :param divergence: Дивергенция правой части. Если задана, её
+        интеграл вдоль траектории вычисляется методом трапеций
+        по принятым шагам.
+    :param kwargs: Параметры дифференциального уравнения.
+
+    :return: Словарь вида:
+
+    {
+        # Точка возвращения на прямую x = x(0)
+        # или None, если траектория не вернулась
+        'return_point': [0, 0.01],
+
+        # Интеграл дивергенции до точки возвращения
+        # или None, если он не вычислялся
+        'log_multiplier': -1.6,
+
+        # Исчерпано ли одно из ограничений до возвращения траектории
+        'timeout': False,
+
+        # Время возвращения или None
+        'period': 6.28,
+
+        # Точка пересечения прямой x = x(0) в обратном направлении
+        # или None, если траектория её не пересекла
+        'crossing_point': [0, -0.01],
+
+        # Суммарное изменение x' вдоль траектории
+        'variation': 0.04,
+
+        # Массив описывающий фазовую траекторию
+        'trajectory': [
+            [0, 0.01],
+            ...
+            [0, 0.01]
+        ]
+    }
+    """
+    section = start_point[0]
+    points = TrajectoryBuffer()
+    points.append(start_point)
+
+    # Количество пересечений прямой x = x(0)
+    count_x_intersections = 0
+
+    # Суммарное изменение x' вдоль траектории
+    variation = 0.0
+
+    # Интеграл дивергенции вдоль траектории
+    log_multiplier = None if divergence is None else 0.0
+
+    deadline = __deadline(max_wall_time)
+    timeout = False
+    crossing_point = None
+
+    steps = __dormand_prince_steps(
+        start_point, ode, rtol, atol, max_hop, statistics, blow_up_radius,
+        **kwargs
+    )
+    for step, (time_, y, hop, k, y_new) in enumerate(steps, start=1):
+        # Пересечение определяем по смене знака x - x(0)
+        if (y[0] - section) * (y_new[0] - section) < 0:
+            count_x_intersections += 1
+
+            # Первое пересечение - в обратном направлении
+            if count_x_intersections == 1:
+                crossing_point = __dense_output(
+                    y, hop, k, __find_section_crossing(
+                        y, hop, k, section, y_new
+                    )
+                )
+                crossing_point[0] = section
+
+            # Второе пересечение - возвращение в исходном направлении
+            if count_x_intersections == 2:
+                theta = __find_section_crossing(y, hop, k, section, y_new)
+                crossing = __dense_output(y, hop, k, theta)
+                crossing[0] = section
+                points.append(crossing)
+                if divergence is not None:
+                    log_multiplier += theta * hop / 2. * (
+                        divergence(y) + divergence(crossing)
+                    )
                 return {
-                    'start_point': start_point,
-                    'result': False,
-                    'trajectory': points
+                    'return_point': crossing,
+                    'log_multiplier': log_multiplier,
+                    'timeout': False,
+                    'period': time_ + theta * hop,
+                    'crossing_point': crossing_point,
+                    'variation': variation + abs(crossing[1] - y[1]),
+                    'trajectory': points.view()
                 }
 
-        # Находим разницу между предыдущей и текущей точки
-        difference = (hop / 6.) * (k1 + 2 * k2 + 2 * k3 + k4)
+        variation += abs(y_new[1] - y[1])
+        points.append(y_new)
+        if divergence is not None:
+            log_multiplier += hop / 2. * (divergence(y) + divergence(y_new))
 
-        # Находим текущее значение погрешности
-        # Исходя из среднего значения разницы по всем итерациям
-        sum_differences += abs(difference[1])
-        count_hops += 1
-        tolerance = sum_differences / count_hops
+        if time_ + hop >= max_time or step >= max_steps or \
+                deadline is not None and time.monotonic() > deadline:
+            timeout = True
+            break
 
-        # Находим значения y и y' на текущем шаге
-        current_point += difference
-        points = np.vstack((points, np.array([current_point])))
+    return {
+        'return_point': None,
+        'log_multiplier': log_multiplier,
+        'timeout': timeout,
+        'period': None,
+        'crossing_point': crossing_point,
+        'variation': variation,
+        'trajectory': points.view()
+    }
 
-        # Если мы пересекаем вертикальную ось - регистрируем это.
-        if __is_vertical_axe_intersected(
-            current_point,
-            points[-2],
-            start_point
-        ):
-            count_x_intersections += 1
 
-        # Формируем условия для положительного выхода из цикла
-        # 1) Вертикальная ось была пересечена
-        positive_conditions = [
-            count_x_intersections >= 1,
-            abs(start_point[0] - current_point[0]) <= tolerance,
-            abs(start_point[1] - current_point[1]) <= tolerance
-        ]
+def is_cycle_adaptive(
+    start_point: np.array,
+    ode: callable,
+    rtol: float = RTOL,
+    atol: float = ATOL,
+    tolerance: float | None = None,
+    max_hop: float = MAX_ADAPTIVE_HOP,
+    statistics: SearchStatistics | None = None,
+    floquet: bool = False,
+    **kwargs
+) -> dict:
+    """
+    Аналог функции is_cycle на основе метода Дормана-Принса 5(4)
+    с адаптивным шагом.
 
-        # Если соблюдены условия для положительного выхода
-        #   Возвращаем положительный результат
-        if all(positive_conditions):
-            return {
-                'start_point': start_point,
-                'result': True,
-                'trajectory': points
-            }
-
-        # Если мы пересекли вертикальную ось два или более раз
-        # Находимся далеко от неё и до сих пор не вышли из цикла - выходим
-        negative_conditions = (
-            count_x_intersections >= 2,
-            current_point[0] - start_point[0] >= tolerance
-        )
-        if all(negative_conditions):
-            return {
-                'start_point': start_point,
-                'result': False,
-                'trajectory': points
-            }
+    Траектория интегрируется до возвращения на прямую x = x(0)
+    в том же направлении, в котором она стартовала (см. poincare_return).
+    Траектория считается циклом, если точка возвращения отстоит
+    от начальной не более чем на tolerance.
+
+    :param start_point: Точка, с которой необходимо начать
+        построение траектории.
+    :param ode: функция, задающая дифференциальное уравнение.
+    :param rtol: Допустимая относительная погрешность шага.
+    :param atol: Допустимая абсолютная погрешность шага.
+    :param tolerance: Допустимая погрешность замыкания. По умолчанию
+        вычисляется так же, как в is_cycle: среднее изменение x'
+        за шаг CYCLE_HOP.
+    :param max_hop: Максимальный шаг метода.
+    :param statistics: Статистика (см. poincare_return), в которой
+        также учитывается причина завершения.
+    :param floquet: Вычислять ли мультипликатор Флоке цикла
+        (см. is_cycle). Период берётся из точки возвращения.
+    :param kwargs: Параметры дифференциального уравнения
+        и ограничения на построение траектории (см. poincare_return).
+
+    :return: Словарь того же вида, что возвращает is_cycle.
+    """
+    section_return = poincare_return(
+        start_point, ode, rtol, atol, max_hop,
+        statistics=statistics,
+        divergence=divergence_function(ode, **kwargs) if floquet else None,
+        **kwargs
+    )
+    crossing = section_return['return_point']
+    if crossing is None:
+        if section_return['timeout']:
+            status, reason = STATUS_UNDECIDED, EXIT_TIMEOUT
+        else:
+            status, reason = STATUS_NOT_CYCLE, EXIT_NO_RETURN
+    else:
+        if tolerance is None:
+            tolerance = CYCLE_HOP * section_return['variation'] \
+                / section_return['period']
+        if abs(crossing[1] - start_point[1]) <= tolerance:
+            status, reason = STATUS_CYCLE, EXIT_POSITIVE
+        else:
+            status, reason = STATUS_NOT_CYCLE, EXIT_NEGATIVE
+
+    if statistics is not None:
+        statistics.count_exit(reason)
+
+    return __cycle_result(
+        start_point,
+        status,
+        section_return['trajectory'],
+        __cycle_characteristics(
+            start_point,
+            section_return['trajectory'],
+            section_return['period'],
+            section_return['log_multiplier']
+        ) if status == STATUS_CYCLE else None
+    )
@@ -0,0 +1,242 @@
+"""
+    Передача найденных циклов между процессами через общую память
+
+    При параллельном поиске каждая часть диапазона x'(0) обрабатывается
+    в отдельном процессе. Вместо сериализации словарей с траекториями
+    процесс записывает циклы в заранее выделенный участок общей памяти
+    (multiprocessing.shared_memory), а родительский процесс читает их
+    как представления массивов без копирования.
+
+    Блок общей памяти состоит из столбцовых массивов, как хранилище
+    models.cycle_archive:
+        - counts - количество записанных циклов и точек каждой части;
+        - start_points - начальные точки циклов;
+        - spans - смещение и длина траектории цикла в массиве точек
+          и маска имеющихся характеристик;
+        - metrics - характеристики циклов (METRIC_COLUMNS);
+        - points - точки траекторий.
+    Каждой части отводятся свои строки массивов, поэтому процессы
+    пишут без блокировок. Циклы, траектории которых не поместились
+    в отведённый части участок, передаются обычным способом.
+
+    Автор: Петряшев К. С.
+"""
+import shutil
+import weakref
+from multiprocessing import shared_memory
+from typing import Final, Iterator
+
+import numpy as np
+
+from models.cycle_archive import METRIC_COLUMNS, metric_mask
+
+
+# Количество точек траекторий, резервируемое на одну начальную точку.
+# Страницы общей памяти выделяются при первой записи, поэтому
+# неиспользованный резерв не занимает оперативную память
+SHARED_POINTS_PER_START: Final = 1024
+
+# Наибольшее количество точек траекторий в одном блоке
+SHARED_MAX_POINTS: Final = 1 << 22
+
+# Каталог, в котором система размещает общую память
+SHARED_MEMORY_DIRECTORY: Final = '/dev/shm'
+
+# Доля свободного места в SHARED_MEMORY_DIRECTORY, которую может
+# занять блок. Запись за пределы свободного места завершила бы
+# процесс сигналом SIGBUS
+SHARED_MEMORY_FRACTION: Final = 0.5
+
+# Размер элемента всех массивов блока в байтах
+ITEM_SIZE: Final = 8
+
+
+def shared_points_capacity(count_starts: int) -> int:
+    """
+    Количество точек траекторий для блока, в который записываются
+    циклы count_starts начальных точек.
+
+    :param count_starts: Количество проверяемых начальных точек.
+
+    :return: Количество точек.
+    """
+    capacity = min(count_starts * SHARED_POINTS_PER_START, SHARED_MAX_POINTS)
+    try:
+        free = shutil.disk_usage(SHARED_MEMORY_DIRECTORY).free
+    except OSError:
+        return capacity
+    return min(capacity, int(free * SHARED_MEMORY_FRACTION) // (2 * ITEM_SIZE))
+
+
+class SharedCycleArena:
+    """
+    Блок общей памяти для циклов, найденных несколькими процессами.
+
+    Родительский процесс создаёт блок методом create и передаёт
+    процессам описание layout. Процесс открывает блок по описанию,
+    записывает циклы своей части методом write и закрывает блок.
+    Родительский процесс читает циклы методом read: траектории
+    и начальные точки - представления массивов блока. Память
+    освобождается, когда удалён объект и все эти представления.
+    """
+
+    def __init__(self, layout: tuple, create: bool = False):
+        """
+        Конструктор класса
+
+        :param layout: Описание блока (см. свойство layout).
+        :param create: Создать ли блок. По умолчанию открывается
+            существующий блок.
+        """
+        name, rows, points = layout
+        self.__rows = np.concatenate(([0], np.cumsum(rows, dtype=np.int64)))
+        self.__points = np.concatenate(
+            ([0], np.cumsum(points, dtype=np.int64))
+        )
+        count_rows, count_points = self.__rows[-1], self.__points[-1]
+        shapes = {
+            'counts': (len(rows), 2),
+            'start_points': (count_rows, 2),
+            'spans': (count_rows, 3),
+            'metrics': (count_rows, len(METRIC_COLUMNS)),
+            'points': (count_points, 2)
+        }
+        size = ITEM_SIZE * sum(
+            int(np.prod(shape)) for shape in shapes.values()
+        )
+
+        self.__memory = shared_memory.SharedMemory(
+            name, create=create, size=max(size, ITEM_SIZE) if create else 0
+        )
+        self.__layout = (self.__memory.name, tuple(rows), tuple(points))
+
+        # Все массивы - представления одного массива block. Он и,
+        # значит, блок общей памяти остаются доступны, пока существует
+        # хотя бы одно представление
+        block = np.ndarray(
+            (max(size, ITEM_SIZE),), np.uint8, buffer=self.__memory.buf
+        )
+        self.__arrays = {}
+        start = 0
+        for array_name, shape in shapes.items():
+            end = start + ITEM_SIZE * int(np.prod(shape))
+            dtype = np.float64 if array_name in (
+                'start_points', 'metrics', 'points'
+            ) else np.int64
+            self.__arrays[array_name] = block[start:end].view(dtype) \
+                .reshape(shape)
+            start = end
+        self.__finalizer = weakref.finalize(block, self.__memory.close)
+
+    @classmethod
+    def create(
+        cls,
+        rows: list[int],
+        points: list[int]
+    ) -> 'SharedCycleArena':
+        """
+        Создание блока.
+
+        :param rows: Наибольшее количество циклов каждой части.
+        :param points: Количество точек траекторий каждой части.
+
+        :return: Блок общей памяти.
+        """
+        return cls((None, tuple(rows), tuple(points)), create=True)
+
+    @property
+    def layout(self) -> tuple:
+        """
+        Описание блока для открытия в другом процессе: имя блока
+        общей памяти, количество строк и точек каждой части
+        """
+        return self.__layout
+
+    def write(self, part: int, cycles: list[dict]) -> list[dict]:
+        """
+        Запись циклов части. Вызывается процессом, обработавшим часть.
+
+        :param part: Номер части.
+        :param cycles: Циклы в формате результата
+            controllers.phase_controller.find_cycles_in_phase_field
+            в порядке начальных точек.
+
+        :return: Циклы, не поместившиеся в блок. Если цикл не поместился,
+            все следующие за ним циклы тоже возвращаются, чтобы
+            сохранить порядок.
+        """
+        rows = self.__rows[part], self.__rows[part + 1]
+        points = self.__points[part], self.__points[part + 1]
+        start_points = self.__arrays['start_points'][rows[0]:rows[1]]
+        spans = self.__arrays['spans'][rows[0]:rows[1]]
+        metrics = self.__arrays['metrics'][rows[0]:rows[1]]
+        arena = self.__arrays['points'][points[0]:points[1]]
+
+        count, used = 0, 0
+        for cycle in cycles:
+            trajectory = np.reshape(
+                () if cycle.get('trajectory') is None
+                else cycle['trajectory'],
+                (-1, 2)
+            )
+            if count == len(spans) or used + len(trajectory) > len(arena):
+                break
+            arena[used:used + len(trajectory)] = trajectory
+            start_points[count] = cycle['start_point']
+            spans[count] = used, len(trajectory), metric_mask(cycle)
+            metrics[count] = [
+                cycle.get(name, np.nan) for name in METRIC_COLUMNS
+            ]
+            count += 1
+            used += len(trajectory)
+        self.__arrays['counts'][part] = count, used
+        return cycles[count:]
+
+    def read(self, part: int) -> Iterator[dict]:
+        """
+        Чтение циклов части после её обработки.
+
+        :param part: Номер части.
+
+        :return: Циклы в том же виде и порядке, в каком они были
+            записаны. Траектории и начальные точки - представления
+            массивов блока.
+        """
+        count = self.__arrays['counts'][part, 0]
+        rows = slice(self.__rows[part], self.__rows[part] + count)
+        arena = self.__arrays['points'][self.__points[part]:]
+        for start_point, (offset, length, mask), metrics in zip(
+            self.__arrays['start_points'][rows],
+            self.__arrays['spans'][rows].tolist(),
+            self.__arrays['metrics'][rows].tolist()
+        ):
+            yield {
+                'start_point': start_point,
+                'trajectory': arena[offset:offset + length],
+                **{
+                    name: value
+                    for column, (name, value) in enumerate(
+                        zip(METRIC_COLUMNS, metrics)
+                    )
+                    if mask >> column & 1
+                }
+            }
+
+    def close(self) -> None:
+        """
+        Закрытие блока в текущем процессе. После закрытия массивы блока
+        недоступны, поэтому вызывается процессом, записавшим циклы,
+        когда представления больше не используются.
+        """
+        self.__arrays.clear()
+        self.__finalizer()
+
+    def unlink(self) -> None:
+        """
+        Удаление имени блока. Открытые представления остаются
+        доступны, память освобождается вместе с последним из них.
+        """
+        try:
+            self.__memory.unlink()
+        except FileNotFoundError:
+            pass
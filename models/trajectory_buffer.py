@@ -0,0 +1,66 @@
+"""
+    Растущее хранилище точек фазовой траектории
+
+    Автор: Петряшев К. С.
+"""
+from typing import Final
+
+import numpy as np
+
+
+# Начальная вместимость хранилища по умолчанию
+DEFAULT_CAPACITY: Final = 1024
+
+
+class TrajectoryBuffer:
+    """
+    Хранилище точек траектории с предварительно выделенной памятью.
+
+    При заполнении вместимость удваивается, поэтому добавление точки
+    в среднем выполняется за O(1), а построение траектории из n точек
+    занимает линейное время.
+    """
+
+    def __init__(self, dimension: int = 2, capacity: int = DEFAULT_CAPACITY):
+        """
+        Конструктор класса
+
+        :param dimension: Размерность точки траектории.
+        :param capacity: Начальная вместимость хранилища.
+        """
+        self.__data = np.empty((max(capacity, 1), dimension), dtype=np.float64)
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __getitem__(self, key):
+        return self.view()[key]
+
+    def append(self, point: np.ndarray) -> None:
+        """
+        Добавить точку в конец траектории.
+
+        :param point: Точка траектории.
+        """
+        if self.__size == len(self.__data):
+            self.__grow()
+        self.__data[self.__size] = point
+        self.__size += 1
+
+    def view(self) -> np.ndarray:
+        """
+        Получить траекторию без неиспользованной части хранилища.
+
+        :return: Представление массива формы (n, dimension) без копирования.
+        """
+        return self.__data[:self.__size]
+
+    def __grow(self) -> None:
+        """Удвоить вместимость хранилища"""
+        data = np.empty(
+            (2 * len(self.__data), self.__data.shape[1]),
+            dtype=np.float64
+        )
+        data[:self.__size] = self.__data[:self.__size]
+        self.__data = data
@@ -0,0 +1,157 @@
+"""
+Проверка систем реестра models.ode_registry.
+
+Матрица Якоби и дивергенция сравниваются с центральными разностями
+правой части, а сгенерированные функции системы 'quadratic' -
+с исходной формулой функции models.ode_storage.equation:
+
+    y' = mu * y - x - a1 * x^2 - a2 * x * y - a3 * y^2
+
+Запуск из корня репозитория:
+
+    python -m pytest -q tests
+
+Автор: Петряшев К. С.
+"""
+
+from typing import Final
+
+import numpy as np
+import pytest
+
+from models.ode_registry import get_system
+from models.ode_storage import BoundEquation, equation
+from models.rk4_kernels import initial_loop_state
+
+# Количество случайных точек и наборов коэффициентов
+COUNT_POINTS: Final = 64
+COUNT_COEFFICIENTS: Final = 8
+
+# Шаг центральных разностей и допустимая погрешность. Правые части
+# систем - многочлены не выше третьей степени, поэтому погрешность
+# разностей порядка STEP^2 и ошибок округления
+STEP: Final = 1e-5
+TOLERANCE: Final = 1e-6
+
+# Шаг и наибольшее количество шагов метода Рунге-Кутты при проверке
+# цикла rk4_cycle_loop
+HOP: Final = 0.001
+COUNT_HOPS: Final = 200
+
+SYSTEMS: Final = ('quadratic', 'van_der_pol')
+
+
+def baseline_rhs(
+    x: np.ndarray | float,
+    y: np.ndarray | float,
+    mu: float,
+    a1: float,
+    a2: float,
+    a3: float
+) -> tuple:
+    """
+    Правая часть в том виде, в каком она была записана в equation
+    до появления реестра систем.
+    """
+    return y, mu * y - x - a1 * x ** 2 - a2 * x * y - a3 * y ** 2
+
+
+def random_coefficients(
+    rng: np.random.Generator,
+    system: str
+) -> dict[str, float]:
+    """Случайные значения коэффициентов системы"""
+    names = get_system(system).coefficient_names
+    return dict(zip(names, rng.uniform(-2., 2., len(names))))
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    """Генератор случайных чисел с фиксированным зерном"""
+    return np.random.default_rng(2024)
+
+
+@pytest.mark.parametrize('system', SYSTEMS)
+def test_jacobian_matches_finite_differences(rng, system):
+    for _ in range(COUNT_COEFFICIENTS):
+        rhs = BoundEquation(system, **random_coefficients(rng, system))
+        points = rng.uniform(-2., 2., (2, COUNT_POINTS))
+
+        expected = np.empty((2, 2, COUNT_POINTS))
+        for column, shift in enumerate(np.eye(2) * STEP):
+            expected[:, column] = (
+                rhs(points + shift[:, np.newaxis])
+                - rhs(points - shift[:, np.newaxis])
+            ) / (2 * STEP)
+
+        np.testing.assert_allclose(
+            rhs.jacobian(points), expected, atol=TOLERANCE
+        )
+        np.testing.assert_allclose(
+            rhs.divergence(points),
+            expected[0, 0] + expected[1, 1],
+            atol=TOLERANCE
+        )
+
+
+@pytest.mark.parametrize('system', SYSTEMS)
+def test_jacobian_of_single_point(rng, system):
+    rhs = BoundEquation(system, **random_coefficients(rng, system))
+    points = rng.uniform(-2., 2., (2, COUNT_POINTS))
+    jacobians = rhs.jacobian(points)
+    divergences = rhs.divergence(points)
+    for index, point in enumerate(points.T):
+        np.testing.assert_allclose(rhs.jacobian(point), jacobians[..., index])
+        assert rhs.divergence(point) == pytest.approx(divergences[index])
+
+
+def test_kernels_match_baseline(rng):
+    for _ in range(COUNT_COEFFICIENTS):
+        coefficients = random_coefficients(rng, 'quadratic')
+        rhs = BoundEquation('quadratic', **coefficients)
+        points = rng.uniform(-2., 2., (2, COUNT_POINTS))
+        expected = np.array(baseline_rhs(*points, **coefficients))
+
+        np.testing.assert_allclose(rhs(points), expected, rtol=1e-12)
+        np.testing.assert_allclose(
+            equation(points, 0., **coefficients), expected, rtol=1e-12
+        )
+        for point, value in zip(points.T, expected.T):
+            np.testing.assert_allclose(
+                rhs.scalar(*point), value, rtol=1e-12
+            )
+            np.testing.assert_allclose(rhs(point), value, rtol=1e-12)
+
+
+def test_cycle_loop_matches_baseline(rng):
+    kernels = get_system('quadratic').kernels
+    for _ in range(COUNT_COEFFICIENTS):
+        coefficients = random_coefficients(rng, 'quadratic')
+        rhs = BoundEquation('quadratic', **coefficients)
+        x0, y0 = rng.uniform(-0.5, 0.5, 2)
+
+        trajectory, state = initial_loop_state(x0, y0)
+        _, trajectory, size = kernels.rk4_cycle_loop(
+            x0, y0, rhs.kernel_coefficients, HOP, COUNT_HOPS,
+            np.inf, trajectory, 1, state
+        )
+        # Цикл может завершиться раньше, например, если траектория
+        # дважды пересекла прямую x = x0, но хотя бы один шаг делается
+        assert 1 < size <= COUNT_HOPS + 1
+
+        def ode(point: np.ndarray) -> np.ndarray:
+            return np.array(baseline_rhs(*point, **coefficients))
+
+        expected = np.empty((size, 2))
+        expected[0] = point = np.array([x0, y0])
+        for index in range(1, size):
+            k1 = ode(point)
+            k2 = ode(point + k1 * HOP / 2.)
+            k3 = ode(point + k2 * HOP / 2.)
+            k4 = ode(point + k3 * HOP)
+            point = point + (HOP / 6.) * (k1 + 2 * k2 + 2 * k3 + k4)
+            expected[index] = point
+
+        np.testing.assert_allclose(
+            trajectory[:size], expected, rtol=1e-9, atol=1e-12
+        )
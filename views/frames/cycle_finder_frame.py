@@ -1,20 +1,32 @@
 """
 Основной фрейм поиска циклов в фазовом поле
+
+numpy, matplotlib и контроллер поиска импортируются отложенно
+(views.lazy_import), а график создаётся при первой отрисовке,
+поэтому окно появляется сразу после запуска.
 """
 
+from __future__ import annotations
+
+import queue
+import threading
 from typing import Final
 from tkinter import messagebox
 
-import numpy as np
 import customtkinter as ctk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from views.frames.float_entry_frame import EntryFrame
-from controllers.phase_controller import (
-    find_cycles_in_phase_field,
-    get_solution_by_initial_conditions
-)
+from views.lazy_import import lazy_import
+from views.windows.progress_window import ProgressWindow
+
+np = lazy_import('numpy')
+mpl_collections = lazy_import('matplotlib.collections')
+mpl_figure = lazy_import('matplotlib.figure')
+backend_tkagg = lazy_import('matplotlib.backends.backend_tkagg')
+instrumentation = lazy_import('models.instrumentation')
+result_cache = lazy_import('models.result_cache')
+plot_decimation = lazy_import('views.plot_decimation')
+phase_controller = lazy_import('controllers.phase_controller')
 
 
 class CycleFinderFrame(ctk.CTkFrame):
@@ -26,6 +38,15 @@ class CycleFinderFrame(ctk.CTkFrame):
     # Обозначаем шаг для дополнительных траекторий
     HOP: Final = 0.004
 
+    # Период опроса очереди сообщений фонового поиска, мс
+    POLL_INTERVAL: Final = 50
+
+    # Поле вокруг траекторий при выборе границ графика, доля размаха
+    PLOT_MARGIN: Final = 0.05
+
+    # Цвет фона графика
+    PLOT_BACKGROUND: Final = '#2b2b2b'
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -38,6 +59,11 @@ class CycleFinderFrame(ctk.CTkFrame):
         # Настройка параметров уравнения
         self.__configure_equation()
 
+        # Поиск циклов, повторно использующий просмотренные участки
+        # диапазона и кэш результатов на диске. Создаётся при первом
+        # поиске вместе с импортом контроллера
+        self.__search = None
+
     def __configure_grid(self):
         """Настройка сетки"""
         self.grid_rowconfigure((0, 7), weight=0)
@@ -47,24 +73,33 @@ class CycleFinderFrame(ctk.CTkFrame):
 
     def __widgets_configure(self):
         """Настрока виджетов"""
-        # Позиционирование графика
-        self.__figure = Figure(dpi=100, facecolor='#2b2b2b')
-        self.__plot = self.__figure.add_subplot()
-        self.__plot.tick_params(axis='x', colors='white')
-        self.__plot.tick_params(axis='y', colors='white')
-        self.__plot.set_xlabel('x')
-        self.__plot.set_ylabel("x'")
-        self.__plot.xaxis.label.set_color('white')
-        self.__plot.yaxis.label.set_color('white')
-        self.__canvas = FigureCanvasTkAgg(figure=self.__figure, master=self)
-        self.__canvas.get_tk_widget().grid(
+        # До первой отрисовки на месте графика пустая рамка того же
+        # цвета: matplotlib импортируется только в __create_plot
+        self.__figure = None
+        self.__plot = None
+        self.__canvas = None
+        self.__plot_placeholder = ctk.CTkFrame(
+            self,
+            fg_color=self.PLOT_BACKGROUND,
+            corner_radius=0
+        )
+        self.__plot_placeholder.grid(
             row=1,
             column=1,
             rowspan=6,
             columnspan=3,
             sticky='nsew'
         )
-        self.__canvas.draw()
+
+        # Все циклы рисуются одной коллекцией линий, прореженных
+        # до разрешения графика. Во время поиска коллекция
+        # перерисовывается поверх сохранённого фона (blitting)
+        self.__cycles = []
+        self.__segments = []
+        self.__cycle_lines = None
+        self.__new_cycle_lines = None
+        self.__bounds = None
+        self.__background = None
 
         # Позиционирование подсказывающих надписей
         self.__init_conditios_label = ctk.CTkLabel(
@@ -140,6 +175,36 @@ class CycleFinderFrame(ctk.CTkFrame):
             pady=10
         )
 
+    def __create_plot(self) -> None:
+        """Создание графика вместо пустой рамки при первой отрисовке"""
+        if self.__canvas is not None:
+            return
+        self.__figure = mpl_figure.Figure(
+            dpi=100,
+            facecolor=self.PLOT_BACKGROUND
+        )
+        self.__plot = self.__figure.add_subplot()
+        self.__plot.tick_params(axis='x', colors='white')
+        self.__plot.tick_params(axis='y', colors='white')
+        self.__plot.set_xlabel('x')
+        self.__plot.set_ylabel("x'")
+        self.__plot.xaxis.label.set_color('white')
+        self.__plot.yaxis.label.set_color('white')
+        self.__canvas = backend_tkagg.FigureCanvasTkAgg(
+            figure=self.__figure,
+            master=self
+        )
+        self.__canvas.get_tk_widget().grid(
+            row=1,
+            column=1,
+            rowspan=6,
+            columnspan=3,
+            sticky='nsew'
+        )
+        self.__plot_placeholder.destroy()
+        self.__canvas.mpl_connect('draw_event', self.__on_draw)
+        self.__canvas.mpl_connect('resize_event', self.__on_resize)
+
     def __configure_equation(self) -> None:
         """Инициализируем все параметры, свазянные с уравнением"""
         # Коэффициенты уравнения, полученные из полей ввода
@@ -179,16 +244,269 @@ class CycleFinderFrame(ctk.CTkFrame):
             )
             return
 
-        self.__plot.clear()
-        # Получаем траектории и начальные условия, где были обнаружены циклы
+        self.__reset_plot(animated=True)
+        self.__canvas.draw_idle()
         self.__configure_equation()
-        search_results = find_cycles_in_phase_field(
-            self.__x.get(),
-            self.__x_dot_min.get(),
-            self.__x_dot_max.get(),
-            **self.__coefficients
+        self.__found_count = 0
+        if self.__search is None:
+            self.__search = phase_controller.IncrementalCycleSearch(
+                cache=result_cache.ResultCache()
+            )
+
+        # Поиск выполняется в фоновом потоке, который передаёт
+        # прогресс и найденные циклы через очередь
+        self.__messages = queue.Queue()
+        self.__cancel = threading.Event()
+        self.__statistics = instrumentation.SearchStatistics()
+        self.__search_button.configure(state='disabled')
+        self.__progress_window = ProgressWindow(
+            on_cancel=self.__cancel.set,
+            master=self
+        )
+        threading.Thread(
+            target=self.__run_search,
+            args=(
+                self.__x.get(),
+                self.__x_dot_min.get(),
+                self.__x_dot_max.get(),
+                dict(self.__coefficients),
+                self.__messages,
+                self.__cancel,
+                self.__statistics
+            ),
+            daemon=True
+        ).start()
+        self.after(self.POLL_INTERVAL, self.__poll_messages)
+
+    def __run_search(
+        self,
+        x: float,
+        y_min: float,
+        y_max: float,
+        coefficients: dict,
+        messages: queue.Queue,
+        cancel: threading.Event,
+        statistics: instrumentation.SearchStatistics
+    ) -> None:
+        """
+        Поиск циклов в фоновом потоке. Виджеты здесь не используются,
+        все данные передаются основному потоку через очередь.
+
+        :param x: Начальное значение x(0).
+        :param y_min: Минимальное значение для x'(0).
+        :param y_max: Максимальное значение для x'(0).
+        :param coefficients: Коэффициенты уравнения.
+        :param messages: Очередь сообщений для основного потока.
+        :param cancel: Событие отмены поиска.
+        :param statistics: Статистика поиска. Читается основным потоком
+            только после завершения поиска.
+        """
+        def on_progress(done: int, total: int, found: list[dict]) -> None:
+            messages.put(('progress', done, total, found))
+
+        # Любая ошибка должна дойти до основного потока,
+        # иначе окно прогресса останется открытым
+        #
+        # pylint: disable=broad-exception-caught
+        try:
+            results = self.__search.search(
+                x,
+                y_min,
+                y_max,
+                on_progress=on_progress,
+                cancel=cancel,
+                statistics=statistics,
+                floquet=True,
+                **coefficients
+            )
+        except Exception as error:
+            messages.put(('error', error))
+        else:
+            messages.put(('done', results))
+        # pylint: enable=broad-exception-caught
+
+    def __poll_messages(self) -> None:
+        """Обработка сообщений фонового потока поиска"""
+        redraw = False
+        while True:
+            try:
+                message = self.__messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if message[0] == 'progress':
+                _, done, total, found = message
+                self.__cycles.extend(found)
+                redraw = redraw or bool(found)
+                self.__found_count += len(found)
+                self.__progress_window.set_progress(
+                    done,
+                    total,
+                    self.__found_count
+                )
+            elif message[0] == 'done':
+                self.__finish_search(message[1])
+                return
+            else:
+                self.__close_progress()
+                messagebox.showerror('Ошибка!', str(message[1]))
+                return
+
+        if redraw:
+            self.__blit_cycles()
+        self.after(self.POLL_INTERVAL, self.__poll_messages)
+
+    def __close_progress(self) -> None:
+        """Закрытие окна прогресса и разблокировка кнопки поиска"""
+        self.__progress_window.destroy()
+        self.__search_button.configure(state='normal')
+
+    def __reset_plot(self, animated: bool = False) -> None:
+        """
+        Очистка графика и создание пустой коллекции линий циклов.
+
+        :param animated: Перерисовывается ли коллекция отдельно
+            от остального графика (во время поиска).
+        """
+        self.__create_plot()
+        self.__plot.clear()
+        self.__cycles = []
+        self.__segments = []
+        self.__bounds = None
+        self.__cycle_lines = mpl_collections.LineCollection(
+            [],
+            linewidths=1,
+            animated=animated
+        )
+        self.__plot.add_collection(self.__cycle_lines)
+
+        # Циклы, дорисовываемые поверх фона во время поиска
+        self.__new_cycle_lines = mpl_collections.LineCollection(
+            [],
+            linewidths=1,
+            animated=True
+        )
+        self.__plot.add_collection(self.__new_cycle_lines, autolim=False)
+
+    def __include_in_bounds(self, trajectories: list[np.ndarray]) -> bool:
+        """
+        Расширение границ графика, чтобы в них помещались траектории.
+
+        :param trajectories: Траектории формы (n, 2).
+
+        :return: Изменились ли границы графика.
+        """
+        trajectories = [points for points in trajectories if len(points)]
+        if not trajectories:
+            return False
+        low = np.min([points.min(axis=0) for points in trajectories], axis=0)
+        high = np.max([points.max(axis=0) for points in trajectories], axis=0)
+        if self.__bounds is not None:
+            old_low, old_high = self.__bounds
+            if (low >= old_low).all() and (high <= old_high).all():
+                return False
+            low = np.minimum(low, old_low)
+            high = np.maximum(high, old_high)
+        self.__bounds = low, high
+        margin = self.PLOT_MARGIN * np.maximum(high - low, 1e-9)
+        self.__plot.set_xlim(low[0] - margin[0], high[0] + margin[0])
+        self.__plot.set_ylim(low[1] - margin[1], high[1] + margin[1])
+        return True
+
+    def __decimate(self, points: np.ndarray) -> np.ndarray:
+        """
+        Прореживание траектории до разрешения графика.
+
+        :param points: Точки траектории формы (n, 2).
+        """
+        return plot_decimation.decimate_to_pixels(
+            points,
+            self.__plot.get_xlim(),
+            self.__plot.get_ylim(),
+            self.__plot.bbox.width,
+            self.__plot.bbox.height
         )
 
+    def __update_cycle_lines(self, redecimate: bool = True) -> None:
+        """
+        Обновление коллекции линий циклов: устойчивые циклы
+        (мультипликатор Флоке меньше 1) - зелёным, неустойчивые -
+        оранжевым.
+
+        :param redecimate: Прореживать ли заново уже нарисованные циклы.
+            Это нужно только при увеличении размера графика: при
+            расширении границ прежнее прореживание остаётся точнее
+            разрешения графика, поэтому прореживаются только новые циклы.
+        """
+        if redecimate:
+            self.__segments = []
+        self.__segments.extend(
+            self.__decimate(result['trajectory'])
+            for result in self.__cycles[len(self.__segments):]
+        )
+        self.__cycle_lines.set_segments(self.__segments)
+        self.__cycle_lines.set_color([
+            'green' if result.get('multiplier', 0.) < 1 else 'orange'
+            for result in self.__cycles
+        ])
+
+    def __blit_cycles(self) -> None:
+        """
+        Отрисовка циклов, найденных во время поиска. Если циклы
+        не помещаются в границы графика, он перерисовывается целиком.
+        Иначе поверх сохранённого фона рисуются только новые циклы,
+        и результат становится новым фоном, поэтому время отрисовки
+        не растёт с количеством уже найденных циклов.
+        """
+        count_drawn = len(self.__segments)
+        rescaled = self.__include_in_bounds(
+            [result['trajectory'] for result in self.__cycles[count_drawn:]]
+        )
+        self.__update_cycle_lines(redecimate=False)
+        if rescaled or self.__background is None:
+            # Коллекция рисуется в обработчике __on_draw
+            self.__canvas.draw()
+            return
+        self.__new_cycle_lines.set_segments(self.__segments[count_drawn:])
+        self.__new_cycle_lines.set_color(
+            self.__cycle_lines.get_colors()[count_drawn:]
+        )
+        self.__canvas.restore_region(self.__background)
+        self.__plot.draw_artist(self.__new_cycle_lines)
+        self.__canvas.blit(self.__plot.bbox)
+        self.__background = self.__canvas.copy_from_bbox(self.__plot.bbox)
+
+    # pylint: disable=unused-argument
+    def __on_draw(self, event) -> None:
+        """
+        Отрисовка коллекции линий циклов после полной перерисовки
+        и сохранение результата как фона, поверх которого дорисовываются
+        новые циклы.
+        """
+        if self.__cycle_lines is None or \
+                not self.__cycle_lines.get_animated():
+            self.__background = None
+            return
+        self.__plot.draw_artist(self.__cycle_lines)
+        self.__background = self.__canvas.copy_from_bbox(self.__plot.bbox)
+
+    def __on_resize(self, event) -> None:
+        """Прореживание траекторий под новый размер графика"""
+        if self.__cycles:
+            self.__update_cycle_lines()
+    # pylint: enable=unused-argument
+
+    def __finish_search(self, search_results: list[dict]) -> None:
+        """
+        Отображение результатов завершённого или прерванного поиска.
+
+        :param search_results: Найденные циклы.
+        """
+        cancelled = self.__cancel.is_set()
+        self.__close_progress()
+
+        # Перерисовываем все циклы, в том числе взятые из кэша
+        self.__reset_plot()
         if len(search_results) != 0:
             self.__plot.plot(
                 [self.__x.get(), self.__x.get()],
@@ -202,57 +520,56 @@ class CycleFinderFrame(ctk.CTkFrame):
                 'Начальные условия, порождающие цикл: ',
                 ''
             ]
+            if cancelled:
+                text_fragments.insert(0, 'Поиск прерван.')
 
             for result in search_results:
                 start_point = result['start_point']
-                text_fragments.append(f'({start_point[0]}, {start_point[1]})')
-                sol = result['trajectory']
-                self.__plot.plot(
-                    sol[:, 0],
-                    sol[:, 1],
-                    color='green',
-                    linewidth=1
+                text_fragments.append(
+                    f'({start_point[0]}, {start_point[1]}): '
+                    f'T = {result.get("period", np.nan):.4f}, '
+                    f'мультипликатор {result.get("multiplier", np.nan):.4f}'
                 )
-                # self.__draw_arrow(sol, 'black')
-
-            another_points = [
-                np.array(
-                    [self.__x.get(), self.__x_dot_min.get() - 2 * self.HOP]
-                ),
-                np.array(
-                    [self.__x.get(), self.__x_dot_min.get() - 4 * self.HOP]
-                ),
-                np.array(
-                    [self.__x.get(), self.__x_dot_min.get() - 8 * self.HOP]
-                ),
-                np.array(
-                    [self.__x.get(), self.__x_dot_max.get() + 2 * self.HOP]
-                ),
-                np.array(
-                    [self.__x.get(), self.__x_dot_max.get() + 4 * self.HOP]
-                ),
-                np.array(
-                    [self.__x.get(), self.__x_dot_max.get() + 8 * self.HOP]
-                ),
-            ]
 
-            for point_ in another_points:
-                self.__plot.plot(
-                    point_[0],
-                    point_[1],
-                    'ko'
-                )
-                additional_sol = get_solution_by_initial_conditions(
-                    point_,
+            another_points = np.array([
+                [self.__x.get(), self.__x_dot_min.get() - 2 * self.HOP],
+                [self.__x.get(), self.__x_dot_min.get() - 4 * self.HOP],
+                [self.__x.get(), self.__x_dot_min.get() - 8 * self.HOP],
+                [self.__x.get(), self.__x_dot_max.get() + 2 * self.HOP],
+                [self.__x.get(), self.__x_dot_max.get() + 4 * self.HOP],
+                [self.__x.get(), self.__x_dot_max.get() + 8 * self.HOP],
+            ])
+
+            # Все дополнительные траектории строятся одним вызовом
+            additional_solutions = \
+                phase_controller.get_solution_by_initial_conditions(
+                    another_points,
                     **self.__coefficients
                 )
-                self.__plot.plot(
-                    additional_sol[:, 0],
-                    additional_sol[:, 1],
-                    color='red',
-                    linewidth=0.5
-                )
-                # self.__draw_arrow(additional_sol)
+
+            # Границы графика выбираются по всем траекториям заранее,
+            # чтобы проредить их до разрешения графика
+            additional_solutions = [
+                solution[np.isfinite(solution).all(axis=1)]
+                for solution in additional_solutions
+            ]
+            self.__cycles = list(search_results)
+            self.__include_in_bounds(
+                [result['trajectory'] for result in self.__cycles]
+                + additional_solutions
+                + [np.array(self.__plot.lines[0].get_xydata())]
+            )
+            self.__update_cycle_lines()
+            self.__plot.add_collection(mpl_collections.LineCollection(
+                [
+                    self.__decimate(solution)
+                    for solution in additional_solutions
+                ],
+                colors='red',
+                linewidths=0.5
+            ))
+            self.__plot.plot(another_points[:, 0], another_points[:, 1], 'ko')
+            # self.__draw_arrow(additional_sol)
 
             self.__canvas.draw()
 
@@ -261,5 +578,16 @@ class CycleFinderFrame(ctk.CTkFrame):
             self.__result_textbox.insert(ctk.END, points_to_show)
 
         else:
+            self.__canvas.draw()
             self.__result_textbox.delete(1.0, ctk.END)
-            self.__result_textbox.insert(ctk.END, 'Циклы не найдены')
+            self.__result_textbox.insert(
+                ctk.END,
+                'Поиск прерван, циклы не найдены'
+                if cancelled else 'Циклы не найдены'
+            )
+
+        # Статистика новых участков (участки из кэша не учитываются)
+        self.__result_textbox.insert(
+            ctk.END,
+            f'\n\nСтатистика поиска:\n{self.__statistics}'
+        )
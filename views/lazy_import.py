@@ -0,0 +1,193 @@
+"""
+Отложенный импорт модулей и замер времени импорта
+
+Тяжёлые модули (matplotlib, numpy, контроллеры поиска с JIT-компиляцией)
+импортируются не при запуске приложения, а при первом обращении
+к их атрибутам, поэтому окно появляется сразу:
+
+    figure = lazy_import('matplotlib.figure')
+    ...
+    figure.Figure()  # здесь matplotlib.figure импортируется
+
+ImportTimer замеряет время импорта каждого модуля при запуске
+приложения (см. app.py --startup-time).
+"""
+
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+from types import ModuleType
+
+
+class LazyModule:
+    """Модуль, импортируемый при первом обращении к его атрибутам"""
+
+    def __init__(self, name: str):
+        """
+        Конструктор класса
+
+        :param name: Полное имя модуля.
+        """
+        self.__name = name
+        self.__module = None
+
+    @property
+    def loaded(self) -> bool:
+        """Импортирован ли модуль"""
+        return self.__module is not None
+
+    def load(self) -> ModuleType:
+        """
+        Импорт модуля, если он ещё не импортирован.
+
+        :return: Модуль.
+        """
+        if self.__module is None:
+            # Импорт через builtins.__import__, а не importlib,
+            # чтобы его учитывал ImportTimer
+            __import__(self.__name)
+            self.__module = sys.modules[self.__name]
+        return self.__module
+
+    def __getattr__(self, name: str):
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        state = 'импортирован' if self.loaded else 'не импортирован'
+        return f'<отложенный модуль {self.__name!r} ({state})>'
+
+
+# Созданные отложенные модули по именам
+__modules: dict[str, LazyModule] = {}
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Отложенный импорт модуля.
+
+    :param name: Полное имя модуля.
+
+    :return: Объект, импортирующий модуль при первом обращении
+        к его атрибутам. Для одного имени возвращается один и тот же
+        объект.
+    """
+    if name not in __modules:
+        __modules[name] = LazyModule(name)
+    return __modules[name]
+
+
+def load_deferred() -> list[str]:
+    """
+    Импорт всех ещё не импортированных отложенных модулей.
+
+    :return: Имена импортированных модулей.
+    """
+    loaded = []
+    for name, module in list(__modules.items()):
+        if not module.loaded:
+            module.load()
+            loaded.append(name)
+    return loaded
+
+
+class ImportTimer:
+    """
+    Замер времени импорта модулей (аналог python -X importtime).
+
+    Для каждого модуля учитывается собственное время импорта и время
+    вместе с импортированными им модулями. Замеряются только импорты
+    в потоке, установившем счётчик.
+    """
+
+    def __init__(self):
+        # Время импорта модулей по именам: (собственное, суммарное), с
+        self.timings: dict[str, tuple[float, float]] = {}
+        self.__original_import = None
+        self.__thread = None
+        # Суммарное время вложенных импортов для каждого уровня
+        self.__children = []
+
+    def install(self) -> None:
+        """Начало замера: подмена builtins.__import__"""
+        if self.__original_import is not None:
+            return
+        self.__original_import = builtins.__import__
+        self.__thread = threading.get_ident()
+        builtins.__import__ = self.__import
+
+    def uninstall(self) -> None:
+        """Окончание замера: восстановление builtins.__import__"""
+        if self.__original_import is None:
+            return
+        builtins.__import__ = self.__original_import
+        self.__original_import = None
+
+    def clear(self) -> None:
+        """Сброс замеров"""
+        self.timings.clear()
+
+    # pylint: disable=redefined-builtin
+    def __import(
+        self,
+        name: str,
+        globals: dict | None = None,
+        locals: dict | None = None,
+        fromlist: tuple = (),
+        level: int = 0
+    ) -> ModuleType:
+        """Импорт модуля с замером времени (см. builtins.__import__)"""
+        original_import = self.__original_import
+        # Относительные импорты учитываются под полным именем модуля
+        full_name = name
+        if level:
+            try:
+                full_name = importlib.util.resolve_name(
+                    '.' * level + name, (globals or {}).get('__package__')
+                )
+            except (ImportError, ValueError):
+                pass
+        if full_name in sys.modules or \
+                threading.get_ident() != self.__thread:
+            return original_import(name, globals, locals, fromlist, level)
+
+        self.__children.append(0.)
+        start = time.perf_counter()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = self.__children.pop()
+            if self.__children:
+                self.__children[-1] += cumulative
+            if full_name in sys.modules:
+                self.timings[full_name] = (
+                    cumulative - children, cumulative
+                )
+    # pylint: enable=redefined-builtin
+
+    def report(self, limit: int | None = None) -> str:
+        """
+        Отчёт о времени импорта.
+
+        :param limit: Количество модулей с наибольшим собственным
+            временем импорта. По умолчанию - все модули.
+
+        :return: Таблица: суммарное и собственное время импорта в мс
+            и имя модуля.
+        """
+        timings = sorted(
+            self.timings.items(), key=lambda item: item[1][0], reverse=True
+        )
+        total = sum(own for _, (own, _) in timings)
+        lines = [f'{"суммарно, мс":>14} | {"собственное, мс":>16} | модуль']
+        lines.extend(
+            f'{cumulative * 1e3:14.1f} | {own * 1e3:16.1f} | {name}'
+            for name, (own, cumulative) in timings[:limit]
+        )
+        lines.append(
+            f'Всего модулей: {len(timings)}, время импорта: '
+            f'{total * 1e3:.1f} мс'
+        )
+        return '\n'.join(lines)
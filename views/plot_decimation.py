@@ -0,0 +1,47 @@
+"""
+Прореживание траекторий до разрешения графика.
+
+Фазовая траектория - параметрическая кривая, поэтому прореживание
+по столбцам пикселей (минимум и максимум в столбце) к ней
+не применимо. Вместо этого из каждой серии подряд идущих точек,
+попадающих в один пиксель, остаётся только первая (и последняя точка
+траектории): форма кривой на экране не меняется, а количество точек
+становится порядка длины кривой в пикселях.
+"""
+
+import numpy as np
+
+
+def decimate_to_pixels(
+    points: np.ndarray,
+    x_limits: tuple[float, float],
+    y_limits: tuple[float, float],
+    width: float,
+    height: float
+) -> np.ndarray:
+    """
+    Прореживание траектории до разрешения графика.
+
+    :param points: Точки траектории формы (n, 2).
+    :param x_limits: Границы оси x графика.
+    :param y_limits: Границы оси y графика.
+    :param width: Ширина области графика в пикселях.
+    :param height: Высота области графика в пикселях.
+
+    :return: Точки траектории формы (m, 2), m <= n.
+    """
+    points = np.asarray(points)
+    if len(points) <= 2:
+        return points
+
+    x_scale = max(width, 1.) / ((x_limits[1] - x_limits[0]) or 1.)
+    y_scale = max(height, 1.) / ((y_limits[1] - y_limits[0]) or 1.)
+    pixels = np.floor(
+        (points - (x_limits[0], y_limits[0])) * (x_scale, y_scale)
+    )
+
+    # Оставляем точки, с которых начинается новый пиксель
+    keep = np.empty(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    keep[1:-1] = (pixels[1:-1] != pixels[:-2]).any(axis=1)
+    return points[keep]
@@ -3,7 +3,7 @@
 __author__ = 'Kirill Petryashev'
 
 from enum import Enum
-from typing import Tuple
+from typing import Callable, Tuple
 from tkinter import messagebox
 
 import customtkinter as ctk
@@ -26,7 +26,16 @@ class MainWindow(ctk.CTk):
     """Класс, реализующий интерфейс окна"""
 
     def __init__(self, fg_color: str | Tuple[str, str] | None = None,
+                 on_ready: Callable[['MainWindow'], None] | None = None,
                  **kwargs) -> None:
+        """
+        Конструктор класса. Запускает цикл обработки событий.
+
+        :param fg_color: Цвет фона окна.
+        :param on_ready: Функция, вызываемая с окном после его
+            отображения (например, для замера времени запуска).
+        :param kwargs: Остальные параметры окна.
+        """
         # Создаём окно
         super().__init__(fg_color, **kwargs)
 
@@ -39,6 +48,9 @@ class MainWindow(ctk.CTk):
         # Задаем виджеты
         self.__configure_widgets()
 
+        if on_ready is not None:
+            self.after_idle(on_ready, self)
+
         # Запускаем приложение
         self.mainloop()
 
@@ -2,16 +2,66 @@
 Окно с отображение прогресса поиска циклов.
 """
 
+from typing import Callable, Final
+
 import customtkinter as ctk
 
 
-class ProgressWindow(ctk.CTk):
+class ProgressWindow(ctk.CTkToplevel):
     """Окно с отображением прогресса поиска циклов."""
 
-    def __init__(self, **kwargs):
+    # Обозначаем шрифт по умолчанию.
+    FONT: Final = ('Colibri', 18)
+
+    def __init__(self, on_cancel: Callable[[], None], **kwargs):
+        """
+        Конструктор класса
+
+        :param on_cancel: Функция, вызываемая при нажатии кнопки отмены
+            и при закрытии окна.
+        :param kwargs: Остальные параметры окна.
+        """
         super().__init__(**kwargs)
 
-        self.__progress_bar = ctk.CTkProgressBar(self)
-        self.__progress_bar.pack(expand=True)
+        self.__on_cancel = on_cancel
+
+        self.title('Поиск циклов')
+        self.resizable(False, False)
+        self.protocol('WM_DELETE_WINDOW', self.__on_cancel_click)
+
+        self.__label = ctk.CTkLabel(self, text='Поиск...', font=self.FONT)
+        self.__label.pack(padx=20, pady=(20, 10))
+
+        self.__progress_bar = ctk.CTkProgressBar(self, width=300)
+        self.__progress_bar.set(0)
+        self.__progress_bar.pack(padx=20, pady=10)
+
+        self.__cancel_button = ctk.CTkButton(
+            self,
+            text='Отмена',
+            font=self.FONT,
+            command=self.__on_cancel_click
+        )
+        self.__cancel_button.pack(padx=20, pady=(10, 20))
+
+        # Окно отображается поверх основного
+        self.transient(self.master)
+
+    def set_progress(self, done: int, total: int, found: int) -> None:
+        """
+        Обновить прогресс поиска.
+
+        :param done: Количество обработанных частей диапазона.
+        :param total: Общее количество частей диапазона.
+        :param found: Количество найденных циклов.
+        """
+        self.__progress_bar.set(done / total if total else 1)
+        self.__label.configure(
+            text=f'Обработано {done} из {total}, найдено циклов: {found}'
+        )
 
-        self.mainloop()
+    def __on_cancel_click(self) -> None:
+        """Триггер на нажатие кнопки отмены"""
+        self.__cancel_button.configure(state='disabled')
+        self.__label.configure(text='Остановка...')
+        self.__on_cancel()